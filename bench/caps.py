@@ -0,0 +1,137 @@
+# pragma: exclude file
+
+"""
+Time and measure the peak memory of the capabilities path: parsing a capabilities string, and building the
+full and summary data that the caps command outputs from it.
+
+    python -m bench.caps [--runs N] [--save FILE] [--compare FILE] [--threshold RATIO]
+
+The cases are the real-world strings from the parser test corpus, plus synthetic strings that are much
+larger or more deeply nested than any monitor reports. --save writes the results as a baseline, and
+--compare reports every measurement that got more than RATIO times worse than a baseline, exiting with
+status 1 if any did. Times are only comparable between runs on the same machine; peak memory is not
+machine-specific.
+"""
+
+import json
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from argparse import ArgumentParser
+from os import path
+from typing import Callable
+
+from monitorboss.config import Config, get_config
+from monitorboss.info import capability_data, capability_summary_data
+from pyddc import parse_capabilities
+from test.pyddc.caps_corpus import WELL_FORMED, QUIRKS
+
+BASELINE = path.join(path.dirname(__file__), "baselines", "caps.json")
+
+
+def synthetic_caps(features: int = 256, values: int = 32) -> str:
+    """A well-formed capabilities string listing every feature code, each with the given number of values."""
+    vcp = " ".join(f"{code:02X}(" + " ".join(f"{value:02X}" for value in range(values)) + ")"
+                   for code in range(features))
+    cmds = " ".join(f"{code:02X}" for code in range(features))
+    return f"(prot(monitor)type(LCD)model(SYNTH)cmds({cmds})vcp({vcp})vcp_p02({vcp})mccs_ver(2.2))"
+
+
+def nested_caps(depth: int = 5000) -> str:
+    """A capabilities string with a feature whose values are nested depth levels deep."""
+    return "(prot(monitor)type(LCD)model(NESTED)vcp(10 " + "60(" * depth + ")" * depth + " 62)mccs_ver(2.1))"
+
+
+def cases() -> dict[str, str]:
+    return {
+        **WELL_FORMED,
+        **QUIRKS,
+        "synthetic_large": synthetic_caps(),
+        "synthetic_nested": nested_caps(),
+    }
+
+
+def _config() -> Config:
+    # the default config, without touching the user's config file
+    with tempfile.TemporaryDirectory() as tmp:
+        return get_config(path.join(tmp, "MonitorBoss.toml"))
+
+
+def targets(caps_str: str, cfg: Config) -> dict[str, Callable[[], object]]:
+    caps = parse_capabilities(caps_str)
+    data = capability_data(caps, cfg)
+    return {
+        "parse_capabilities": lambda: parse_capabilities(caps_str),
+        "capability_data": lambda: capability_data(caps, cfg),
+        "capability_summary_data": lambda: capability_summary_data(data),
+    }
+
+
+def measure(func: Callable[[], object], runs: int) -> dict[str, float]:
+    seconds = min(timeit.repeat(func, number=runs, repeat=5)) / runs
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": seconds, "peak_bytes": peak}
+
+
+def run(runs: int) -> dict[str, dict[str, dict[str, float]]]:
+    cfg = _config()
+    results = {}
+    for name, caps_str in cases().items():
+        # fewer runs for the big synthetic strings, to keep the whole suite within seconds
+        case_runs = max(1, runs * 1000 // max(len(caps_str), 1000))
+        results[name] = {target: measure(func, case_runs) for target, func in targets(caps_str, cfg).items()}
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, case in results.items():
+        for target, measurement in case.items():
+            old = baseline.get(name, {}).get(target)
+            if not old:
+                continue
+            for metric, value in measurement.items():
+                if old.get(metric) and value / old[metric] > threshold:
+                    regressions.append(f"{name} {target} {metric}: {old[metric]:.6g} -> {value:.6g} "
+                                       f"({value / old[metric]:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--save", nargs="?", const=BASELINE, help=f"write a baseline (default: {BASELINE})")
+    parser.add_argument("--compare", nargs="?", const=BASELINE, help=f"compare to a baseline (default: {BASELINE})")
+    parser.add_argument("--threshold", type=float, default=1.5)
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    print(f"{'case':<24}{'target':<26}{'time (us)':>12}{'peak (KiB)':>12}")
+    for name, case in results.items():
+        for target, measurement in case.items():
+            print(f"{name:<24}{target:<26}{measurement['seconds'] * 1e6:>12.1f}"
+                  f"{measurement['peak_bytes'] / 1024:>12.1f}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf8") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+        print(f"saved baseline to {args.save}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf8") as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        if regressions:
+            print(f"regressions against {args.compare}:")
+            print("\n".join(regressions))
+            sys.exit(1)
+        print(f"no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# pragma: exclude file
+
+"""
+Compare the two ways LinuxVCP.get_vcps can list I2C adapters: scanning sysfs directly, and asking pyudev.
+Only the listing is measured, not the bus probes that follow it.
+
+    python -m bench.enumeration [--runs N]
+
+"cold" starts a fresh interpreter per run, so it includes importing pyddc (the same for both paths) and
+pyudev; "warm" repeats the call in one process.
+"""
+
+import subprocess
+import sys
+import timeit
+from argparse import ArgumentParser
+from statistics import median
+
+assert sys.platform.startswith("linux"), "This benchmark only applies to Linux"
+
+from pyddc import linux_sysfs
+from pyddc import vcp_linux
+
+MODES = ("sysfs", "udev")
+
+
+def cold(mode: str, runs: int) -> float:
+    code = ("import time; _t = time.perf_counter(); from pyddc import vcp_linux; "
+            f"vcp_linux.LinuxVCP.ENUMERATION = {mode!r}; vcp_linux._list_buses(); print(time.perf_counter() - _t)")
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+        times.append(float(out))
+    return median(times)
+
+
+def warm(mode: str, runs: int) -> float:
+    vcp_linux.LinuxVCP.ENUMERATION = mode
+    return min(timeit.repeat(vcp_linux._list_buses, number=runs, repeat=5)) / runs
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    sysfs_buses = linux_sysfs.i2c_buses()
+    print(f"adapters: sysfs={sysfs_buses} udev={vcp_linux._udev_buses()}")
+    if sysfs_buses is None:
+        # the sysfs path would fall back to udev, and the comparison would be of udev with itself
+        sys.exit(f"{linux_sysfs.SYSFS_ROOT}/bus/i2c can not be read here, so there is nothing to compare; "
+                 f"run this on a machine with I2C adapters")
+    print(f"{'path':<8}{'cold (ms)':>12}{'warm (ms)':>12}")
+    for mode in MODES:
+        print(f"{mode:<8}{cold(mode, args.runs) * 1000:>12.3f}{warm(mode, args.runs * 50) * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
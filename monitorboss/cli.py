@@ -1,17 +1,21 @@
 from argparse import ArgumentParser
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger, DEBUG
 from time import sleep
+from typing import TypeVar
 
 from monitorboss import MonitorBossError, indentation
 from monitorboss.config import Config, get_config
-from monitorboss.impl import list_monitors, get_feature, set_feature, toggle_feature, get_vcp_capabilities
+from monitorboss.impl import list_monitors, get_monitor, get_feature, set_feature, toggle_feature, \
+    get_vcp_capabilities, get_capabilities_index
 from monitorboss.info import (
     feature_data,
     monitor_data,
     value_data,
     capability_data,
     capability_summary_data,
+    SUMMARY_KEYS,
     MonitorCapsResponseData,
     MonitorGetResponseData,
     MonitorSetResponseData,
@@ -19,10 +23,11 @@ from monitorboss.info import (
 )
 from monitorboss.output import caps_raw_output, caps_parsed_output, list_mons_output, \
     get_feature_output, set_feature_output, tog_feature_output
-from pyddc import parse_capabilities, get_vcp_com
+from pyddc import get_vcp_com, RetryStats, VCP
 from pyddc.vcp_codes import VCPCodes, VCPCommand
 
 _log = getLogger(__name__)
+R = TypeVar("R")
 _INDENT_LEVEL = 4 if _log.level >= DEBUG else None
 
 
@@ -90,38 +95,80 @@ def _list_mons(args, cfg: Config):
     print(list_mons_output([monitor_data(index, cfg) for index, _ in enumerate(list_monitors())], args.json))
 
 
+def _per_bus(mons: list[int], respond: Callable[[int, VCP | None], R], wait: float) -> list[R]:
+    """
+    Get respond's response for each monitor, in the order given. Each monitor is looked up once, and handed to
+    respond, or None if the lookup failed (for respond to report). Monitors on different buses are handled
+    concurrently, while those that share one (or whose bus is unknown) are handled in turn, wait seconds apart.
+    """
+    monitors: dict[int, VCP | None] = {}
+    for m in mons:
+        if m not in monitors:
+            try:
+                monitors[m] = get_monitor(m)
+            except MonitorBossError:
+                monitors[m] = None
+    buses: dict[str | None, list[int]] = {}
+    for i, m in enumerate(mons):
+        monitor = monitors[m]
+        buses.setdefault(monitor.bus if monitor is not None else None, []).append(i)
+    _log.debug(f"monitors by bus: { {bus: [mons[i] for i in indices] for bus, indices in buses.items()} }")
+    responses: list[R | None] = [None] * len(mons)
+
+    def respond_all(indices: list[int]):
+        for n, i in enumerate(indices):
+            if n:
+                sleep(wait)
+            responses[i] = respond(mons[i], monitors[mons[i]])
+
+    if len(buses) == 1:
+        respond_all(*buses.values())
+    else:
+        with ThreadPoolExecutor(len(buses), thread_name_prefix="monitorboss") as executor:
+            # list() to wait for them all, and raise anything unexpected
+            list(executor.map(respond_all, buses.values()))
+    return responses
+
+
 def _get_caps(args, cfg: Config):
     _log.debug(f"get capabilities: {args}")
     mons = [_check_mon(m, cfg) for m in args.monitor]
-    responses = []
+    retry = cfg.retry_policy()
 
-    for i, m in enumerate(mons):
+    def respond(m: int, monitor: VCP | None) -> MonitorCapsResponseData:
         mdata = monitor_data(m, cfg)
+        stats = RetryStats()
         try:
-            rawcap = get_vcp_capabilities(m)
             if args.raw:
-                responses.append(MonitorCapsResponseData(
+                rawcap = get_vcp_capabilities(m, args.refresh, retry, stats, monitor)
+                return MonitorCapsResponseData(
                     mon=mdata,
                     error=None,
-                    data=rawcap
-                ))
+                    data=rawcap,
+                    stats=stats
+                )
             else:
-                fullcaps = capability_data(parse_capabilities(rawcap), cfg)
+                index = get_capabilities_index(m, args.refresh, SUMMARY_KEYS if args.summary else None, retry, stats,
+                                               monitor)
+                fullcaps = capability_data(index, cfg)
                 if args.summary:
                     fullcaps = capability_summary_data(fullcaps)
-                responses.append(MonitorCapsResponseData(
+                return MonitorCapsResponseData(
                     mon=mdata,
                     error=None,
-                    data=fullcaps
-                ))
+                    data=fullcaps,
+                    stats=stats
+                )
         except Exception as err:
             _log.warning(f"Failed to get capabilities for monitor {m}: {err}")
-            responses.append(MonitorCapsResponseData(
+            return MonitorCapsResponseData(
                 mon=mdata,
                 error=err,
-                data=None
-            ))
+                data=None,
+                stats=stats
+            )
 
+    responses = _per_bus(mons, respond, 0)
     if args.raw:
         print(caps_raw_output(responses, args.json))
     else:
@@ -132,36 +179,37 @@ def _get_feature(args, cfg: Config):
     _log.debug(f"get feature: {args}")
     vcpcom = _check_feature(args.feature, cfg)
     mons = [_check_mon(m, cfg) for m in args.monitor]
-    responses = []
+    retry = cfg.retry_policy()
     fdata = feature_data(vcpcom.code, cfg)
 
-    for i, m in enumerate(mons):
+    def respond(m: int, monitor: VCP | None) -> MonitorGetResponseData:
         mdata = monitor_data(m, cfg)
+        stats = RetryStats()
         try:
-            ret = get_feature(m, vcpcom, cfg.wait_internal_time)
+            ret = get_feature(m, vcpcom, cfg.wait_internal_time, retry, stats, monitor)
             # The "max" value for discrete features actually represents the number of valid values.
             # We don't report this to the user because there's nothing they can do with the information.
             maximum = None if vcpcom.discrete else ret.max
             vdata = value_data(fdata.code, ret.value, cfg)
 
-            responses.append(MonitorGetResponseData(
+            return MonitorGetResponseData(
                 mon=mdata,
                 error=None,
                 value=vdata,
-                maximum=maximum
-            ))
+                maximum=maximum,
+                stats=stats
+            )
         except Exception as err:
             _log.warning(f"Failed to get {vcpcom.name} for monitor {m}: {err}")
-            responses.append(MonitorGetResponseData(
+            return MonitorGetResponseData(
                 mon=mdata,
                 error=err,
                 value=None,
-                maximum=None
-            ))
-
-        if i + 1 < len(mons):
-            sleep(cfg.wait_get_time)
+                maximum=None,
+                stats=stats
+            )
 
+    responses = _per_bus(mons, respond, cfg.wait_get_time)
     print(get_feature_output(fdata, responses, args.json))
 
 
@@ -170,31 +218,32 @@ def _set_feature(args, cfg: Config):
     vcpcom = _check_feature(args.feature, cfg)
     mons = [_check_mon(m, cfg) for m in args.monitor]
     val = _check_val(vcpcom, args.value, cfg)
-    responses = []
+    retry = cfg.retry_policy()
     fdata = feature_data(vcpcom.code, cfg)
 
-    for i, m in enumerate(mons):
+    def respond(m: int, monitor: VCP | None) -> MonitorSetResponseData:
         mdata = monitor_data(m, cfg)
+        stats = RetryStats()
         try:
-            set_feature(m, vcpcom, val, cfg.wait_internal_time)
+            set_feature(m, vcpcom, val, cfg.wait_internal_time, retry, stats, monitor)
             vdata = value_data(fdata.code, val, cfg)
 
-            responses.append(MonitorSetResponseData(
+            return MonitorSetResponseData(
                 mon=mdata,
                 error=None,
-                value=vdata
-            ))
+                value=vdata,
+                stats=stats
+            )
         except Exception as err:
             _log.warning(f"Failed to set {vcpcom.name} for monitor {m}: {err}")
-            responses.append(MonitorSetResponseData(
+            return MonitorSetResponseData(
                 mon=mdata,
                 error=err,
-                value=None
-            ))
-
-        if i + 1 < len(mons):
-            sleep(cfg.wait_set_time)
+                value=None,
+                stats=stats
+            )
 
+    responses = _per_bus(mons, respond, cfg.wait_set_time)
     print(set_feature_output(fdata, responses, args.json))
 
 
@@ -204,34 +253,35 @@ def _tog_feature(args, cfg: Config):
     mons = [_check_mon(m, cfg) for m in args.monitor]
     val1 = _check_val(vcpcom, args.value1, cfg)
     val2 = _check_val(vcpcom, args.value2, cfg)
-    responses = []
+    retry = cfg.retry_policy()
     fdata = feature_data(vcpcom.code, cfg)
 
-    for i, m in enumerate(mons):
+    def respond(m: int, monitor: VCP | None) -> MonitorToggleResponseData:
         mdata = monitor_data(m, cfg)
+        stats = RetryStats()
         try:
-            tog_val = toggle_feature(m, vcpcom, val1, val2, cfg.wait_internal_time)
+            tog_val = toggle_feature(m, vcpcom, val1, val2, cfg.wait_internal_time, retry, stats, monitor)
             vdata_old = value_data(fdata.code, tog_val.old, cfg)
             vdata_new = value_data(fdata.code, tog_val.new, cfg)
 
-            responses.append(MonitorToggleResponseData(
+            return MonitorToggleResponseData(
                 mon=mdata,
                 error=None,
                 original_value=vdata_old,
-                new_value=vdata_new
-            ))
+                new_value=vdata_new,
+                stats=stats
+            )
         except Exception as err:
             _log.warning(f"Failed to toggle {vcpcom.name} for monitor {m}: {err}")
-            responses.append(MonitorToggleResponseData(
+            return MonitorToggleResponseData(
                 mon=mdata,
                 error=err,
                 original_value=None,
-                new_value=None
-            ))
-
-        if i + 1 < len(mons):
-            sleep(cfg.wait_set_time)
+                new_value=None,
+                stats=stats
+            )
 
+    responses = _per_bus(mons, respond, cfg.wait_set_time)
     print(tog_feature_output(fdata, responses, args.json))
 
 
@@ -255,6 +305,7 @@ caps_parser.add_argument("monitor", type=str, nargs="+", help="the monitor to re
 caps_exclusive_flags = caps_parser.add_mutually_exclusive_group()
 caps_exclusive_flags.add_argument("-r", "--raw", action='store_true', help="return the original, unparsed capabilities string")
 caps_exclusive_flags.add_argument("-s", "--summary", action='store_true', help="return a highly formatted and abridged summary of the capabilities")
+caps_parser.add_argument("--refresh", action='store_true', help="fetch the capabilities from the monitor even if they are cached")
 
 text = "returns the value of a given feature"
 get_parser = mon_subparsers.add_parser("get", help=text, description=text)
@@ -6,7 +6,8 @@ from tomlkit import parse, dump, document, table, TOMLDocument
 from pydantic import BaseModel, ConfigDict, ValidationError, field_validator
 
 from monitorboss import MonitorBossError
-from pyddc import get_vcp_com
+from pyddc import get_vcp_com, RetryPolicy
+from pyddc.retry import DEFAULT_MAX_RETRIES
 from pyddc.vcp_codes import VCPCodes
 
 _log = getLogger(__name__)
@@ -19,6 +20,7 @@ class TomlCategories(Enum):
     features = "feature_aliases"
     settings = "settings"
     values = "value_aliases"
+    retry = "retry"
 
 
 class TomlSettingsKeys(Enum):
@@ -45,6 +47,29 @@ class _RawTomlSettings(BaseModel):
         return v
 
 
+class _RawTomlRetry(BaseModel):
+    """
+    Pydantic model for the [retry] section of the TOML file.
+    Optional, as are all of its keys, so that configs written before it existed keep working.
+    """
+    checksum: int = DEFAULT_MAX_RETRIES["checksum"]
+    null_message: int = DEFAULT_MAX_RETRIES["null_message"]
+    protocol: int = DEFAULT_MAX_RETRIES["protocol"]
+    io: int = DEFAULT_MAX_RETRIES["io"]
+    timeout: int = DEFAULT_MAX_RETRIES["timeout"]
+    backoff: float = RetryPolicy.backoff
+    backoff_max: float = RetryPolicy.backoff_max
+    deadline: float = RetryPolicy.deadline
+
+    @field_validator("checksum", "null_message", "protocol", "io", "timeout", "backoff", "backoff_max", "deadline")
+    @classmethod
+    def validate_non_negative(cls, v: float) -> float:
+        """Retry counts and times must be non-negative."""
+        if v < 0:
+            raise ValueError(f"Retry counts and times must be non-negative, got {v}")
+        return v
+
+
 class _RawTomlConfig(BaseModel):
     """
     Pydantic model mirroring the exact TOML structure before inversion.
@@ -71,6 +96,7 @@ class _RawTomlConfig(BaseModel):
     feature_aliases: dict[str, str | list[str]]
     value_aliases: dict[str, dict[str, str | list[str]]] = {}
     settings: _RawTomlSettings
+    retry: _RawTomlRetry = _RawTomlRetry()
 
     @field_validator("monitor_names")
     @classmethod
@@ -170,6 +196,14 @@ class Config(BaseModel):
     wait_get_time: float
     wait_set_time: float
     wait_internal_time: float
+    retry_max: dict[str, int] = dict(DEFAULT_MAX_RETRIES)
+    retry_backoff: float = RetryPolicy.backoff
+    retry_backoff_max: float = RetryPolicy.backoff_max
+    retry_deadline: float = RetryPolicy.deadline
+
+    def retry_policy(self) -> RetryPolicy:
+        return RetryPolicy(max_retries=dict(self.retry_max), backoff=self.retry_backoff,
+                           backoff_max=self.retry_backoff_max, deadline=self.retry_deadline)
 
     @classmethod
     def from_raw(cls, raw: _RawTomlConfig) -> "Config":
@@ -214,6 +248,10 @@ class Config(BaseModel):
             wait_get_time=raw.settings.wait_get,
             wait_set_time=raw.settings.wait_set,
             wait_internal_time=raw.settings.wait_internal,
+            retry_max={kind: getattr(raw.retry, kind) for kind in DEFAULT_MAX_RETRIES},
+            retry_backoff=raw.retry.backoff,
+            retry_backoff_max=raw.retry.backoff_max,
+            retry_deadline=raw.retry.deadline,
         )
 
 
@@ -239,15 +277,26 @@ def default_toml() -> TOMLDocument:
     value_aliases.add(get_vcp_com(VCPCodes.display_power_mode).name, display_power_names)
 
     settings = table()
-    settings.add(TomlSettingsKeys.wait_get.value, 0.05)
-    settings.add(TomlSettingsKeys.wait_set.value, 0.1)
+    # extra waits between the monitors of a command that share a bus; the driver already spaces out the commands on
+    # each bus, and monitors on different buses are handled at once
+    settings.add(TomlSettingsKeys.wait_get.value, 0.0)
+    settings.add(TomlSettingsKeys.wait_set.value, 0.0)
     settings.add(TomlSettingsKeys.wait_internal.value, 0.04)
 
+    # retries after transient DDC/CI errors, per kind of error, and the backoff and deadline they run within
+    retry = table()
+    for kind, count in DEFAULT_MAX_RETRIES.items():
+        retry.add(kind, count)
+    retry.add("backoff", RetryPolicy.backoff)
+    retry.add("backoff_max", RetryPolicy.backoff_max)
+    retry.add("deadline", RetryPolicy.deadline)
+
     doc = document()
     doc.add(TomlCategories.monitors.value, mon_names)
     doc.add(TomlCategories.features.value, feature_aliases)
     doc.add(TomlCategories.values.value, value_aliases)
     doc.add(TomlCategories.settings.value, settings)
+    doc.add(TomlCategories.retry.value, retry)
 
     return doc
 
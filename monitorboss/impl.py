@@ -1,8 +1,11 @@
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from logging import getLogger
 from time import sleep
 
-from pyddc import VCP, VCPCommand, get_vcp_com, VCPError, VCPFeatureReturn
+from pyddc import VCP, VCPCommand, get_vcp_com, VCPError, VCPFeatureReturn, CapsCache, CapabilitiesIndex, \
+    MaximaCache, RetryPolicy, RetryStats
 from pyddc.vcp_codes import VCPCodes
 
 from monitorboss import MonitorBossError
@@ -10,6 +13,9 @@ from monitorboss.config import get_config
 
 _log = getLogger(__name__)
 
+_caps_cache = CapsCache()
+_maxima_cache = MaximaCache()
+
 
 def list_monitors() -> list[VCP]:
     _log.debug("list monitors")
@@ -17,30 +23,86 @@ def list_monitors() -> list[VCP]:
         return VCP.get_vcps()
     except VCPError as err:
         # this can only happen on Windows
-        raise MonitorBossError(f"Failed to list VCPs.") from err
+        raise MonitorBossError("Failed to list VCPs.") from err
 
 
 def get_monitor(mon: int) -> VCP:
     _log.debug(f"get monitor: {mon}")
-    monitors = list_monitors()
     try:
-        return monitors[mon]
+        return VCP.get_vcp(mon)
     except IndexError as err:
         raise MonitorBossError(f"monitor #{mon} does not exist.") from err
+    except VCPError as err:
+        # this can only happen on Windows
+        raise MonitorBossError("Failed to list VCPs.") from err
+
+
+@contextmanager
+def _open_monitor(
+        mon: int,
+        retry: RetryPolicy | None,
+        stats: RetryStats | None,
+        monitor: VCP | None,
+) -> Iterator[VCP]:
+    """Enter a monitor's context, with its feature maxima stored between runs, retrying its operations per retry
+    (if given), and adding their attempts and retries to stats (if given), whether they succeed or not. The monitor
+    is looked up by mon, unless it was already (as monitor)."""
+    if monitor is None:
+        monitor = get_monitor(mon)
+    monitor.maxima_cache = _maxima_cache
+    if retry is not None:
+        monitor.retry_policy = retry
+    # only this operation's attempts, even if the monitor was used before
+    monitor.retry_stats = RetryStats()
+    try:
+        with monitor:
+            yield monitor
+    finally:
+        if stats is not None:
+            stats.add(monitor.retry_stats)
+
+
+def get_vcp_capabilities(
+        mon: int,
+        refresh: bool = False,
+        retry: RetryPolicy | None = None,
+        stats: RetryStats | None = None,
+        monitor: VCP | None = None,
+) -> str:
+    _log.debug(f"get VCP capabilities for monitor #{mon}")
+    with _open_monitor(mon, retry, stats, monitor) as monitor:
+        try:
+            return monitor.get_vcp_capabilities(cache=_caps_cache, refresh=refresh)
+        except VCPError as err:
+            raise MonitorBossError(f"Could not list information for monitor {mon}") from err
 
 
-def get_vcp_capabilities(mon: int) -> str:
-    _log.debug(f"get VCP capabilities for monitor #{mon}")
-    with get_monitor(mon) as monitor:
+def get_capabilities_index(
+        mon: int,
+        refresh: bool = False,
+        keys: Iterable[str] | None = None,
+        retry: RetryPolicy | None = None,
+        stats: RetryStats | None = None,
+        monitor: VCP | None = None,
+) -> CapabilitiesIndex:
+    _log.debug(f"get indexed VCP capabilities for monitor #{mon}")
+    with _open_monitor(mon, retry, stats, monitor) as monitor:
         try:
-            return monitor.get_vcp_capabilities()
+            return monitor.get_capabilities_index(cache=_caps_cache, refresh=refresh, keys=keys)
         except VCPError as err:
             raise MonitorBossError(f"Could not list information for monitor {mon}") from err
 
 
-def get_feature(mon: int, feature: VCPCommand, timeout: float) -> VCPFeatureReturn:
+def get_feature(
+        mon: int,
+        feature: VCPCommand,
+        timeout: float,
+        retry: RetryPolicy | None = None,
+        stats: RetryStats | None = None,
+        monitor: VCP | None = None,
+) -> VCPFeatureReturn:
     _log.debug(f"get feature: {feature.name} (for monitor #{mon})")
-    with get_monitor(mon) as monitor:
+    with _open_monitor(mon, retry, stats, monitor) as monitor:
         try:
             val = monitor.get_vcp_feature(feature, timeout)
             _log.debug(f"get_vcp_feature for {feature.name} on monitor #{mon} returned {val.value} (max {val.max})")
@@ -51,9 +113,17 @@ def get_feature(mon: int, feature: VCPCommand, timeout: float) -> VCPFeatureRetu
             raise MonitorBossError(f"{feature.name} is not a readable feature.") from err
 
 
-def set_feature(mon: int, feature: VCPCommand, val: int, timeout: float) -> int:
+def set_feature(
+        mon: int,
+        feature: VCPCommand,
+        val: int,
+        timeout: float,
+        retry: RetryPolicy | None = None,
+        stats: RetryStats | None = None,
+        monitor: VCP | None = None,
+) -> int:
     _log.debug(f"set feature: {feature.name} = {val} (for monitor #{mon})")
-    with get_monitor(mon) as monitor:
+    with _open_monitor(mon, retry, stats, monitor) as monitor:
         try:
             monitor.set_vcp_feature(feature, val, timeout)
         except VCPError as err:
@@ -71,11 +141,22 @@ class ToggledFeature:
     new: int
 
 
-def toggle_feature(mon: int, feature: VCPCommand, val1: int, val2: int, timeout: float) -> ToggledFeature:
+def toggle_feature(
+        mon: int,
+        feature: VCPCommand,
+        val1: int,
+        val2: int,
+        timeout: float,
+        retry: RetryPolicy | None = None,
+        stats: RetryStats | None = None,
+        monitor: VCP | None = None,
+) -> ToggledFeature:
     _log.debug(f"toggle feature: {feature.name} between {val1} and {val2} (for monitor #{mon})")
-    cur_val = get_feature(mon, feature, timeout).value
+    if monitor is None:
+        monitor = get_monitor(mon)
+    cur_val = get_feature(mon, feature, timeout, retry, stats, monitor).value
     new_val = val2 if cur_val == val1 else val1
-    set_feature(mon, feature, new_val, timeout)
+    set_feature(mon, feature, new_val, timeout, retry, stats, monitor)
     return ToggledFeature(cur_val, new_val)
 
 
@@ -1,13 +1,14 @@
 import textwrap
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TypeAlias
 
 from frozendict import frozendict
 
 from monitorboss import indentation
 from monitorboss.config import Config
-from pyddc import get_vcp_com
+from pyddc import get_vcp_com, RetryStats
+from pyddc.caps_index import CapabilitiesIndex, page_capabilities
 from pyddc.vcp_abc import Capabilities
 from pyddc.vcp_codes import VCPCodes
 
@@ -165,26 +166,42 @@ class CapabilityData:
         return "\n".join(map(str, [s for s in sections if s]))
 
 
-def capability_data(caps: dict[str, Capabilities], cfg) -> CapabilityData:
+def capability_data(caps: dict[str, Capabilities] | CapabilitiesIndex, cfg) -> CapabilityData:
     # TODO: PYDDC definition of Capabilities currently allows for:
     #   - indefinitely nested caps.
     #   - non-int feature codes and values (passing cap.cap and cap.values data without checking)
     #   We do not account for this here, but that should change in PYDDC anyways
-    cmds = frozendict({
-        name: tuple(feature_data(f.cap, cfg) for f in cap) if cap else ()
-        for name, cap in caps.items() if name.lower().startswith("cmd")
-    })
-    vcps = frozendict({
-        name: frozendict({
-            feature_data(f.cap, cfg): tuple(value_data(f.cap, v, cfg) for v in f.values) if f.values else ()
-            for f in cap
-        }) if cap else frozendict()
-        for name, cap in caps.items() if name.lower().startswith("vcp")
-    })
-    info_fields = frozendict({
-        name: cap
-        for name, cap in caps.items() if name not in cmds and name not in vcps
-    })
+    if isinstance(caps, CapabilitiesIndex):
+        cmds = frozendict({
+            name: tuple(feature_data(code, cfg) for code in codes)
+            for name, codes in caps.cmds.items()
+        })
+        vcps = frozendict({
+            name: frozendict({
+                feature_data(f.code, cfg): tuple(value_data(f.code, v, cfg) for v in f.values)
+                for f in features.values()
+            })
+            for name, features in caps.vcps.items()
+        })
+        info_fields = frozendict(caps.attributes)
+    else:
+        # Built straight from the parsed dict, the same way the index reads it: indexing it first, only to convert
+        # it once, would about double peak memory.
+        cmds = frozendict({
+            name: tuple(feature_data(f.cap, cfg) for f in page_capabilities(cap))
+            for name, cap in caps.items() if name.lower().startswith("cmd")
+        })
+        vcps = frozendict({
+            name: frozendict({
+                feature_data(f.cap, cfg): tuple(value_data(f.cap, v, cfg) for v in f.values) if f.values else ()
+                for f in page_capabilities(cap)
+            })
+            for name, cap in caps.items() if name.lower().startswith("vcp")
+        })
+        info_fields = frozendict({
+            name: cap
+            for name, cap in caps.items() if name not in cmds and name not in vcps
+        })
     errata: frozendict[str, tuple[str]] = frozendict()  # TODO: not sure how to find/parse out errata rn
     return CapabilityData(info_fields, cmds, vcps, errata)
 
@@ -192,9 +209,14 @@ def capability_data(caps: dict[str, Capabilities], cfg) -> CapabilityData:
 # TODO: could possibly be merged with capability_data, and just include an argument for desired attributes
 #   and features each, where 'None' means all (equivalent to capability_data) and supplying relevant lists
 #   tells it what to filter
+_SUMMARY_ATTRIBUTES = {"type", "model"}
+# the top-level capabilities keys the summary is built from; fetching capabilities for a summary can stop once
+# they have been received
+SUMMARY_KEYS = (*sorted(_SUMMARY_ATTRIBUTES), "vcp")
+
+
 def capability_summary_data(caps_data: CapabilityData) -> CapabilityData:
-    desired_attributes = {"type", "model"}
-    attributes = {attr: value for attr, value in caps_data.attributes.items() if attr in desired_attributes}
+    attributes = {attr: value for attr, value in caps_data.attributes.items() if attr in _SUMMARY_ATTRIBUTES}
     desired_features = {VCPCodes.input_source.value, VCPCodes.image_color_preset.value}
     vcp_features = {
         vcp: {feature: params for feature, params in features.items() if feature.code in desired_features}
@@ -207,16 +229,19 @@ def capability_summary_data(caps_data: CapabilityData) -> CapabilityData:
 class MonitorCommandResponseData(ABC):
     mon: MonitorData
     error: Exception | None
+    # attempts and retries the command took, if counted
+    stats: RetryStats | None = field(default=None, kw_only=True)
 
     @abstractmethod
     def _serialize(self) -> dict:
         pass
 
     def serialize(self) -> dict[str, SerializedValue]:
-        """Serialize the response to a dict, always including monitor and optionally error."""
+        """Serialize the response to a dict, always including monitor, and optionally error and retry counts."""
         return {
             "monitor": self.mon.serialize(),
-            **({"error": str(self.error)} if self.error else self._serialize())
+            **({"error": str(self.error)} if self.error else self._serialize()),
+            **({"attempts": self.stats.attempts, "retries": self.stats.retries} if self.stats is not None else {}),
         }
 
     @abstractmethod
@@ -1,8 +1,14 @@
 import sys
 import os
 
-from .vcp_abc import VCPError, VCPIOError, VCPPermissionError, parse_capabilities, VCPFeatureReturn
+from .vcp_abc import VCPError, VCPIOError, VCPPermissionError, parse_capabilities, VCPFeatureReturn, \
+    VCPChecksumError, VCPNullMessageError, VCPProtocolError, VCPTimeoutError, VCPUnsupportedError
+from .retry import RetryPolicy, RetryStats
 from .vcp_codes import get_vcp_com, VCPCommand
+from .caps_cache import CapsCache
+from .maxima_cache import MaximaCache
+from .value_cache import ValueCache
+from .caps_index import CapabilitiesIndex
 
 if os.environ.get("PYDDC_SKIP_DRIVER") is not None and os.environ.get("PYDDC_SKIP_DRIVER").casefold() == "true":
     from .vcp_abc import VCP as ABCVCP
@@ -14,3 +20,15 @@ else:
     else:
         raise NotImplementedError(
             f"Your OS is not supported. Supported OSs are: Windows, Linux. Detected system: {sys.platform}")
+
+
+def __getattr__(name: str):
+    # these pull in asyncio and concurrent.futures, which would slow down every import of pyddc, so they are
+    # only loaded on first use
+    if name == "WriteBehindQueue":
+        from .write_behind import WriteBehindQueue
+        return WriteBehindQueue
+    if name == "AsyncVCP":
+        from .async_vcp import AsyncVCP
+        return AsyncVCP
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import TracebackType
+from typing import Callable, Iterable, Optional, Type, TypeVar, TYPE_CHECKING
+
+from .scheduler import bus_scheduler
+from .vcp_abc import VCP_TIMEOUT
+
+if TYPE_CHECKING:
+    from .caps_cache import CapsCache
+    from .caps_index import CapabilitiesIndex
+    from .vcp_abc import VCP, VCPFeatureReturn, Capabilities
+    from .vcp_codes import VCPCommand
+
+T = TypeVar("T")
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def bus_executor(bus: str) -> ThreadPoolExecutor:
+    """The single-thread executor that runs the I/O of every AsyncVCP on a bus, so that it is serialized."""
+    with _executors_lock:
+        executor = _executors.get(bus)
+        if executor is None:
+            executor = _executors[bus] = ThreadPoolExecutor(1, thread_name_prefix=f"pyddc-bus-{bus}")
+        return executor
+
+
+class AsyncVCP:
+    """
+    A VCP for asyncio code. Its blocking I/O runs on a thread dedicated to its bus, so that many monitors can be
+    driven from one event loop, while operations on the same bus run one at a time. The gap a bus needs between
+    transactions is waited out with asyncio.sleep before an operation is handed to that thread, rather than on it.
+    VCPs whose bus is unknown get a thread of their own.
+    """
+
+    def __init__(self, vcp: VCP):
+        self.vcp = vcp
+        self.bus = vcp.bus
+        if self.bus is None:
+            self._executor = ThreadPoolExecutor(1, thread_name_prefix="pyddc-vcp")
+        else:
+            self._executor = bus_executor(self.bus)
+
+    @staticmethod
+    async def get_vcps(vcp_class: Type[VCP]) -> list[AsyncVCP]:
+        """Enumerate vcp_class's monitors (e.g. pyddc.VCP) without blocking the event loop."""
+        vcps = await asyncio.get_running_loop().run_in_executor(None, vcp_class.get_vcps)
+        return [AsyncVCP(vcp) for vcp in vcps]
+
+    async def _run(self, operation: Callable[[], T]) -> T:
+        if self.bus is not None:
+            wait = bus_scheduler(self.bus).ready_in()
+            if wait:
+                await asyncio.sleep(wait)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, operation)
+
+    async def __aenter__(self) -> AsyncVCP:
+        await self._run(self.vcp.__enter__)
+        return self
+
+    async def __aexit__(
+            self,
+            exception_type: Optional[Type[BaseException]],
+            exception_value: Optional[BaseException],
+            exception_traceback: Optional[TracebackType],
+    ) -> Optional[bool]:
+        return await self._run(partial(self.vcp.__exit__, exception_type, exception_value, exception_traceback))
+
+    async def set_vcp_feature(self, com: VCPCommand, value: int, timeout: float = VCP_TIMEOUT):
+        await self._run(partial(self.vcp.set_vcp_feature, com, value, timeout))
+
+    async def get_vcp_feature(self, com: VCPCommand, timeout: float = VCP_TIMEOUT) -> VCPFeatureReturn:
+        return await self._run(partial(self.vcp.get_vcp_feature, com, timeout))
+
+    async def get_vcp_features(
+            self,
+            coms: Iterable[VCPCommand],
+            timeout: float = VCP_TIMEOUT,
+            supported: Optional[CapabilitiesIndex] = None,
+    ) -> dict[int, VCPFeatureReturn | Exception]:
+        return await self._run(partial(self.vcp.get_vcp_features, list(coms), timeout, supported))
+
+    async def set_vcp_features(
+            self,
+            values: Iterable[tuple[VCPCommand, int]],
+            timeout: float = VCP_TIMEOUT,
+            supported: Optional[CapabilitiesIndex] = None,
+    ) -> dict[int, Optional[Exception]]:
+        return await self._run(partial(self.vcp.set_vcp_features, list(values), timeout, supported))
+
+    async def get_vcp_feature_max(self, com: VCPCommand, timeout: float = VCP_TIMEOUT) -> int:
+        return await self._run(partial(self.vcp.get_vcp_feature_max, com, timeout))
+
+    async def get_vcp_capabilities(
+            self,
+            timeout: float = VCP_TIMEOUT,
+            cache: Optional[CapsCache] = None,
+            refresh: bool = False,
+    ) -> str:
+        return await self._run(partial(self.vcp.get_vcp_capabilities, timeout, cache, refresh))
+
+    async def get_parsed_capabilities(
+            self,
+            timeout: float = VCP_TIMEOUT,
+            cache: Optional[CapsCache] = None,
+            refresh: bool = False,
+            keys: Optional[Iterable[str]] = None,
+    ) -> dict[str, Capabilities]:
+        return await self._run(partial(self.vcp.get_parsed_capabilities, timeout, cache, refresh, keys))
+
+    async def get_capabilities_index(
+            self,
+            timeout: float = VCP_TIMEOUT,
+            cache: Optional[CapsCache] = None,
+            refresh: bool = False,
+            keys: Optional[Iterable[str]] = None,
+    ) -> CapabilitiesIndex:
+        return await self._run(partial(self.vcp.get_capabilities_index, timeout, cache, refresh, keys))
+
+    async def get_edid_blob(self) -> bytes:
+        return await self._run(self.vcp.get_edid_blob)
+
+    async def get_edid_fingerprint(self) -> str:
+        return await self._run(self.vcp.get_edid_fingerprint)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Iterator, Optional
+
+
+def backoff_delays(first: float, factor: float, maximum: float, deadline: float) -> Iterator[float]:
+    """
+    Yield the delays to sleep before each attempt of a retried operation: first, then growing by factor up
+    to maximum, until the monotonic clock reaches deadline. The last delay is cut short to end at the
+    deadline, and nothing is yielded once it has passed, so the caller's loop ends on its own.
+    """
+    delay = first
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        yield min(delay, remaining)
+        delay = min(delay * factor, maximum)
+
+
+def retry_until(attempt: Callable[[], bool], first: float, factor: float, maximum: float,
+                timeout: float) -> Optional[float]:
+    """
+    Call attempt until it returns True, sleeping backoff_delays between calls, for up to timeout seconds.
+    Returns the seconds spent retrying, or None if it timed out.
+    """
+    if attempt():
+        return 0.0
+    start = time.monotonic()
+    for delay in backoff_delays(first, factor, maximum, start + timeout):
+        time.sleep(delay)
+        if attempt():
+            return time.monotonic() - start
+    return None
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Generic, Optional, TypeVar
+
+_log = getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("PYDDC_NO_CACHE", "").casefold() != "true"
+
+
+def cache_dir() -> Path:
+    """
+    Directory for pyddc's persistent caches. PYDDC_CACHE_DIR overrides the platform default
+    (%LOCALAPPDATA%\\pyddc\\cache on Windows, $XDG_CACHE_HOME/pyddc elsewhere).
+    """
+    override = os.environ.get("PYDDC_CACHE_DIR")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+        return Path(base) / "pyddc" / "cache"
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pyddc"
+
+
+def edid_fingerprint(edid: bytes) -> str:
+    return hashlib.blake2b(edid, digest_size=16).hexdigest()
+
+
+class JSONStore:
+    """
+    A JSON document in the cache directory. The stores are only ever an optimization, so a missing,
+    unreadable or corrupt file loads as None, and failing to write is logged rather than raised.
+    """
+
+    def __init__(self, name: str, directory: Optional[Path] = None):
+        self.name = name
+        self.directory = directory
+
+    @property
+    def path(self) -> Path:
+        # resolved on every access, so a store created at import time follows PYDDC_CACHE_DIR changes
+        return (self.directory if self.directory is not None else cache_dir()) / self.name
+
+    def load(self) -> Optional[Any]:
+        if not cache_enabled():
+            return None
+        try:
+            with open(self.path, "r", encoding="utf8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            _log.debug(f"ignoring unreadable cache file {self.path}: {err}")
+            return None
+
+    def save(self, data: Any) -> None:
+        if not cache_enabled():
+            return
+        path = self.path
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf8") as file:
+                json.dump(data, file)
+            # atomic, so concurrent readers never see a partially written file
+            os.replace(tmp_path, path)
+        except OSError as err:
+            _log.debug(f"could not write cache file {path}: {err}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class FingerprintCache(Generic[T]):
+    """
+    Entries stored on disk, one JSON file per monitor in a subdirectory of the cache directory, and keyed by the
+    EDID fingerprint of the monitor. Entries are also kept in memory once loaded, so that repeated lookups in
+    one process skip the disk. Subclasses convert entries to and from JSON with _encode and _decode; an entry
+    that fails to decode, or was written with another version, is ignored.
+    """
+
+    def __init__(self, subdirectory: str, version: int, directory: Optional[Path] = None):
+        self.subdirectory = subdirectory
+        self.version = version
+        self.directory = directory
+        self._loaded: dict[Path, T] = {}
+
+    def _store(self, fingerprint: str) -> JSONStore:
+        return JSONStore(f"{self.subdirectory}/{fingerprint}.json", self.directory)
+
+    def _encode(self, entry: T) -> dict[str, Any]:
+        raise NotImplementedError
+
+    def _decode(self, data: dict[str, Any]) -> T:
+        """The entry in data; raises KeyError, TypeError, ValueError or AttributeError if it is malformed."""
+        raise NotImplementedError
+
+    def _load(self, fingerprint: str) -> Optional[T]:
+        if not cache_enabled():
+            return None
+        store = self._store(fingerprint)
+        # keyed by path rather than fingerprint, so that changing the cache directory does not serve stale entries
+        if store.path in self._loaded:
+            return self._loaded[store.path]
+        data = store.load()
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            return None
+        try:
+            entry = self._decode(data)
+        except (KeyError, TypeError, ValueError, AttributeError) as err:
+            _log.debug(f"ignoring malformed cache entry {store.path}: {err}")
+            return None
+        self._loaded[store.path] = entry
+        return entry
+
+    def _save(self, fingerprint: str, entry: T) -> None:
+        if not cache_enabled():
+            return
+        store = self._store(fingerprint)
+        self._loaded[store.path] = entry
+        store.save({"version": self.version, **self._encode(entry)})
+
+    def invalidate(self, fingerprint: str) -> None:
+        store = self._store(fingerprint)
+        self._loaded.pop(store.path, None)
+        store.clear()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Optional
+
+from .cache import FingerprintCache
+from .caps_index import CapabilitiesIndex
+from .vcp_abc import Capabilities, Capability, parse_capabilities
+
+CAPS_CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CachedCapabilities:
+    raw: str
+    parsed: dict[str, Capabilities]
+
+    @cached_property
+    def index(self) -> CapabilitiesIndex:
+        return CapabilitiesIndex.from_parsed(self.parsed)
+
+
+def _encode(caps: Capabilities | Capability) -> Any:
+    # JSON has no way to tell a key-value dict from a Capability, so both are tagged
+    if isinstance(caps, Capability):
+        return {"cap": caps.cap, "values": None if caps.values is None else [_encode(v) for v in caps.values]}
+    if isinstance(caps, dict):
+        return {"dict": {key: _encode(value) for key, value in caps.items()}}
+    if isinstance(caps, list):
+        return [_encode(item) for item in caps]
+    return caps
+
+
+def _decode(data: Any) -> Capabilities | Capability:
+    if isinstance(data, dict):
+        if "dict" in data:
+            return {key: _decode(value) for key, value in data["dict"].items()}
+        return Capability(data["cap"], None if data["values"] is None else [_decode(v) for v in data["values"]])
+    if isinstance(data, list):
+        return [_decode(item) for item in data]
+    if isinstance(data, (int, str)):
+        return data
+    raise ValueError(f"unexpected value in cached capabilities: {data!r}")
+
+
+class CapsCache(FingerprintCache[CachedCapabilities]):
+    """
+    Capabilities strings, and their parsed form, stored on disk and keyed by the EDID fingerprint of the
+    monitor they came from. A monitor's capabilities are fixed for a given EDID, and fetching them takes
+    dozens of bus round trips, so a cache hit saves seconds per monitor.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        super().__init__("caps", CAPS_CACHE_VERSION, directory)
+
+    def _encode(self, entry: CachedCapabilities) -> dict[str, Any]:
+        return {"raw": entry.raw, "parsed": _encode(entry.parsed)}
+
+    def _decode(self, data: dict[str, Any]) -> CachedCapabilities:
+        raw = data["raw"]
+        parsed = _decode(data["parsed"])
+        if not isinstance(raw, str) or not isinstance(parsed, dict):
+            raise ValueError(f"unexpected cached capabilities: {raw!r}")
+        return CachedCapabilities(raw, parsed)
+
+    def get(self, fingerprint: str) -> Optional[CachedCapabilities]:
+        return self._load(fingerprint)
+
+    def put(self, fingerprint: str, caps_str: str) -> CachedCapabilities:
+        cached = CachedCapabilities(caps_str, parse_capabilities(caps_str))
+        self._save(fingerprint, cached)
+        return cached
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from .vcp_abc import Capabilities, Capability
+
+
+@dataclass(frozen=True, slots=True)
+class FeatureCaps:
+    code: int | str
+    # the listed values in their original order; nested capabilities are kept as they were parsed
+    values: tuple[int | str | Capability, ...]
+    # the same values, for membership tests; nested capabilities are not hashable, and can't be set anyway
+    value_set: frozenset[int | str]
+
+
+_EMPTY_SET: frozenset = frozenset()
+
+
+def _feature(cap: Capability) -> FeatureCaps:
+    values = tuple(cap.values) if cap.values else ()
+    value_set = frozenset(v for v in values if not isinstance(v, Capability)) if values else _EMPTY_SET
+    return FeatureCaps(cap.cap, values, value_set)
+
+
+def page_capabilities(caps: Capabilities) -> list[Capability]:
+    """The capabilities listed under a "cmds" or "vcp" page key."""
+    # a page key with no value (or a malformed one) parses to something other than a list
+    return [cap for cap in caps if isinstance(cap, Capability)] if isinstance(caps, list) else []
+
+
+@dataclass(frozen=True, slots=True)
+class CapabilitiesIndex:
+    """
+    A read-only view of parsed capabilities, indexed for constant-time queries on what a monitor supports.
+    "cmds" and "vcp" pages are recognized by their key prefix, as monitors use keys like "VCP" or "vcp_p02".
+    Queries without a page look at every page.
+    """
+    attributes: Mapping[str, Capabilities]
+    cmds: Mapping[str, tuple[int | str, ...]]
+    vcps: Mapping[str, Mapping[int | str, FeatureCaps]]
+    _commands: frozenset[int | str]
+    _values: Mapping[int | str, frozenset[int | str]]
+
+    @classmethod
+    def from_parsed(cls, caps: dict[str, Capabilities]) -> CapabilitiesIndex:
+        attributes = {}
+        cmds = {}
+        vcps = {}
+        for name, value in caps.items():
+            # page names repeat across every monitor of a fleet
+            name = sys.intern(name)
+            if name.lower().startswith("cmd"):
+                cmds[name] = tuple(cap.cap for cap in page_capabilities(value))
+            elif name.lower().startswith("vcp"):
+                # a code listed twice keeps its last entry, like a dict built from the list would
+                vcps[name] = MappingProxyType({cap.cap: _feature(cap) for cap in page_capabilities(value)})
+            else:
+                attributes[name] = value
+        values: dict[int | str, frozenset[int | str]] = {}
+        for page in vcps.values():
+            for code, feature in page.items():
+                values[code] = values[code] | feature.value_set if code in values else feature.value_set
+        return cls(
+            MappingProxyType(attributes),
+            MappingProxyType(cmds),
+            MappingProxyType(vcps),
+            frozenset(code for page in cmds.values() for code in page),
+            MappingProxyType(values),
+        )
+
+    def supports(self, code: int, page: Optional[str] = None) -> bool:
+        """Whether a VCP code is listed, on the given page or on any page."""
+        if page is None:
+            return code in self._values
+        return code in self.vcps.get(page, {})
+
+    def allowed_values(self, code: int, page: Optional[str] = None) -> Optional[frozenset[int | str]]:
+        """
+        The values listed for a VCP code, on the given page or on any page, or None if the code is not listed.
+        An empty set means the code does not list its values (e.g. it is continuous).
+        """
+        if page is None:
+            return self._values.get(code)
+        feature = self.vcps.get(page, {}).get(code)
+        return None if feature is None else feature.value_set
+
+    def supports_value(self, code: int, value: int, page: Optional[str] = None) -> bool:
+        """Whether a value is listed for a VCP code. Codes that do not list their values allow any value."""
+        allowed = self.allowed_values(code, page)
+        return allowed is not None and (not allowed or value in allowed)
+
+    def supports_command(self, code: int) -> bool:
+        """Whether a DDC/CI command is listed on any "cmds" page."""
+        return code in self._commands
@@ -0,0 +1,130 @@
+"""
+Encoding and decoding of DDC/CI frames, for drivers that talk to the monitor over I2C themselves.
+
+A DDCCodec owns every buffer its frames live in, so that encoding a request or decoding a reply does not
+allocate: request frames are templates with their fixed bytes and those bytes' checksum precomputed, and
+replies are read straight into a preallocated buffer and decoded in place. The buffers are reused by every
+call, so a codec must not be shared between threads; drivers keep one per monitor connection.
+"""
+
+from __future__ import annotations
+
+import operator
+import struct
+from functools import reduce
+
+from .vcp_abc import VCPProtocolError
+
+DDCCI_ADDR = 0x37  # DDC-CI command address on the I2C bus
+HOST_ADDRESS = 0x51  # virtual I2C slave address of the host
+HOST_RECEIVE_ADDRESS = 0x50  # virtual I2C slave address of the host when receiving, part of reply checksums
+PROTOCOL_FLAG = 0x80  # protocol flag is bit 7 of the length byte
+HEADER_LENGTH = 2  # source address and length
+
+# VCP commands
+GET_VCP_CMD = 0x01  # get VCP feature command
+GET_VCP_REPLY = 0x02  # get VCP feature reply code
+SET_VCP_CMD = 0x03  # set VCP feature command
+GET_VCP_CAPS_CMD = 0xF3  # Capabilities Request command
+GET_VCP_CAPS_REPLY = 0xE3  # Capabilities Request reply
+
+# Replies are read whole, in a single I2C transaction of the longest frame they can be: source address, length,
+# data, checksum. Each separate read would be a transaction of its own that has the monitor resend from the start.
+GET_VCP_REPLY_FRAME_LENGTH = 11  # 8 bytes of data
+CAPS_REPLY_FRAME_LENGTH = 38  # 3 bytes of data, and up to 32 characters of the string
+MAX_REPLY_FRAME_LENGTH = CAPS_REPLY_FRAME_LENGTH
+
+_GET_VCP_REPLY = struct.Struct(">BBBBHH")  # reply code, result code, opcode, type code, maximum, current value
+_CAPS_REPLY = struct.Struct(">BH")  # reply code, offset
+
+
+def checksum(data: bytes | bytearray | memoryview, initial: int = 0) -> int:
+    return reduce(operator.xor, data, initial)
+
+
+def hex_dump(data: bytes | bytearray | memoryview) -> str:
+    """Bytes as spaced hex digits. Building this costs more than the I/O it describes, so only log it when
+    debug logging is enabled."""
+    return bytes(data).hex(" ").upper()
+
+
+class RequestFrame:
+    """
+    A request frame for one opcode. Its header, opcode and the checksum of those are set up once; encoding
+    only writes the argument bytes and folds them into the checksum.
+    """
+    __slots__ = ("buffer", "_checksum")
+
+    def __init__(self, opcode: int, arg_count: int):
+        length = 1 + arg_count
+        self.buffer = bytearray(HEADER_LENGTH + length + 1)
+        self.buffer[0] = HOST_ADDRESS
+        self.buffer[1] = length | PROTOCOL_FLAG
+        self.buffer[2] = opcode
+        # the destination address is not sent, but is part of the checksum
+        self._checksum = checksum(self.buffer[:3], DDCCI_ADDR << 1)
+
+    def encode(self, *args: int) -> bytearray:
+        buffer = self.buffer
+        value = self._checksum
+        for index, arg in enumerate(args, 3):
+            buffer[index] = arg
+            value ^= arg
+        buffer[-1] = value
+        return buffer
+
+
+class DDCCodec:
+    __slots__ = ("_get_vcp", "_set_vcp", "_caps", "reply", "_prefixes")
+
+    def __init__(self):
+        self._get_vcp = RequestFrame(GET_VCP_CMD, 1)
+        self._set_vcp = RequestFrame(SET_VCP_CMD, 3)
+        self._caps = RequestFrame(GET_VCP_CAPS_CMD, 2)
+        self.reply = bytearray(MAX_REPLY_FRAME_LENGTH)
+        # views of the first n bytes of the reply buffer, for every n
+        view = memoryview(self.reply)
+        self._prefixes = tuple(view[:length] for length in range(MAX_REPLY_FRAME_LENGTH + 1))
+
+    def get_vcp_request(self, code: int) -> bytearray:
+        return self._get_vcp.encode(code)
+
+    def set_vcp_request(self, code: int, value: int) -> bytearray:
+        return self._set_vcp.encode(code, (value >> 8) & 0xFF, value & 0xFF)
+
+    def caps_request(self, offset: int) -> bytearray:
+        return self._caps.encode((offset >> 8) & 0xFF, offset & 0xFF)
+
+    def reply_buffer(self, frame_length: int) -> memoryview:
+        """The buffer to read a reply of up to frame_length bytes into."""
+        return self._prefixes[frame_length]
+
+    def check_reply(self, size: int) -> tuple[int, int]:
+        """
+        Validate the framing of a reply of size bytes read into reply_buffer. Returns its data length, and the
+        XOR of its checksum with the expected one, i.e. 0 if it is intact.
+        """
+        if size <= HEADER_LENGTH:
+            raise VCPProtocolError("received truncated response")
+        length = self.reply[1] & ~PROTOCOL_FLAG  # clear protocol flag
+        end = HEADER_LENGTH + length
+        if end >= size:
+            raise VCPProtocolError(f"received response length {length} exceeds the {size} byte frame read")
+        # anything the monitor sent after the checksum is padding
+        # the host's receive address is not sent, but is part of the checksum
+        return length, self.reply[end] ^ checksum(self._prefixes[end], HOST_RECEIVE_ADDRESS)
+
+    def get_vcp_reply(self, length: int) -> tuple[int, int, int, int, int, int]:
+        """Unpack a checked Get VCP Feature reply: reply code, result code, opcode, type code, maximum, current value."""
+        if length != _GET_VCP_REPLY.size:
+            raise VCPProtocolError("received malformed response payload")
+        return _GET_VCP_REPLY.unpack_from(self.reply, HEADER_LENGTH)
+
+    def caps_reply(self, length: int) -> tuple[int, int, str]:
+        """Unpack a checked Capabilities Reply: reply code, offset, string fragment."""
+        if length < _CAPS_REPLY.size:
+            raise VCPProtocolError(f"received unexpected response length: {length}")
+        reply_code, offset = _CAPS_REPLY.unpack_from(self.reply, HEADER_LENGTH)
+        start = HEADER_LENGTH + _CAPS_REPLY.size
+        fragment = self.reply[start:HEADER_LENGTH + length].decode("ascii", errors="replace")
+        return reply_code, offset, fragment
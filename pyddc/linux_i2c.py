@@ -0,0 +1,77 @@
+"""
+Picks how to talk to an I2C adapter from the functionality flags the kernel reports for it (the I2C_FUNCS
+ioctl), and how to check that a DDC/CI device answers on it. Makes no system calls, so this module is
+importable on any OS.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+# functionality flags, from linux/i2c.h
+I2C_FUNC_I2C = 0x00000001  # plain I2C transfers: read(), write() and I2C_RDWR
+I2C_FUNC_SMBUS_READ_I2C_BLOCK = 0x04000000  # SMBus I2C block reads of up to 32 bytes
+I2C_FUNC_SMBUS_WRITE_I2C_BLOCK = 0x08000000
+
+_FUNC_NAMES = {
+    I2C_FUNC_I2C: "i2c",
+    I2C_FUNC_SMBUS_READ_I2C_BLOCK: "smbus-read-i2c-block",
+    I2C_FUNC_SMBUS_WRITE_I2C_BLOCK: "smbus-write-i2c-block",
+}
+
+# Ways to read an EDID, cheapest first:
+# - "rdwr": one combined I2C_RDWR transaction per segment (offset write and read, with a segment pointer write
+#   for EDIDs over 256 bytes)
+# - "plain": an offset write, then a read, as separate transactions; only reaches the first 256 bytes
+# - "smbus": SMBus I2C block reads of 32 bytes each; only reaches the first 256 bytes
+EDID_MODES = ("rdwr", "plain", "smbus")
+
+
+@dataclass(frozen=True)
+class TransferModes:
+    # how DDC/CI requests and replies are sent: "readwrite" (read() and write()), or None if the adapter can not
+    # carry DDC/CI, which needs raw I2C reads of a whole reply frame
+    ddc: Optional[str]
+    # how the EDID is read over I2C, one of EDID_MODES, or None if the adapter can not read it
+    edid: Optional[str]
+
+    def __str__(self) -> str:
+        return f"ddc={self.ddc or 'unsupported'} edid={self.edid or 'unsupported'}"
+
+
+def edid_modes(funcs: int) -> list[str]:
+    """The EDID_MODES the adapter supports, cheapest first."""
+    modes = []
+    if funcs & I2C_FUNC_I2C:
+        modes += ["rdwr", "plain"]
+    if funcs & I2C_FUNC_SMBUS_READ_I2C_BLOCK:
+        modes.append("smbus")
+    return modes
+
+
+def transfer_modes(funcs: int, failed_edid_modes: frozenset[str] = frozenset()) -> TransferModes:
+    """The cheapest transfer modes the adapter supports, leaving out EDID modes that were tried and failed."""
+    ddc = "readwrite" if funcs & I2C_FUNC_I2C else None
+    edid = next((mode for mode in edid_modes(funcs) if mode not in failed_edid_modes), None)
+    return TransferModes(ddc, edid)
+
+
+def describe_funcs(funcs: int) -> str:
+    names = [name for flag, name in _FUNC_NAMES.items() if funcs & flag]
+    return f"0x{funcs:08X} ({', '.join(names) or 'none of interest'})"
+
+
+def probe_method(policy: str, display_bus: bool, enumerating: bool, known_good: bool) -> Optional[str]:
+    """
+    How to check that a DDC/CI device answers when a bus is opened, per a LinuxVCP.PROBE policy: "write" (a
+    zero-length write, answered by an ACK), "read" (a 1-byte read), or None to not check. Enumeration always
+    checks, since finding out what answers is its purpose.
+    """
+    if policy in ("write", "read"):
+        return policy
+    if not enumerating and (policy == "none" or (policy == "cached" and known_good)):
+        return None
+    # A zero-length write to 0x37 is a command to some devices that are not monitors (e.g. it selects the
+    # page of a DDR4 SPD EEPROM), so only buses known to drive a display get it.
+    return "write" if display_bus else "read"
@@ -0,0 +1,168 @@
+"""
+Readers for the parts of the Linux sysfs tree that describe I2C adapters and display connectors. These only touch the filesystem,
+never the bus, so they are cheap enough to run on every command. Every function takes the sysfs root as an
+argument so that tests can point it at a fake tree; this module is importable on any OS.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+SYSFS_ROOT = "/sys"
+
+_CONNECTOR_NAME = re.compile(r"card\d+-.+")
+_DRM_CARD_NAME = re.compile(r"card\d+")
+
+
+def _bus_number(name: str) -> Optional[int]:
+    prefix, _, number = name.partition("-")
+    if prefix != "i2c" or not number.isdecimal():
+        return None
+    return int(number)
+
+
+def i2c_adapters(root: str = SYSFS_ROOT) -> list[str]:
+    """The bus numbers of all i2c-dev adapters, in ascending numeric order."""
+    try:
+        names = os.listdir(os.path.join(root, "class", "i2c-dev"))
+    except OSError:
+        return []
+    numbers = [num for num in map(_bus_number, names) if num is not None]
+    return [str(num) for num in sorted(numbers)]
+
+
+def i2c_buses(root: str = SYSFS_ROOT) -> Optional[list[str]]:
+    """
+    The bus numbers of all I2C adapters on the i2c bus, in the order udev enumerates them (by device path),
+    or None if sysfs can not be read. Client devices on the buses (e.g. "5-0050") are skipped.
+    """
+    devices = os.path.join(root, "bus", "i2c", "devices")
+    try:
+        names = os.listdir(devices)
+    except OSError:
+        return None
+    adapters = [(os.path.realpath(os.path.join(devices, name)), num)
+                for name, num in zip(names, map(_bus_number, names)) if num is not None]
+    return [str(num) for _, num in sorted(adapters)]
+
+
+@dataclass(frozen=True)
+class DRMConnector:
+    name: str  # e.g. "card0-DP-1"
+    status: str  # "connected", "disconnected" or "unknown"
+    bus_number: Optional[str]  # the I2C adapter wired to the connector's DDC lines, if the driver exposes it
+
+    @property
+    def connected(self) -> bool:
+        return self.status == "connected"
+
+
+def _connector_bus(path: str) -> Optional[str]:
+    # HDMI/DVI/VGA connectors link their DDC adapter as "ddc"; DP connectors own their AUX adapter as a child "i2c-N"
+    try:
+        target = os.path.basename(os.readlink(os.path.join(path, "ddc")))
+        number = _bus_number(target)
+        if number is not None:
+            return str(number)
+    except OSError:
+        pass
+    try:
+        numbers = sorted(num for num in map(_bus_number, os.listdir(path)) if num is not None)
+    except OSError:
+        return None
+    return str(numbers[0]) if numbers else None
+
+
+def drm_connectors(root: str = SYSFS_ROOT) -> list[DRMConnector]:
+    """All display connectors in /sys/class/drm, sorted by name."""
+    drm = os.path.join(root, "class", "drm")
+    try:
+        names = sorted(name for name in os.listdir(drm) if _CONNECTOR_NAME.fullmatch(name))
+    except OSError:
+        return []
+    connectors = []
+    for name in names:
+        path = os.path.join(drm, name)
+        try:
+            with open(os.path.join(path, "status"), "r", encoding="ascii") as file:
+                status = file.read().strip() or "unknown"
+        except OSError:
+            status = "unknown"
+        connectors.append(DRMConnector(name, status, _connector_bus(path)))
+    return connectors
+
+
+def display_buses(connectors: list[DRMConnector]) -> dict[str, str]:
+    """Map the bus numbers behind connected connectors to their connector names."""
+    return {con.bus_number: con.name for con in connectors if con.connected and con.bus_number is not None}
+
+
+def topology_complete(connectors: list[DRMConnector]) -> bool:
+    """
+    Whether the DRM connectors account for every connected display on them, i.e. none is connected without
+    its DDC adapter exposed, and something is connected at all. GPUs that register no connectors (see
+    adapters_without_drm) are not accounted for here.
+    """
+    connected = [con for con in connectors if con.connected]
+    return bool(connected) and all(con.bus_number is not None for con in connected)
+
+
+def _display_controller(path: str) -> Optional[str]:
+    # the nearest ancestor of a device that is a PCI display controller (class 0x03xxxx)
+    parent = os.path.dirname(path)
+    while parent != path:
+        path = parent
+        try:
+            with open(os.path.join(path, "class"), "r", encoding="ascii") as file:
+                if file.read().strip().lower().startswith("0x03"):
+                    return path
+        except OSError:
+            pass
+        parent = os.path.dirname(path)
+    return None
+
+
+def _has_drm_card(device: str) -> bool:
+    try:
+        return any(_DRM_CARD_NAME.fullmatch(name) for name in os.listdir(os.path.join(device, "drm")))
+    except OSError:
+        return False
+
+
+def adapters_without_drm(root: str = SYSFS_ROOT) -> list[str]:
+    """
+    The bus numbers of the I2C adapters on display controllers that have no DRM card, in ascending numeric order.
+    Their driver registers no connectors (e.g. NVIDIA's proprietary driver without KMS), so monitors on these
+    buses are missing from the DRM topology, however complete it looks.
+    """
+    devices = os.path.join(root, "bus", "i2c", "devices")
+    try:
+        names = os.listdir(devices)
+    except OSError:
+        return []
+    numbers = []
+    for name, num in zip(names, map(_bus_number, names)):
+        if num is None:
+            continue
+        controller = _display_controller(os.path.realpath(os.path.join(devices, name)))
+        if controller is not None and not _has_drm_card(controller):
+            numbers.append(num)
+    return [str(num) for num in sorted(numbers)]
+
+
+def connector_edid(connector: str, root: str = SYSFS_ROOT) -> Optional[bytes]:
+    """
+    The EDID the kernel read from the display on a connector, or None if there is none (nothing connected,
+    or the driver does not expose it). Only complete blobs of 128-byte blocks are returned.
+    """
+    try:
+        with open(os.path.join(root, "class", "drm", connector, "edid"), "rb") as file:
+            edid = file.read()
+    except OSError:
+        return None
+    if not edid or len(edid) % 128:
+        return None
+    return edid
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Optional
+
+from .cache import FingerprintCache
+
+MAXIMA_CACHE_VERSION = 1
+
+
+class MaximaCache(FingerprintCache[dict[int, int]]):
+    """
+    The maxima of continuous VCP features, stored on disk and keyed by the EDID fingerprint of the monitor
+    they were read from. A set is checked against the feature's maximum, so knowing it saves a Get VCP Feature
+    round trip before every set.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        super().__init__("maxima", MAXIMA_CACHE_VERSION, directory)
+
+    def _encode(self, entry: dict[int, int]) -> dict[str, Any]:
+        # JSON object keys are strings
+        return {"maxima": {str(code): maximum for code, maximum in entry.items()}}
+
+    def _decode(self, data: dict[str, Any]) -> dict[int, int]:
+        return {int(code): maximum for code, maximum in data["maxima"].items()
+                if isinstance(maximum, int) and not isinstance(maximum, bool)}
+
+    def get(self, fingerprint: str) -> dict[int, int]:
+        """The stored maxima by feature code; empty if there are none."""
+        return dict(self._load(fingerprint) or {})
+
+    def put(self, fingerprint: str, code: int, maximum: int) -> None:
+        maxima = self.get(fingerprint)
+        maxima[code] = maximum
+        self._save(fingerprint, maxima)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+        func: Callable[[T], R],
+        items: Iterable[T],
+        max_workers: int,
+        timeout: float,
+        default: R,
+        abandon: Optional[Callable[[T], None]] = None,
+) -> list[R]:
+    """
+    Run func over items on at most max_workers threads and return the results in the order of items.
+    Each call gets timeout seconds from the moment it starts running; a call that overruns is abandoned, its
+    result replaced by default, and abandon (if given) called with its item, so that the call can tell that
+    whatever it does from then on is unwanted. A new thread takes over the abandoned one's share of the
+    remaining items. Exceptions raised by func propagate.
+
+    The threads are daemon threads, so a call that never returns does not keep the interpreter from exiting.
+    """
+    items = list(items)
+    if not items:
+        return []
+    results: list[R] = [default] * len(items)
+    errors: list[BaseException] = []
+    started: dict[int, float] = {}
+    # indices that returned, raised or were abandoned
+    finished: set[int] = set()
+    remaining = iter(range(len(items)))
+    stopped = False
+    state = threading.Condition()
+
+    def work() -> None:
+        while True:
+            with state:
+                index = None if stopped else next(remaining, None)
+                if index is None:
+                    return
+                started[index] = time.monotonic()
+            try:
+                result = func(items[index])
+            except BaseException as err:
+                with state:
+                    if index not in finished:
+                        finished.add(index)
+                        errors.append(err)
+                        state.notify()
+                return
+            with state:
+                if index in finished:
+                    # abandoned; another thread has taken over
+                    return
+                finished.add(index)
+                results[index] = result
+                state.notify()
+
+    def spawn() -> None:
+        threading.Thread(target=work, name="pyddc-bounded-map", daemon=True).start()
+
+    with state:
+        for _ in range(min(max_workers, len(items))):
+            spawn()
+        try:
+            while len(finished) < len(items) and not errors:
+                now = time.monotonic()
+                deadlines = []
+                for index, start in started.items():
+                    if index in finished:
+                        continue
+                    if now - start < timeout:
+                        deadlines.append(start + timeout - now)
+                        continue
+                    finished.add(index)
+                    if abandon is not None:
+                        abandon(items[index])
+                    spawn()
+                if len(finished) < len(items):
+                    # items yet to start get their own deadline when they do, and waking up to find it is cheap
+                    state.wait(min(deadlines, default=timeout))
+            if errors:
+                raise errors[0]
+        finally:
+            stopped = True
+    return results
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+K = TypeVar("K")
+C = TypeVar("C")
+
+
+class ConnectionPool(Generic[K, C]):
+    """
+    Open connections kept between uses, at most one per key, each until it has been idle for the timeout it was
+    returned with. A connection is checked out with take and handed back with give, so that it is never used
+    by two callers at once; a caller that finds none opens its own. Expired connections are closed whenever the
+    pool is used, and all of them by close_all.
+    """
+
+    def __init__(self, close: Callable[[C], None]):
+        self._close = close
+        self._lock = threading.Lock()
+        # key -> (connection, monotonic time it expires at)
+        self._idle: dict[K, tuple[C, float]] = {}
+
+    def take(self, key: K) -> Optional[C]:
+        """Check out the idle connection for key, or None if there is none."""
+        with self._lock:
+            entry = self._idle.pop(key, None)
+            expired = self._pop_expired()
+        self._close_all(expired)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            self._close_all([entry[0]])
+            return None
+        return entry[0]
+
+    def give(self, key: K, connection: C, idle_timeout: float) -> None:
+        """Hand back a connection for reuse. Closes it instead if it would expire at once, or if key has one."""
+        with self._lock:
+            expired = self._pop_expired()
+            if idle_timeout <= 0 or key in self._idle:
+                expired.append(connection)
+            else:
+                self._idle[key] = (connection, time.monotonic() + idle_timeout)
+        self._close_all(expired)
+
+    def discard(self, key: K) -> None:
+        """Close the idle connection for key, if there is one."""
+        with self._lock:
+            entry = self._idle.pop(key, None)
+        if entry is not None:
+            self._close_all([entry[0]])
+
+    def close_all(self) -> None:
+        with self._lock:
+            connections = [connection for connection, _ in self._idle.values()]
+            self._idle.clear()
+        self._close_all(connections)
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def _pop_expired(self) -> list[C]:
+        now = time.monotonic()
+        expired = [key for key, (_, expires) in self._idle.items() if expires <= now]
+        return [self._idle.pop(key)[0] for key in expired]
+
+    def _close_all(self, connections: list[C]) -> None:
+        # closing is I/O, so it happens outside the lock; a connection that fails to close is gone either way
+        for connection in connections:
+            try:
+                self._close(connection)
+            except OSError:
+                pass
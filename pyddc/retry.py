@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import Callable, Mapping, TypeVar
+
+from .backoff import backoff_delays
+
+T = TypeVar("T")
+
+# Retries allowed per kind of transient error (VCPError.kind). A garbled reply is usually a one-off, while
+# a bus that fails outright or a monitor that doesn't answer in time is likely to do it again.
+DEFAULT_MAX_RETRIES = {
+    "checksum": 3,
+    "null_message": 3,
+    "protocol": 2,
+    "io": 1,
+    "timeout": 0,
+}
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    # retries allowed per error kind; kinds not listed are not retried
+    max_retries: Mapping[str, int] = field(default_factory=lambda: dict(DEFAULT_MAX_RETRIES))
+    # seconds before the first retry, growing by backoff_factor up to backoff_max
+    backoff: float = 0.02
+    backoff_factor: float = 2.0
+    backoff_max: float = 0.2
+    # seconds all attempts of one operation may take; no retry starts after it
+    deadline: float = 1.0
+
+
+@dataclass
+class RetryStats:
+    attempts: int = 0
+    retries: int = 0
+
+    def add(self, other: RetryStats) -> None:
+        self.attempts += other.attempts
+        self.retries += other.retries
+
+
+def call_with_retries(operation: Callable[[], T], policy: RetryPolicy, stats: RetryStats, logger: Logger) -> T:
+    """
+    Call operation, retrying it after errors whose kind the policy allows retries for, with backoff, until it
+    succeeds, runs out of retries for a kind, or the policy's deadline passes. The last error propagates.
+    Attempts and retries are counted in stats.
+    """
+    delays = backoff_delays(policy.backoff, policy.backoff_factor, policy.backoff_max,
+                            time.monotonic() + policy.deadline)
+    retries: dict[str, int] = {}
+    while True:
+        stats.attempts += 1
+        try:
+            return operation()
+        except Exception as err:
+            kind = getattr(err, "kind", None)
+            if kind is None or retries.get(kind, 0) >= policy.max_retries.get(kind, 0):
+                raise
+            delay = next(delays, None)
+            if delay is None:
+                raise
+            retries[kind] = retries.get(kind, 0) + 1
+            stats.retries += 1
+            logger.debug(f"retrying in {delay * 1000:.0f}ms after {kind} error: {err}")
+            time.sleep(delay)
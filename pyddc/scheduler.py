@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class BusScheduler:
+    """
+    Spaces out the transactions on one bus, on the monotonic clock. Each transaction leaves the bus idle for a
+    gap that depends on what it was, and the next one only waits out what is left of that gap. Transactions are
+    serialized, so threads sharing a bus can't interleave their requests and replies.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # monotonic time the gap after the last transaction ends at
+        self._ready_at = 0.0
+
+    def ready_in(self) -> float:
+        """Seconds until the gap after the last transaction ends; 0 if it has."""
+        return max(self._ready_at - time.monotonic(), 0.0)
+
+    @contextmanager
+    def transaction(self, gap: float) -> Iterator[float]:
+        """Run a transaction, leaving the bus idle for gap seconds after it. Yields the seconds waited for it."""
+        with self._lock:
+            wait = self.ready_in()
+            if wait:
+                time.sleep(wait)
+            try:
+                yield wait
+            finally:
+                self._ready_at = time.monotonic() + gap
+
+
+_schedulers: dict[str, BusScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def bus_scheduler(bus: str) -> BusScheduler:
+    """The scheduler for a bus, shared by everything in this process that uses it."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(bus)
+        if scheduler is None:
+            scheduler = _schedulers[bus] = BusScheduler()
+        return scheduler
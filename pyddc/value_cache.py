@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import time
+from typing import Iterable, Mapping, Optional
+
+from .vcp_abc import VCPFeatureReturn
+from .vcp_codes import VCPCodes
+
+# Codes whose value changes without being set, so that a cached one would be wrong: active control (0x52) is a
+# FIFO of the controls last changed on the front panel, and reading it pops the oldest.
+VOLATILE_CODES = frozenset({VCPCodes.active_control.value})
+
+# seconds a read value is served from the cache; short, since the front panel can change most values
+DEFAULT_TTL = 1.0
+
+
+class ValueCache:
+    """
+    Feature values read from or written to one monitor, each served for its code's TTL after that. Set a VCP's
+    value_cache to one to use it; a VCP clears it whenever its context is entered, since the monitor may have
+    changed in between. Codes with a TTL of 0, and the volatile ones, are never cached.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, ttls: Optional[Mapping[int, float]] = None,
+                 volatile: Iterable[int] = VOLATILE_CODES):
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.volatile = frozenset(volatile)
+        self.hits = 0
+        self.misses = 0
+        # code -> (value, monotonic time it expires at)
+        self._entries: dict[int, tuple[VCPFeatureReturn, float]] = {}
+
+    def cacheable(self, code: int) -> bool:
+        return code not in self.volatile and self.ttl_for(code) > 0
+
+    def ttl_for(self, code: int) -> float:
+        return self.ttls.get(code, self.ttl)
+
+    def get(self, code: int) -> Optional[VCPFeatureReturn]:
+        """The cached value of code, or None if it has none, or it expired. Counts a hit or a miss if cacheable."""
+        if not self.cacheable(code):
+            return None
+        entry = self._entries.get(code)
+        if entry is None or entry[1] <= time.monotonic():
+            self._entries.pop(code, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, code: int, value: VCPFeatureReturn) -> None:
+        if self.cacheable(code):
+            self._entries[code] = (value, time.monotonic() + self.ttl_for(code))
+
+    def written(self, code: int, value: int, maximum: Optional[int] = None) -> None:
+        """
+        Update code after value was written to it. Its maximum is kept from the cached value, or taken from maximum;
+        without either, the value can't be cached and is dropped.
+        """
+        entry = self._entries.get(code)
+        if entry is not None:
+            maximum = entry[0].max
+        if maximum is None:
+            self._entries.pop(code, None)
+        else:
+            self.put(code, VCPFeatureReturn(value, maximum))
+
+    def invalidate(self, code: Optional[int] = None) -> None:
+        """Drop the cached value of code, or of every code if it is None."""
+        if code is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(code, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
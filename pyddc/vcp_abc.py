@@ -1,21 +1,60 @@
 from __future__ import annotations
 
 import abc
+import re
 from dataclasses import dataclass
 
 from logging import getLogger
 from types import TracebackType
-from typing import Optional, Type, List
+from typing import Callable, Iterable, Iterator, Optional, Type, List, TypeVar, TYPE_CHECKING
 
+from .cache import edid_fingerprint
+from .retry import RetryPolicy, RetryStats, call_with_retries
 from .vcp_codes import VCPCodes, VCPCommand
 
+if TYPE_CHECKING:
+    from .caps_cache import CapsCache, CachedCapabilities
+    from .maxima_cache import MaximaCache
+    from .value_cache import ValueCache
+    from .caps_index import CapabilitiesIndex
+
+
+T = TypeVar("T")
+
 
 class VCPError(Exception):
-    pass
+    # which class of transient failure this is, for RetryPolicy; None if retrying can't help
+    kind: Optional[str] = None
 
 
 class VCPIOError(VCPError):
-    pass
+    """Communication with the monitor failed."""
+    kind = "io"
+
+
+class VCPChecksumError(VCPIOError):
+    """A reply arrived with a checksum that does not match its contents."""
+    kind = "checksum"
+
+
+class VCPNullMessageError(VCPIOError):
+    """The monitor replied with a null message, i.e. it was not ready to answer."""
+    kind = "null_message"
+
+
+class VCPProtocolError(VCPIOError):
+    """A reply arrived intact, but was truncated, malformed, or not a reply to the request."""
+    kind = "protocol"
+
+
+class VCPTimeoutError(VCPIOError):
+    """No valid reply arrived in time, or the bus was not free in time."""
+    kind = "timeout"
+
+
+class VCPUnsupportedError(VCPIOError):
+    """The monitor reported that it does not support the VCP code."""
+    kind = None
 
 
 class VCPPermissionError(VCPError):
@@ -32,16 +71,32 @@ VCP_TIMEOUT = 0.04  # at least 40ms per the DDC-CI specification
 
 
 class VCP(abc.ABC):
+    # Whether the driver fetches capabilities in fragments, retrying each one per retry_policy. Otherwise a
+    # capabilities fetch is retried as a whole.
+    RETRIES_CAPS_FRAGMENTS = False
 
     @abc.abstractmethod # pragma: no cover
     def __init__(self):
         self.logger = getLogger(__name__)
         self.code_maximum: dict[int, int] = {}
+        # where code_maximum is stored between sessions, if anywhere; see _maxima_fingerprint
+        self.maxima_cache: Optional[MaximaCache] = None
+        self._maxima_loaded = False
+        self._maxima_key: Optional[str] = None
+        # feature values served without a read for a while after they were read or written, if set
+        self.value_cache: Optional[ValueCache] = None
+        # how operations are retried after transient errors, and how many attempts and retries they took so far
+        self.retry_policy = RetryPolicy()
+        self.retry_stats = RetryStats()
         self._in_ctx = False
 
     @abc.abstractmethod # pragma: no cover
     def __enter__(self):
         self._in_ctx = True
+        # the bus may have a different monitor on it by now
+        self._maxima_loaded = False
+        if self.value_cache is not None:
+            self.value_cache.invalidate()
         return self
 
     @abc.abstractmethod # pragma: no cover
@@ -63,7 +118,18 @@ class VCP(abc.ABC):
             if value > maximum:
                 raise ValueError(f"value of {value} exceeds code maximum of {maximum} for {code.name}")
         self.logger.debug(f"SetVCPFeature(_, {repr(code)}, {value=})")
-        self._set_vcp_feature(code, value, timeout)
+        try:
+            self._with_retries(lambda: self._set_vcp_feature(code, value, timeout))
+        except Exception:
+            # the write may or may not have taken effect
+            if self.value_cache is not None:
+                self.value_cache.invalidate(code.code)
+            raise
+        if self.value_cache is not None:
+            if code.code == VCPCodes.restore_factory_default:
+                self.value_cache.invalidate()
+            else:
+                self.value_cache.written(code.code, value, self.code_maximum.get(code.code))
 
     # TODO: discuss whether we need/want timeout here
     @abc.abstractmethod # pragma: no cover
@@ -74,23 +140,180 @@ class VCP(abc.ABC):
         assert self._in_ctx, "This function must be run within the context manager"
         if not com.readable:
             raise TypeError(f"cannot read write-only code: {com}")
+        if self.value_cache is not None:
+            cached = self.value_cache.get(com.code)
+            if cached is not None:
+                self.logger.debug(f"GetVCPFeatureAndVCPFeatureReply(_, {repr(com)}, None, _, _) served from cache")
+                return cached
         self.logger.debug(f"GetVCPFeatureAndVCPFeatureReply(_, {repr(com)}, None, _, _)")
-        ret = self._get_vcp_feature(com, timeout)
+        ret = self._with_retries(lambda: self._get_vcp_feature(com, timeout))
         if com.code == VCPCodes.input_source:
             # The input source sometimes has a high byte that needs to be masked out.
             # Requires further research. Just copy monitorcontrol for now and ignore it.
             ret = VCPFeatureReturn(ret.value & 0xff, ret.max & 0xff)
         if not com.discrete:
-            self.code_maximum[com.code] = ret.max
+            self._learn_maximum(com.code, ret.max)
+        if self.value_cache is not None:
+            self.value_cache.put(com.code, ret)
         return ret
 
     @abc.abstractmethod # pragma: no cover
     def _get_vcp_feature(self, code: VCPCommand, timeout: float) -> VCPFeatureReturn:
         pass
 
-    def get_vcp_capabilities(self, timeout: float = VCP_TIMEOUT) -> str:
+    def get_vcp_features(
+            self,
+            coms: Iterable[VCPCommand],
+            timeout: float = VCP_TIMEOUT,
+            supported: Optional[CapabilitiesIndex] = None,
+    ) -> dict[int, VCPFeatureReturn | Exception]:
+        """
+        Read several features in turn, returning each one's value or error by code. An error doesn't stop the
+        rest from being read. With the monitor's capabilities, codes it doesn't list get a VCPUnsupportedError
+        without being sent.
+        """
+        assert self._in_ctx, "This function must be run within the context manager"
+        results: dict[int, VCPFeatureReturn | Exception] = {}
+        for com in coms:
+            results[com.code] = self._batched(com, supported, lambda: self.get_vcp_feature(com, timeout))
+        return results
+
+    def set_vcp_features(
+            self,
+            values: Iterable[tuple[VCPCommand, int]],
+            timeout: float = VCP_TIMEOUT,
+            supported: Optional[CapabilitiesIndex] = None,
+    ) -> dict[int, Optional[Exception]]:
+        """
+        Like get_vcp_features, but setting each feature to its value, in turn. Successful sets give None.
+        VCPCommand is not hashable, so the values are given as (feature, value) pairs rather than a mapping.
+        """
+        assert self._in_ctx, "This function must be run within the context manager"
+        results: dict[int, Optional[Exception]] = {}
+        for com, value in values:
+            results[com.code] = self._batched(com, supported, lambda: self.set_vcp_feature(com, value, timeout))
+        return results
+
+    def _batched(
+            self,
+            com: VCPCommand,
+            supported: Optional[CapabilitiesIndex],
+            operation: Callable[[], T],
+    ) -> T | Exception:
+        if supported is not None and not supported.supports(com.code):
+            return VCPUnsupportedError(f"{com.name} is not listed in the monitor's capabilities")
+        try:
+            return operation()
+        except (VCPError, TypeError, ValueError) as err:
+            self.logger.debug(f"{com.name} failed in batch: {err}")
+            return err
+
+    def get_vcp_capabilities(
+            self,
+            timeout: float = VCP_TIMEOUT,
+            cache: Optional[CapsCache] = None,
+            refresh: bool = False,
+    ) -> str:
+        """
+        Get the capabilities string. With a cache, it is looked up by the monitor's EDID first, and only
+        fetched from the monitor (and then stored) on a miss, or when refresh is set.
+        """
+        assert self._in_ctx, "This function must be run within the context manager"
+        return self._get_capabilities(timeout, cache, refresh).raw
+
+    def get_parsed_capabilities(
+            self,
+            timeout: float = VCP_TIMEOUT,
+            cache: Optional[CapsCache] = None,
+            refresh: bool = False,
+            keys: Optional[Iterable[str]] = None,
+    ) -> dict[str, Capabilities]:
+        """
+        Like get_vcp_capabilities, but parsed. Cache hits skip parsing as well.
+        If only some top-level keys are needed, and no cache is given (or the monitor's EDID can't be read), fetching
+        from the monitor stops as soon as they have been received, and the result may lack other keys. With a cache,
+        a miss fetches and caches everything, so that later calls are served from it.
+        """
+        assert self._in_ctx, "This function must be run within the context manager"
+        return self._get_capabilities(timeout, cache, refresh, keys).parsed
+
+    def get_capabilities_index(
+            self,
+            timeout: float = VCP_TIMEOUT,
+            cache: Optional[CapsCache] = None,
+            refresh: bool = False,
+            keys: Optional[Iterable[str]] = None,
+    ) -> CapabilitiesIndex:
+        """Like get_parsed_capabilities, but indexed for queries. Cache hits reuse the index built for the entry."""
         assert self._in_ctx, "This function must be run within the context manager"
-        return self._get_vcp_capabilities_str(timeout)
+        return self._get_capabilities(timeout, cache, refresh, keys).index
+
+    def iter_vcp_capabilities(self, timeout: float = VCP_TIMEOUT) -> Iterator[str]:
+        """
+        Fetch the capabilities string from the monitor, yielding chunks as they arrive. Closing the iterator
+        early stops the fetch. Drivers that can only fetch the whole string yield it as one chunk.
+        """
+        assert self._in_ctx, "This function must be run within the context manager"
+        return self._iter_vcp_capabilities(timeout)
+
+    def _iter_vcp_capabilities(self, timeout: float) -> Iterator[str]:
+        yield self._get_vcp_capabilities_str(timeout)
+
+    def _get_capabilities(
+            self,
+            timeout: float,
+            cache: Optional[CapsCache],
+            refresh: bool,
+            keys: Optional[Iterable[str]] = None,
+    ) -> CachedCapabilities:
+        # imported here, as caps_cache builds on this module
+        from .caps_cache import CachedCapabilities
+        fingerprint = None
+        if cache is not None:
+            try:
+                fingerprint = self.get_edid_fingerprint()
+            except VCPError as err:
+                self.logger.debug(f"not caching capabilities, could not read EDID: {err}")
+        if fingerprint is not None and not refresh:
+            cached = cache.get(fingerprint)
+            if cached is not None:
+                self.logger.debug(f"capabilities cache hit for {fingerprint}")
+                return cached
+        if fingerprint is not None:
+            # a partial fetch can't be cached, and then every later call would go back to the monitor
+            keys = None
+        if self.RETRIES_CAPS_FRAGMENTS:
+            caps_str, partial = self._fetch_capabilities(timeout, keys)
+        else:
+            caps_str, partial = self._with_retries(lambda: self._fetch_capabilities(timeout, keys))
+        if partial is not None:
+            return CachedCapabilities(caps_str, partial)
+        if fingerprint is not None:
+            return cache.put(fingerprint, caps_str)
+        return CachedCapabilities(caps_str, parse_capabilities(caps_str))
+
+    def _fetch_capabilities(
+            self,
+            timeout: float,
+            keys: Optional[Iterable[str]],
+    ) -> tuple[str, Optional[dict[str, Capabilities]]]:
+        """
+        Fetch the capabilities string from the monitor. If keys are given, stop as soon as they have been
+        received, and return the partial string with its parse; otherwise the parse is None.
+        """
+        if keys is None:
+            return self._get_vcp_capabilities_str(timeout), None
+        stream = CapabilitiesStream(keys)
+        chunks = self._iter_vcp_capabilities(timeout)
+        try:
+            for chunk in chunks:
+                if stream.feed(chunk):
+                    self.logger.debug(f"stopped fetching capabilities after {len(stream.text)} characters, "
+                                      f"with all of {sorted(stream.keys)}")
+                    return stream.text, stream.result()
+        finally:
+            chunks.close()
+        return stream.text, None
 
     @abc.abstractmethod # pragma: no cover
     def _get_vcp_capabilities_str(self, timeout: float) -> str:
@@ -101,17 +324,57 @@ class VCP(abc.ABC):
         if not com.readable:
             raise TypeError(f"code must be readable: {com.name}")
         feature_code = com.code
+        if feature_code not in self.code_maximum:
+            self._maxima_fingerprint()
         if feature_code in self.code_maximum:
             return self.code_maximum[feature_code]
         else:
-            maximum = self.get_vcp_feature(com, timeout).max
-            self.code_maximum[feature_code] = maximum
-            return maximum
+            return self.get_vcp_feature(com, timeout).max
+
+    def _maxima_fingerprint(self) -> Optional[str]:
+        """
+        The EDID fingerprint the maxima of this session's monitor are stored under, or None if they are not
+        stored. The first call in a session reads the EDID, and loads the stored maxima into code_maximum.
+        """
+        if self.maxima_cache is None:
+            return None
+        if not self._maxima_loaded:
+            self._maxima_loaded = True
+            try:
+                self._maxima_key = self.get_edid_fingerprint()
+            except VCPError as err:
+                self.logger.debug(f"not storing feature maxima, could not read EDID: {err}")
+                self._maxima_key = None
+            if self._maxima_key is not None:
+                # maxima read in this session are at least as fresh as the stored ones
+                self.code_maximum = {**self.maxima_cache.get(self._maxima_key), **self.code_maximum}
+        return self._maxima_key
+
+    def _learn_maximum(self, code: int, maximum: int) -> None:
+        fingerprint = self._maxima_fingerprint()
+        known = self.code_maximum.get(code)
+        self.code_maximum[code] = maximum
+        if fingerprint is not None and known != maximum:
+            self.logger.debug(f"storing maximum {maximum} of feature {code} (was {known}) for {fingerprint}")
+            self.maxima_cache.put(fingerprint, code, maximum)
+
+    def _with_retries(self, operation: Callable[[], T]) -> T:
+        return call_with_retries(operation, self.retry_policy, self.retry_stats, self.logger)
+
+    @property
+    def bus(self) -> Optional[str]:
+        """The bus the monitor is on, which transactions to it share with other monitors on it; None if unknown."""
+        return None
 
     def get_edid_blob(self) -> bytes:
         assert self._in_ctx, "This function must be run within the context manager"
         return self._get_edid_blob()
 
+    def get_edid_fingerprint(self) -> str:
+        """A short hash of the EDID, identifying the monitor in pyddc's persistent caches."""
+        assert self._in_ctx, "This function must be run within the context manager"
+        return edid_fingerprint(self._get_edid_blob())
+
     @abc.abstractmethod # pragma: no cover
     def _get_edid_blob(self) -> bytes:
         pass
@@ -121,6 +384,14 @@ class VCP(abc.ABC):
     def get_vcps() -> List[VCP]:
         pass
 
+    @classmethod
+    def get_vcp(cls, index: int) -> VCP:
+        """
+        Return the VCP at the given index of get_vcps(), raising IndexError if there is none.
+        Drivers can override this to resolve a single monitor without enumerating all of them.
+        """
+        return cls.get_vcps()[index]
+
 
 @dataclass
 class Capability:
@@ -128,145 +399,240 @@ class Capability:
     values: list[int | str] | None
 
 
-def _get_close_paren_index(caps_str: str, open_index: int) -> int:
-    assert caps_str[open_index] == '('
-    depth = 1
-    for close_index in range(open_index + 1, len(caps_str)):
-        char = caps_str[close_index]
-        if char == '(':
-            depth += 1
-        elif char == ')':
-            depth -= 1
-            if not depth:
-                break
-    else:
-        assert open_index + 1 == len(caps_str)
-        return len(caps_str)
-    if depth > 0:
-        # '(' without ')'; just ignore it
-        return len(caps_str)
-    assert caps_str[close_index] == ')'
-    return close_index
-
+Capabilities = int | str | list[Capability] | list[int] | dict[str, 'Capabilities']
 
-def _parse_caps_hex_list(caps_str: str) -> list[Capability]:
+# Some keys have standard meanings and expected value formats.
+_KNOWN_KEYS = ('prot', 'cmds', 'vcp', 'type', 'mccs_ver', 'asset_eep', 'mpu_ver', 'model',
+               'mswhql', 'gamma_table', 'c_tmp_ofst')
+# Some keys' values are expected to be lists of two-digit hexadecimal op-codes:
+# "cmds" lists supported monitor device protocol commands, and "vcp" lists
+# monitor control panel functions (some with associated enumeration values).
+# These keys may have a suffix, e.g. "vcp_p02" or "vcp_p10".
+_HEX_LIST_KEYS = ('cmds', 'vcp')
+
+_PARENS = re.compile(r'[()]')
+_KEY_CHARS = re.compile(r'[^(\s]*')
+_SPACE = re.compile(r'\s*')
+# Whitespace should not be meaningful in hex lists, and hinders parsing, so it is skipped;
+# only spaces and tabs though, to match how this has always been parsed.
+_HEX_LIST_SPACE = re.compile(r'[ \t]*')
+
+
+def _match_parens(caps_str: str) -> dict[int, int]:
+    """Map the index of every '(' to the index of its ')', or to the end of the string if it has none."""
+    matches = {}
+    stack = []
+    for match in _PARENS.finditer(caps_str):
+        if match.group() == '(':
+            stack.append(match.start())
+        elif stack:
+            matches[stack.pop()] = match.start()
+        # else: ')' without '('; it is parsed as part of a key
+    for open_index in stack:
+        # '(' without ')'; its value runs to the end of the string
+        matches[open_index] = len(caps_str)
+    return matches
+
+
+class _HexListFrame:
     # Data is a list of two-digit hexadecimal op-codes, possibly with associated enumeration values.
-    caps_data = []
-    index = 0
-    while index < len(caps_str):
-        if caps_str[index] == '(':
-            close_index = _get_close_paren_index(caps_str, index)
-            substr = caps_str[index + 1:close_index]
-            value = _parse_caps_hex_list(substr)
-            if caps_data and caps_data[-1].values is None:
-                # Associate enumeration values with op-code
-                caps_data[-1].values = [cap.cap if cap.values is None else cap for cap in value]
+    __slots__ = ("index", "end", "data")
+
+    def __init__(self, index: int, end: int):
+        self.index = index
+        self.end = end
+        self.data: list[Capability] = []
+
+    def run(self, caps_str: str, matches: dict[int, int]) -> _HexListFrame | None:
+        index, end, data = self.index, self.end, self.data
+        while True:
+            index = _HEX_LIST_SPACE.match(caps_str, index, end).end()
+            if index >= end:
+                break
+            char = caps_str[index]
+            if char == '(':
+                self.index = matches[index] + 1
+                return _HexListFrame(index + 1, matches[index])
+            next_index = _HEX_LIST_SPACE.match(caps_str, index + 1, end).end()
+            if next_index < end and caps_str[next_index] != '(':
+                value = char + caps_str[next_index]
+                index = next_index + 1
             else:
-                # Enumeration values have no prior op-code; this should not strictly happen.
-                # Examples: "vcps((01 02) 03 04)", or "vcps(01(02 03) (04 05) 06)", or
-                # "vcps(01(02(03)))", etc.
-                caps_data.extend(value)
-            index = close_index + 1
-        else:
-            size = 2 if index + 1 < len(caps_str) and caps_str[index + 1] != '(' else 1
-            value = caps_str[index:index + size]
+                value = char
+                index += 1
             try:
                 value = int(value, 16)
             except ValueError:
                 # invalid hex value; just ignore it and keep the string
                 pass
-            cap = Capability(value, None)
-            caps_data.append(cap)
-            index += size
-    return caps_data
-
-
-Capabilities = int | str | list[Capability] | list[int] | dict[str, 'Capabilities']
+            data.append(Capability(value, None))
+        self.index = index
+        return None
+
+    def resume(self, value: list[Capability]):
+        if self.data and self.data[-1].values is None:
+            # Associate enumeration values with op-code
+            self.data[-1].values = [cap.cap if cap.values is None else cap for cap in value]
+        else:
+            # Enumeration values have no prior op-code; this should not strictly happen.
+            # Examples: "vcps((01 02) 03 04)", or "vcps(01(02 03) (04 05) 06)", or
+            # "vcps(01(02(03)))", etc.
+            self.data.extend(value)
 
 
-def _parse_caps_dict(caps_str: str) -> dict[str, Capabilities]:
+class _DictFrame:
     # Data is a series of key-value pairs.
-    # Some keys have standard meanings and expected value formats.
-    known_keys = {'prot', 'cmds', 'vcp', 'type', 'mccs_ver', 'asset_eep', 'mpu_ver', 'model',
-                  'mswhql', 'gamma_table', 'c_tmp_ofst'}
-    caps_data = {}
-    key = ''
-    index = 0
-    while index < len(caps_str):
-        char = caps_str[index]
-        if char == '(':
-            close_index = _get_close_paren_index(caps_str, index)
-            substr = caps_str[index + 1:close_index]
-            # Apple Cinema Display monitors are known to use uppercase "VCP" keys.
-            # LG 24UD58 monitors are known to report the "model" value without a key,
-            # i.e. "24UD58cmds(...)" instead of "model(24UD58)cmds(...)".
-            for known_key in known_keys:
-                if key.lower().endswith(known_key):
-                    extra, key = key[:-len(known_key)], known_key
-                    if extra:
-                        # Treat the extra prefix as a key with no value
-                        caps_data[extra] = {}
-                    break
-            # Some keys' values are expected to be lists of two-digit hexadecimal op-codes:
-            # "cmds" lists supported monitor device protocol commands, and "vcp" lists
-            # monitor control panel functions (some with associated enumeration values).
-            # These keys may have a suffix, e.g. "vcp_p02" or "vcp_p10".
-            if any(key.lower().startswith(k) for k in {'cmds', 'vcp'}):
-                # Remove all whitespace; it should not be meaningful, and hinders parsing.
-                substr = substr.replace(' ', '').replace('\t', '')
-                value = _parse_caps_hex_list(substr)
+    __slots__ = ("index", "end", "data", "key")
+
+    def __init__(self, index: int, end: int):
+        self.index = index
+        self.end = end
+        self.data: dict[str, Capabilities] | str = {}
+        # the key of the parenthesized value being parsed by a child frame
+        self.key = ''
+
+    def run(self, caps_str: str, matches: dict[int, int]) -> _DictFrame | _HexListFrame | None:
+        index, end, data = self.index, self.end, self.data
+        key = ''
+        while index < end:
+            char = caps_str[index]
+            if char == '(':
+                # Apple Cinema Display monitors are known to use uppercase "VCP" keys.
+                # LG 24UD58 monitors are known to report the "model" value without a key,
+                # i.e. "24UD58cmds(...)" instead of "model(24UD58)cmds(...)".
+                lower_key = key.lower()
+                for known_key in _KNOWN_KEYS:
+                    if lower_key.endswith(known_key):
+                        extra, key = key[:-len(known_key)], known_key
+                        if extra:
+                            # Treat the extra prefix as a key with no value
+                            data[extra] = {}
+                        break
+                self.key = key
+                self.index = matches[index] + 1
+                if key.lower().startswith(_HEX_LIST_KEYS):
+                    return _HexListFrame(index + 1, matches[index])
+                return _DictFrame(index + 1, matches[index])
+            elif char.isspace():
+                if key:
+                    # Asus PB287 monitors are known to report the "model" value without parentheses,
+                    # i.e. "model LCDPB287" instead of "model(LCDPB287)".
+                    value_start = _SPACE.match(caps_str, index, end).end()
+                    index = _KEY_CHARS.match(caps_str, value_start, end).end()
+                    # Associate key with its value.
+                    data[key] = caps_str[value_start:index]
+                    key = ''
+                index += 1
             else:
-                value = _parse_caps_dict(substr)
-            if key:
-                # Associate key with its value.
-                caps_data[key] = value
-                key = ''
-            elif isinstance(value, dict) and not caps_data:
-                # The entire capabilities string is a parenthesized key-value dict itself.
-                caps_data = value
+                # a key runs up to the next '(' or whitespace, both of which end it
+                key_end = _KEY_CHARS.match(caps_str, index, end).end()
+                key = caps_str[index:key_end]
+                index = key_end
+        self.index = index
+        if key:
+            # The final key does not have a value.
+            if data:
+                data[key] = {}
             else:
-                # Value has no associated key; this should not strictly happen.
-                # Examples: "(prot monitor)", or "(prot(monitor)(type)(LCD)", or
-                # "(()(()())())", etc. Try to keep as much parsed data as possible anyway.
-                # It cannot be a hex list, because that would have been handled already.
-                assert not isinstance(value, list)
-                if isinstance(value, (int, str)):
-                    value = {value: {}}
-                # Un-nest the value, making sure that any keys shared with prior data
-                # do not overwrite prior data values.
-                caps_data = value | caps_data
-            index = close_index + 1
-        elif char.isspace():
-            if key:
-                # Asus PB287 monitors are known to report the "model" value without parentheses,
-                # i.e. "model LCDPB287" instead of "model(LCDPB287)".
-                value = ''
-                while index < len(caps_str) and caps_str[index].isspace():
-                    index += 1
-                while index < len(caps_str) and not caps_str[index].isspace() and caps_str[index] != '(':
-                    value += caps_str[index]
-                    index += 1
-                # Associate key with its value.
-                caps_data[key] = value
-                key = ''
-            index += 1
+                # This must be parsing a value substring of a full capabilities string;
+                # just return the string itself, e.g. "monitor" in "(prot(monitor))".
+                self.data = key
+        return None
+
+    def resume(self, value: Capabilities):
+        if self.key:
+            # Associate key with its value.
+            self.data[self.key] = value
+        elif isinstance(value, dict) and not self.data:
+            # The entire capabilities string is a parenthesized key-value dict itself.
+            self.data = value
         else:
-            key += char
-            index += 1
-    if key:
-        # The final key does not have a value.
-        if caps_data:
-            caps_data[key] = {}
-        else:
-            # This must be parsing a value substring of a full capabilities string;
-            # just return the string itself, e.g. "monitor" in "(prot(monitor))".
-            caps_data = key
-    return caps_data
+            # Value has no associated key; this should not strictly happen.
+            # Examples: "(prot monitor)", or "(prot(monitor)(type)(LCD)", or
+            # "(()(()())())", etc. Try to keep as much parsed data as possible anyway.
+            # It cannot be a hex list, because that would have been handled already.
+            if isinstance(value, (int, str)):
+                value = {value: {}}
+            # Un-nest the value, making sure that any keys shared with prior data
+            # do not overwrite prior data values.
+            self.data = value | self.data
+        self.key = ''
 
 
 def parse_capabilities(caps_str: str) -> dict[str, Capabilities]:
-    caps_dict = _parse_caps_dict(caps_str)
+    # Parenthesized values are parsed by child frames on an explicit stack rather than by recursion, and
+    # every frame works on index ranges of caps_str, so each character is looked at a constant number of
+    # times however deeply the string is nested.
+    matches = _match_parens(caps_str)
+    stack: list[_DictFrame | _HexListFrame] = [_DictFrame(0, len(caps_str))]
+    while True:
+        frame = stack[-1]
+        child = frame.run(caps_str, matches)
+        if child is not None:
+            stack.append(child)
+            continue
+        stack.pop()
+        if not stack:
+            break
+        stack[-1].resume(frame.data)
+    caps_dict = frame.data
     if not isinstance(caps_dict, dict):
         # The entire string is malformed to not be a series of key-value pairs.
         caps_dict = {'': caps_dict}
     return caps_dict
+
+
+class CapabilitiesStream:
+    """
+    Collects a capabilities string as it arrives in chunks, and tells when the given top-level keys have
+    been received in full, so that the rest of the string need not be fetched.
+
+    Top-level values are tracked by paren depth as chunks are fed; the received prefix is only parsed when
+    a top-level value closes, which happens once per key. Keys are matched as parse_capabilities outputs
+    them (e.g. "vcp" for a monitor that sends "VCP"). If a key is repeated later in the string, stopping
+    early keeps its first value instead of its last.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self.keys = frozenset(keys)
+        self._chunks: list[str] = []
+        self._length = 0
+        self._depth = 0
+        # depth at which top-level values close: 1 if the whole string is parenthesized, as it should be
+        self._top_depth: Optional[int] = None
+        # the parsed prefix that ended with the last top-level value, if it was parsed
+        self._prefix: Optional[dict[str, Capabilities]] = None
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> bool:
+        """Add a chunk, and return whether all keys have been received."""
+        offset = self._length
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        if not self.keys or self.done:
+            return self.done
+        closed_at = None
+        for match in _PARENS.finditer(chunk):
+            if self._top_depth is None:
+                leading = self.text[:offset + match.start()]
+                self._top_depth = 1 if match.group() == '(' and not leading.strip() else 0
+            if match.group() == '(':
+                self._depth += 1
+            elif self._depth:
+                self._depth -= 1
+                if self._depth == self._top_depth:
+                    closed_at = offset + match.end()
+        if closed_at is not None:
+            self._prefix = parse_capabilities(self.text[:closed_at])
+            self.done = self.keys.issubset(self._prefix)
+        return self.done
+
+    def result(self) -> dict[str, Capabilities]:
+        """The parsed string; only up to the last of the keys if all of them were received early."""
+        if self.done:
+            return self._prefix
+        return parse_capabilities(self.text)
@@ -2,45 +2,65 @@
 
 from __future__ import annotations
 
+from contextlib import contextmanager
 from types import TracebackType
-from typing import List, Optional, Type
+from typing import Iterator, List, Optional, Type
+import atexit
+import errno
 import os
-import struct
 import sys
+import threading
 import time
 import ctypes
-
+from logging import DEBUG
+
+from pyddc import linux_i2c, linux_sysfs
+from pyddc.backoff import backoff_delays, retry_until
+from pyddc.cache import JSONStore, edid_fingerprint
+from pyddc.ddc_codec import DDCCodec, DDCCI_ADDR, GET_VCP_REPLY, GET_VCP_CAPS_REPLY, GET_VCP_REPLY_FRAME_LENGTH, \
+    CAPS_REPLY_FRAME_LENGTH, hex_dump
+from pyddc.parallel import bounded_map
+from pyddc.pool import ConnectionPool
+from pyddc.scheduler import bus_scheduler
 from pyddc.vcp_codes import VCPCommand
-from pyddc.vcp_abc import VCP, VCPIOError, VCPPermissionError, VCPFeatureReturn
+from pyddc.vcp_abc import VCP, VCPIOError, VCPPermissionError, VCPFeatureReturn, VCPChecksumError, \
+    VCPNullMessageError, VCPProtocolError, VCPTimeoutError, VCPUnsupportedError
 
 assert sys.platform.startswith("linux"), "This file must be imported only for Linux"
 
 import fcntl
-import pyudev
-
-GET_VCP_HEADER_LENGTH = 2  # header packet length
-PROTOCOL_FLAG = 0x80  # protocol flag is bit 7 of the length byte
-
-# VCP commands
-GET_VCP_CMD = 0x01  # get VCP feature command
-GET_VCP_REPLY = 0x02  # get VCP feature reply code
-SET_VCP_CMD = 0x03  # set VCP feature command
-GET_VCP_CAPS_CMD = 0xF3  # Capabilities Request command
-GET_VCP_CAPS_REPLY = 0xE3  # Capabilities Request reply
 
 # timeouts
-CMD_RATE = 0.05  # at least 50ms between messages
+# Seconds a bus is left idle after each kind of transaction on it, before the next one of any kind. DDC/CI asks
+# for 50ms after a command or a reply; EDID reads and probes are plain I2C.
+COMMAND_GAPS = {"get": 0.05, "set": 0.05, "caps": 0.05, "probe": 0.0, "edid": 0.0}
+PROBE_TIMEOUT = 1.0  # seconds a single bus may take to answer its enumeration probe
+POLL_FIRST_WAIT = 0.005  # seconds before the first read attempt, when polling for a reply
+POLL_MAX_WAIT = 0.04  # longest wait between read attempts, when polling for a reply
+POLL_BACKOFF = 2.0  # growth of the wait between read attempts, when polling for a reply
+POLL_DEADLINE = 0.25  # seconds after a request that polling for its reply gives up
+LOCK_FIRST_WAIT = 0.002  # seconds before retrying for a bus another process has locked
+LOCK_MAX_WAIT = 0.05  # longest wait between attempts to lock a bus another process has locked
+
+# enumeration
+PROBE_WORKERS = 8  # maximum number of buses probed at once
 
 # addresses
 SEGMENT_ADDR = 0x30 # i2c segment address for EDIDs larger than 256 bytes
-DDCCI_ADDR = 0x37  # DDC-CI command address on the I2C bus
 EDID_I2C_ADDR = 0x50 # I2C slave address for EDID
-HOST_ADDRESS = 0x51  # virtual I2C slave address of the host
 I2C_SLAVE = 0x0703  # I2C bus slave address
 
 # flags
 I2C_M_RD = 0x0001  # read flag for I2C messages
 I2C_RDWR = 0x0707  # I2C_RDWR ioctl transaction structure
+I2C_FUNCS = 0x0705  # I2C adapter functionality query
+I2C_SMBUS = 0x0720  # SMBus transfer
+I2C_SMBUS_READ = 1  # read flag for SMBus transfers
+I2C_SMBUS_I2C_BLOCK_DATA = 8  # SMBus I2C block transfer size
+I2C_SMBUS_BLOCK_MAX = 32  # most bytes an SMBus block transfer can carry
+
+# errors an adapter raises for a transfer it does not support, as opposed to one that failed
+UNSUPPORTED_TRANSFER_ERRORS = {errno.EOPNOTSUPP, errno.EINVAL, errno.ENOTTY}
 
 class i2c_msg(ctypes.Structure):
     _fields_ = [
@@ -56,55 +76,234 @@ class i2c_rdwr_ioctl_data(ctypes.Structure):
         ("nmsgs", ctypes.c_uint32),
     ]
 
+class i2c_smbus_data(ctypes.Union):
+    _fields_ = [
+        ("byte", ctypes.c_uint8),
+        ("word", ctypes.c_uint16),
+        ("block", ctypes.c_uint8 * (I2C_SMBUS_BLOCK_MAX + 2)),
+    ]
+
+class i2c_smbus_ioctl_data(ctypes.Structure):
+    _fields_ = [
+        ("read_write", ctypes.c_uint8),
+        ("command", ctypes.c_uint8),
+        ("size", ctypes.c_uint32),
+        ("data", ctypes.POINTER(i2c_smbus_data)),
+    ]
+
 GET_VCP_RESULT_CODES = {
     0: "No Error",
     1: "Unsupported VCP code",
 }
 
+# Persisted result of the last enumeration: which bus each monitor index lives on, and the EDID fingerprint
+# of the monitor found there. It is trusted as long as the set of adapters in sysfs is unchanged, so that
+# resolving a single monitor does not have to open and probe every bus in the system; the monitor on a mapped
+# bus is still checked against its fingerprint when it is opened.
+BUS_MAP_VERSION = 1
+_bus_map = JSONStore("linux_bus_map.json")
 
-def _i2c_transaction(fd, addr, start_reg, length) -> bytes:
-    """Standard Atomic Write-then-Read."""
-    write_buf = ctypes.create_string_buffer(bytes([start_reg]))
-    read_buf = ctypes.create_string_buffer(length)
-    msgs = (i2c_msg * 2)(
-        i2c_msg(addr=addr, flags=0, len=1, buf=write_buf),
-        i2c_msg(addr=addr, flags=I2C_M_RD, len=length, buf=read_buf)
-    )
-    rdwr = i2c_rdwr_ioctl_data(msgs=msgs, nmsgs=2)
 
-    try:
-        fcntl.ioctl(fd, I2C_RDWR, rdwr)
-    except OSError as err:
-        raise VCPIOError("unable to communicate with I2C bus") from err
-    return read_buf.raw
+def _connector_states(connectors: list[linux_sysfs.DRMConnector]) -> dict[str, str]:
+    return {con.name: con.status for con in connectors}
+
 
+def _save_bus_map(adapters: list[str], connectors: list[linux_sysfs.DRMConnector], vcps: List[LinuxVCP]) -> None:
+    _bus_map.save({
+        "version": BUS_MAP_VERSION,
+        "adapters": adapters,
+        "connectors": _connector_states(connectors),
+        "monitors": [
+            {"bus": vcp.bus_number, "edid": vcp.edid_fingerprint, "connector": vcp.connector} for vcp in vcps
+        ],
+    })
 
-def _i2c_segmented_read(fd, segment_ptr, length) -> bytes:
+
+def _load_bus_map() -> Optional[list[dict]]:
+    """
+    The mapped monitors, or None if there is no map, or the adapter set or connector states (i.e. a monitor
+    was plugged in or out) changed since it was written.
+    """
+    bus_map = _bus_map.load()
+    if not isinstance(bus_map, dict) or bus_map.get("version") != BUS_MAP_VERSION:
+        return None
+    if bus_map.get("adapters") != linux_sysfs.i2c_adapters():
+        return None
+    if bus_map.get("connectors") != _connector_states(linux_sysfs.drm_connectors()):
+        return None
+    monitors = bus_map.get("monitors")
+    return monitors if isinstance(monitors, list) else None
+
+
+# When each bus last answered a probe, in seconds since the epoch, by bus number; see LinuxVCP.PROBE
+_probes = JSONStore("linux_probes.json")
+_probes_lock = threading.Lock()
+
+
+def _probed_recently(bus: str, ttl: float) -> bool:
+    probes = _probes.load()
+    if not isinstance(probes, dict):
+        return False
+    probed = probes.get(bus)
+    return isinstance(probed, (int, float)) and 0 <= time.time() - probed < ttl
+
+
+def _record_probe(bus: str, answered: bool) -> None:
+    # enumeration probes buses concurrently, and each records its own
+    with _probes_lock:
+        probes = _probes.load()
+        if not isinstance(probes, dict):
+            probes = {}
+        if answered:
+            probes[bus] = time.time()
+        elif probes.pop(bus, None) is None:
+            return
+        _probes.save(probes)
+
+
+# Per-process cache of each adapter's I2C_FUNCS flags, and of the EDID transfer modes that turned out not to
+# work on it despite its flags, by bus number.
+_adapter_funcs: dict[str, int] = {}
+_failed_edid_modes: dict[str, frozenset[str]] = {}
+
+
+class _EDIDTransfer:
     """
-    Atomic Segmented Read:
-    1. Write Segment Number to 0x30
-    2. Write Offset 0 to 0x50
-    3. Read N bytes from 0x50
+    The I2C_RDWR messages, SMBus transfer and buffers for reading an EDID, set up once per LinuxVCP and reused
+    for every read. The messages are laid out as a segmented read; a plain read of segment 0 skips the first one.
+    Transfers raise OSError, so that the caller can tell an unsupported transfer from a failed one.
     """
-    # If segment is 0, we don't strictly need the segment pointer write,
-    # but doing it anyway is more robust for some controllers.
-    seg_buf = ctypes.create_string_buffer(bytes([segment_ptr]))
-    off_buf = ctypes.create_string_buffer(bytes([0x00]))
-    read_buf = ctypes.create_string_buffer(length)
 
-    msgs = (i2c_msg * 3)(
-        i2c_msg(addr=SEGMENT_ADDR, flags=0, len=1, buf=seg_buf),
-        i2c_msg(addr=EDID_I2C_ADDR, flags=0, len=1, buf=off_buf),
-        i2c_msg(addr=EDID_I2C_ADDR, flags=I2C_M_RD, len=length, buf=read_buf)
-    )
+    def __init__(self):
+        self.segment = ctypes.create_string_buffer(1)
+        self.offset = ctypes.create_string_buffer(1)
+        self.data = ctypes.create_string_buffer(256)
+        self.msgs = (i2c_msg * 3)(
+            i2c_msg(addr=SEGMENT_ADDR, flags=0, len=1, buf=self.segment),
+            i2c_msg(addr=EDID_I2C_ADDR, flags=0, len=1, buf=self.offset),
+            i2c_msg(addr=EDID_I2C_ADDR, flags=I2C_M_RD, len=0, buf=self.data),
+        )
+        self.segmented = i2c_rdwr_ioctl_data(msgs=self.msgs, nmsgs=3)
+        offset_msg = ctypes.cast(ctypes.addressof(self.msgs) + ctypes.sizeof(i2c_msg), ctypes.POINTER(i2c_msg))
+        self.combined = i2c_rdwr_ioctl_data(msgs=offset_msg, nmsgs=2)
+        self.smbus_data = i2c_smbus_data()
+        self.smbus = i2c_smbus_ioctl_data(
+            read_write=I2C_SMBUS_READ, command=0, size=I2C_SMBUS_I2C_BLOCK_DATA, data=ctypes.pointer(self.smbus_data)
+        )
+
+    def read(self, mode: str, fd: int, offset: int, length: int) -> bytes:
+        """Read length bytes of the first EDID segment, starting at offset."""
+        if mode == "rdwr":
+            return self.read_combined(fd, offset, length)
+        # the other modes address the EDID directly, so the bus is pointed at it for the duration
+        fcntl.ioctl(fd, I2C_SLAVE, EDID_I2C_ADDR)
+        try:
+            if mode == "plain":
+                os.write(fd, bytes([offset]))
+                return os.read(fd, length)
+            return self.read_smbus(fd, offset, length)
+        finally:
+            fcntl.ioctl(fd, I2C_SLAVE, DDCCI_ADDR)
+
+    def read_combined(self, fd: int, offset: int, length: int) -> bytes:
+        """Standard Atomic Write-then-Read."""
+        self.offset[0] = offset
+        self.msgs[2].len = length
+        fcntl.ioctl(fd, I2C_RDWR, self.combined)
+        return self.data.raw[:length]
+
+    def read_segment(self, fd: int, segment: int, length: int) -> bytes:
+        """
+        Atomic Segmented Read:
+        1. Write Segment Number to 0x30
+        2. Write Offset 0 to 0x50
+        3. Read N bytes from 0x50
+        """
+        # If segment is 0, we don't strictly need the segment pointer write,
+        # but doing it anyway is more robust for some controllers.
+        self.segment[0] = segment
+        self.offset[0] = 0
+        self.msgs[2].len = length
+        fcntl.ioctl(fd, I2C_RDWR, self.segmented)
+        return self.data.raw[:length]
+
+    def read_smbus(self, fd: int, offset: int, length: int) -> bytes:
+        data = bytearray()
+        while len(data) < length:
+            chunk = min(I2C_SMBUS_BLOCK_MAX, length - len(data))
+            self.smbus.command = offset + len(data)
+            self.smbus_data.block[0] = chunk
+            fcntl.ioctl(fd, I2C_SMBUS, self.smbus)
+            data += bytes(self.smbus_data.block[1:1 + chunk])
+        return bytes(data)
+
+
+def _unlock(fd: int) -> None:
+    try:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    except OSError:
+        # a descriptor that is gone holds no lock
+        pass
 
-    rdwr = i2c_rdwr_ioctl_data(msgs=msgs, nmsgs=3)
 
-    try:
-        fcntl.ioctl(fd, I2C_RDWR, rdwr)
-    except OSError as err:
-        raise VCPIOError("unable to read from I2C bus") from err
-    return read_buf.raw
+# Bus locks kept past the end of a transaction until the gap after it has passed, so that another process can't
+# send to the monitor while it is still busy; by descriptor. Each maps to a token that the delayed unlock checks
+# is still the current one, so that a lock taken back by a later transaction isn't released from under it.
+_held_locks: dict[int, object] = {}
+_held_locks_lock = threading.Lock()
+
+
+def _unlock_after(fd: int, delay: float) -> None:
+    """Release fd's bus lock after delay seconds, unless it is taken back, or fd is closed, first."""
+    token = object()
+    with _held_locks_lock:
+        _held_locks[fd] = token
+    timer = threading.Timer(delay, _release_held_lock, (fd, token))
+    timer.daemon = True
+    timer.start()
+
+
+def _release_held_lock(fd: int, token: object) -> None:
+    with _held_locks_lock:
+        if _held_locks.get(fd) is not token:
+            return
+        del _held_locks[fd]
+        _unlock(fd)
+
+
+def _take_back_lock(fd: int) -> bool:
+    """Whether fd still holds the bus lock from its last transaction; it is then no longer released by itself."""
+    with _held_locks_lock:
+        return _held_locks.pop(fd, None) is not None
+
+
+def _close(fd: int) -> None:
+    # closing releases the lock, and the number may be reused by the next open, so it must not be unlocked later
+    _take_back_lock(fd)
+    os.close(fd)
+
+
+def _close_session(session: tuple[int, linux_i2c.TransferModes]) -> None:
+    _close(session[0])
+
+
+# Buses left open after use, with their transfer modes, by bus number; see LinuxVCP.POOL_IDLE_TIMEOUT
+_pool: ConnectionPool[str, tuple[int, linux_i2c.TransferModes]] = ConnectionPool(_close_session)
+atexit.register(_pool.close_all)
+
+
+def _udev_buses() -> list[str]:
+    # pyudev is slow to import and set up, so it is only loaded when sysfs can't be used directly
+    import pyudev
+    return [device.sys_number for device in pyudev.Context().list_devices(subsystem="i2c")]
+
+
+def _list_buses() -> list[str]:
+    if LinuxVCP.ENUMERATION.lower() == "sysfs":
+        buses = linux_sysfs.i2c_buses()
+        if buses is not None:
+            return buses
+    return _udev_buses()
 
 
 # references:
@@ -114,30 +313,151 @@ class LinuxVCP(VCP):
     # TODO: maybe generalize this into general VCP functionality, as it will become relevant when we
     #  create macOS driver, and make Windows driver low level
     CHECKSUM_ERRORS: str = "ignore"
-
-    def __init__(self, bus_number: str):
+    # Which buses get_vcps probes:
+    # - "all": every I2C adapter in the system
+    # - "drm": only adapters behind connected DRM connectors, per sysfs
+    # - "auto": "drm" if the DRM topology accounts for every connected connector, and no display controller has
+    #   I2C adapters without a DRM card (e.g. a second GPU run without KMS); otherwise "all"
+    DISCOVERY: str = "auto"
+    # How get_vcps lists I2C adapters: "sysfs" scans /sys/bus/i2c/devices directly, "udev" asks pyudev.
+    # "sysfs" falls back to "udev" if sysfs can not be read.
+    ENUMERATION: str = "sysfs"
+    # How replies are read; the default for read_strategy, which can be set per monitor:
+    # - "fixed": wait the full timeout, then read once, as the DDC/CI specification asks
+    # - "poll": read after POLL_FIRST_WAIT, then retry with backoff until a valid reply arrives, or
+    #   POLL_DEADLINE passes; for monitors that answer well before the timeout, or need longer than it
+    READ_STRATEGY: str = "fixed"
+    # Seconds a bus is kept open after use, so that the next use in this process skips opening and probing it.
+    # A bus is closed instead if it was used by a block that raised. 0 closes it after every use.
+    POOL_IDLE_TIMEOUT: float = 30.0
+    # How opening a bus checks that a DDC/CI device answers on it (enumeration always checks):
+    # - "none": don't; a missing device shows up as an error on the first command instead
+    # - "write": a zero-length write, which the device ACKs; costs no reply transfer
+    # - "cached": skip the check if the bus answered one within PROBE_TTL seconds, even in another process;
+    #   otherwise, "write" on buses known to drive a display, and "read" on any other
+    # - "read": a 1-byte read
+    # Adapters that can't send zero-length writes are checked with "read".
+    PROBE: str = "cached"
+    PROBE_TTL: float = 300.0
+    # Seconds a transaction waits for other processes to finish theirs on the same bus, or None to not lock
+    # buses. Each transaction holds an advisory flock on the bus device, which ddcutil takes too, until the gap
+    # after it has passed.
+    LOCK_TIMEOUT: Optional[float] = 5.0
+    # a capabilities fetch takes 20 or more round trips, so one bad reply only retries its own fragment
+    RETRIES_CAPS_FRAGMENTS = True
+
+    def __init__(
+            self,
+            bus_number: str,
+            edid_fingerprint: Optional[str] = None,
+            connector: Optional[str] = None,
+            map_index: Optional[int] = None,
+    ):
         super().__init__()
         self.bus_number = bus_number
         self.fd: Optional[int] = None
         self.fp: str = f"/dev/i2c-{self.bus_number}"
-        # time of last feature set call
-        self.last_set: Optional[float] = None
+        self.edid_fingerprint = edid_fingerprint
+        # the DRM connector (e.g. "card0-DP-1") driving this bus, if known
+        self.connector = connector
+        # the monitor index, if this VCP was resolved from the bus map instead of by enumeration
+        self._map_index = map_index
+        self.read_strategy = self.READ_STRATEGY
+        # frame and I2C message buffers, reused by every request
+        self._codec = DDCCodec()
+        self._edid_transfer = _EDIDTransfer()
+        # how this bus is talked to, per the adapter's functionality; set when opened
+        self.transfer_modes: Optional[linux_i2c.TransferModes] = None
+        # seconds between the last request and its valid reply
+        self.last_reply_time: Optional[float] = None
+        # whether this VCP is being opened by enumeration
+        self._enumerating = False
+        # whether enumeration gave up waiting for this VCP's probe, which must then leave no trace
+        self._abandoned = False
+        self._request_time = 0.0
+
+    @property
+    def bus(self) -> Optional[str]:
+        return self.bus_number
 
     def __enter__(self):
         super().__enter__()
+        mapped = self._map_index is not None
+        try:
+            self._take_session()
+        except VCPIOError:
+            bus = self.bus_number
+            if not mapped or not self._remap("failed to open") or self.bus_number == bus:
+                raise
+            super().__enter__()
+            self._take_session()
+        try:
+            confirmed = self._map_index is None or self._confirm_mapped_monitor()
+        except BaseException as err:
+            self.__exit__(type(err), err, err.__traceback__)
+            raise
+        if not confirmed:
+            index = self._map_index
+            self._release_session()
+            if not self._remap("has another monitor on it"):
+                raise VCPIOError(f"monitor {index} is no longer connected")
+            super().__enter__()
+            self._take_session()
+        if not mapped:
+            # the bus may have a different monitor on it by now; only a fingerprint read while entering (by
+            # confirming the mapped monitor, or by the enumeration remapping it) is known to be current
+            self.edid_fingerprint = None
+        # it's the monitor that was mapped, or one just found by enumeration
+        self._map_index = None
+        return self
 
+    def _take_session(self) -> None:
+        session = _pool.take(self.bus_number)
+        if session is not None and not self._enumerating:
+            # it answered when it was opened, and has not failed since
+            self.fd, self.transfer_modes = session
+            self.logger.debug(f"reusing open bus {self.bus_number}")
+            return
+        # enumeration always checks, even a bus that was in use a moment ago
+        self._open(session)
+
+    def _release_session(self) -> None:
+        _pool.give(self.bus_number, (self.fd, self.transfer_modes), self.POOL_IDLE_TIMEOUT)
+        self.fd = None
+        self._in_ctx = False
+
+    def _confirm_mapped_monitor(self) -> bool:
+        """Whether the monitor on a bus taken from the bus map is the one whose EDID fingerprint was mapped."""
+        if self.edid_fingerprint is None:
+            # its EDID couldn't be read when it was mapped, so there is nothing to compare
+            return True
+        found = self._read_edid_fingerprint()
+        if found != self.edid_fingerprint:
+            self.logger.debug(f"bus {self.bus_number} has EDID {found}, mapped as {self.edid_fingerprint}")
+            return False
+        return True
+
+    def _open(self, session: Optional[tuple[int, linux_i2c.TransferModes]] = None) -> None:
+        """Open the bus, or take over an already open session, and check that a device answers on it."""
         def cleanup():
             if self.fd is not None:
                 try:
-                    os.close(self.fd)
+                    _close(self.fd)
                 except OSError:
                     pass
             self._in_ctx = False
 
         try:
-            self.fd = os.open(self.fp, os.O_RDWR)
-            fcntl.ioctl(self.fd, I2C_SLAVE, DDCCI_ADDR)
-            self._read_bytes(1)
+            if session is None:
+                self.fd = os.open(self.fp, os.O_RDWR)
+                self.transfer_modes = self._get_transfer_modes()
+                if self.transfer_modes.ddc is None:
+                    raise VCPIOError(f"the adapter at {self.fp} can not carry DDC/CI")
+                fcntl.ioctl(self.fd, I2C_SLAVE, DDCCI_ADDR)
+            else:
+                self.fd, self.transfer_modes = session
+            with self._transaction("probe"):
+                self._check_device()
         except PermissionError as err:
             cleanup()
             raise VCPPermissionError(f"permission error for {self.fp}") from err
@@ -148,7 +468,64 @@ class LinuxVCP(VCP):
             cleanup()
             raise
 
-        return self
+    def _check_device(self) -> None:
+        policy = self.PROBE.lower()
+        known_good = (policy == "cached" and not self._enumerating
+                      and _probed_recently(self.bus_number, self.PROBE_TTL))
+        method = linux_i2c.probe_method(policy, self.connector is not None, self._enumerating, known_good)
+        if method == "write":
+            try:
+                self._write_ack()
+            except OSError as err:
+                if err.errno not in UNSUPPORTED_TRANSFER_ERRORS:
+                    raise
+                self.logger.debug(f"bus {self.bus_number} can't send zero-length writes ({err}), probing with a read")
+                method = "read"
+        if method == "read":
+            self._read_bytes(1)
+        self.logger.debug(f"probe on bus {self.bus_number}: {method or 'skipped'}")
+        if method is not None and policy == "cached" and not self._abandoned:
+            _record_probe(self.bus_number, True)
+
+    def _write_ack(self) -> None:
+        """A zero-length write to the DDC/CI address, which fails unless a device ACKs it."""
+        msg = i2c_msg(addr=DDCCI_ADDR, flags=0, len=0, buf=None)
+        fcntl.ioctl(self.fd, I2C_RDWR, i2c_rdwr_ioctl_data(msgs=ctypes.pointer(msg), nmsgs=1))
+
+    def _get_transfer_modes(self) -> linux_i2c.TransferModes:
+        funcs = _adapter_funcs.get(self.bus_number)
+        if funcs is None:
+            value = ctypes.c_ulong()
+            try:
+                fcntl.ioctl(self.fd, I2C_FUNCS, value)
+                funcs = value.value
+            except OSError as err:
+                # every i2c-dev adapter answers this; assume plain I2C, which is what was always used
+                self.logger.debug(f"I2C_FUNCS failed on bus {self.bus_number}: {err}")
+                funcs = linux_i2c.I2C_FUNC_I2C
+            _adapter_funcs[self.bus_number] = funcs
+            self.logger.debug(f"bus {self.bus_number} I2C_FUNCS={linux_i2c.describe_funcs(funcs)}")
+        modes = linux_i2c.transfer_modes(funcs, _failed_edid_modes.get(self.bus_number, frozenset()))
+        self.logger.debug(f"bus {self.bus_number} transfer modes: {modes}")
+        return modes
+
+    def _remap(self, reason: str) -> bool:
+        """
+        Called when a bus taken from the bus map fails to open, or has another monitor on it. Re-enumerates
+        (which rewrites the map) and points this VCP at the monitor now found at its index. Returns whether
+        there is one.
+        """
+        self.logger.debug(f"mapped bus {self.bus_number} {reason}, re-enumerating")
+        index, self._map_index = self._map_index, None
+        try:
+            fresh = LinuxVCP.get_vcps()[index]
+        except IndexError:
+            return False
+        self.bus_number = fresh.bus_number
+        self.fp = fresh.fp
+        self.edid_fingerprint = fresh.edid_fingerprint
+        self.connector = fresh.connector
+        return True
 
     def __exit__(
             self,
@@ -156,100 +533,132 @@ class LinuxVCP(VCP):
             exception_value: Optional[BaseException],
             exception_traceback: Optional[TracebackType],
     ) -> Optional[bool]:
-        try:
-            os.close(self.fd)
-        except OSError as err:
-            raise VCPIOError("unable to close descriptor") from err
-        self.fd = None
+        fd, self.fd = self.fd, None
+        # Only a failure to talk to the monitor, or an interrupted transaction (e.g. KeyboardInterrupt), says
+        # anything about the bus. Errors in what was asked of it (e.g. a value above the maximum, or a code the
+        # monitor reports unsupported) leave the session as good as it was.
+        bus_failed = exception_value is not None and (
+            not isinstance(exception_value, Exception)
+            or (isinstance(exception_value, (OSError, VCPIOError))
+                and not isinstance(exception_value, VCPUnsupportedError)))
+        if not bus_failed and not self._abandoned:
+            _pool.give(self.bus_number, (fd, self.transfer_modes), self.POOL_IDLE_TIMEOUT)
+        else:
+            # the bus may be in a bad state, or gone; the next use opens and probes it afresh
+            if self.PROBE.lower() == "cached" and not self._abandoned:
+                _record_probe(self.bus_number, False)
+            try:
+                _close(fd)
+            except OSError as err:
+                raise VCPIOError("unable to close descriptor") from err
         return super().__exit__(exception_type, exception_value, exception_traceback)
 
     def _set_vcp_feature(self, com: VCPCommand, value: int, timeout: float) -> None:
         del timeout  # unused
-        self._rate_limit()
-        payload = bytearray()
-        payload.append(SET_VCP_CMD)
-        payload.append(com.code)
-        payload.extend(struct.pack(">H", value))
-        self._ddc_write(payload)
-        self.last_set = time.time()
+        with self._transaction("set"):
+            self._ddc_write(self._codec.set_vcp_request(com.code, value))
 
     def _get_vcp_feature(self, com: VCPCommand, timeout: float) -> VCPFeatureReturn:
-        self._rate_limit()
-        payload = bytearray()
-        payload.append(GET_VCP_CMD)
-        payload.append(com.code)
-        self._ddc_write(payload)
-        _, payload = self._ddc_read(timeout)
-        # unpack the payload
-        try:
-            (
-                reply_code,
-                result_code,
-                vcp_opcode,
-                _, # vcp_type_code
-                feature_max,
-                feature_current,
-            ) = struct.unpack(">BBBBHH", payload)
-        except struct.error as err:
-            raise VCPIOError("received malformed response payload") from err
+        with self._transaction("get"):
+            self._ddc_write(self._codec.get_vcp_request(com.code))
+            length = self._ddc_read(timeout, GET_VCP_REPLY_FRAME_LENGTH)
+        (
+            reply_code,
+            result_code,
+            vcp_opcode,
+            _, # vcp_type_code
+            feature_max,
+            feature_current,
+        ) = self._codec.get_vcp_reply(length)
         if reply_code != GET_VCP_REPLY:
-            raise VCPIOError(f"received unexpected response code: {reply_code}")
+            raise VCPProtocolError(f"received unexpected response code: {reply_code}")
         if vcp_opcode != com.code:
-            raise VCPIOError(f"received unexpected opcode: {vcp_opcode}")
+            raise VCPProtocolError(f"received unexpected opcode: {vcp_opcode}")
+        if result_code == 1:
+            raise VCPUnsupportedError(GET_VCP_RESULT_CODES[result_code])
         if result_code > 0:
-            message = GET_VCP_RESULT_CODES.get(result_code, f"received result with unknown code: {result_code}")
-            raise VCPIOError(message)
+            raise VCPProtocolError(f"received result with unknown code: {result_code}")
         return VCPFeatureReturn(feature_current, feature_max)
 
     def _get_vcp_capabilities_str(self, timeout: float) -> str:
-        # Create an empty capabilities string to be filled with the data
-        caps_str = ""
-        self._rate_limit()
+        caps_str = "".join(self._iter_vcp_capabilities(timeout))
+        self.logger.debug(f"caps str={caps_str}")
+        return caps_str
+
+    def _iter_vcp_capabilities(self, timeout: float) -> Iterator[str]:
+        # the string comes in fragments of up to 32 bytes, each one a request/reply round trip
         offset = 0
         loop_count = 0
         loop_count_limit = 40
         while loop_count < loop_count_limit:
             loop_count += 1
-            payload = bytearray()
-            payload.append(GET_VCP_CAPS_CMD)
-            payload.extend(struct.pack(">H", offset))
-            self._ddc_write(payload)
-            length, payload = self._ddc_read(timeout)
-            # check if length is valid
-            if length < 3 or length > 35:
-                raise VCPIOError(f"received unexpected response length: {length}")
-            # unpack reply code
-            reply_code, payload = struct.unpack(f">B{length - 1}s", payload)
-            length -= 1
-            if reply_code != GET_VCP_CAPS_REPLY:
-                raise VCPIOError(f"received unexpected response code: {reply_code}")
-            # unpack offset and string data
-            offset, payload = struct.unpack(f">H{length - 2}s", payload)
-            length -= 2
-            if length > 0:
-                caps_str += payload.decode("ascii", errors="replace")
+            # each fragment is retried on its own, so a bad reply doesn't restart the fetch from the beginning
+            request_offset = offset
+            length, offset, fragment = self._with_retries(lambda: self._caps_fragment(request_offset, timeout))
+            if fragment:
+                yield fragment
                 # TODO: look further into error handling/basing behavior on config options
             else:
-                break
+                return
             # update the offset and go again
-            offset += length
-        self.logger.debug(f"caps str={caps_str}")
-        if loop_count >= loop_count_limit:
-            raise VCPIOError("Capabilities string incomplete or too long")
-        return caps_str
-
-    @staticmethod
-    def _get_checksum(data: bytearray | bytes) -> int:
-        checksum = 0x00
-        for data_byte in data:
-            checksum ^= data_byte
-        return checksum
-
-    def _rate_limit(self) -> None:
-        if self.last_set is not None:
-            rate_delay = CMD_RATE - (time.time() - self.last_set)
-            if rate_delay > 0:
-                time.sleep(rate_delay)
+            offset += length - 3
+        raise VCPProtocolError("Capabilities string incomplete or too long")
+
+    def _caps_fragment(self, offset: int, timeout: float) -> tuple[int, int, str]:
+        """Request the capabilities fragment at offset. Returns the reply length, and its offset and fragment."""
+        with self._transaction("caps"):
+            self._ddc_write(self._codec.caps_request(offset))
+            length = self._ddc_read(timeout, CAPS_REPLY_FRAME_LENGTH)
+        # check if length is valid
+        if length < 3 or length > 35:
+            raise VCPProtocolError(f"received unexpected response length: {length}")
+        reply_code, reply_offset, fragment = self._codec.caps_reply(length)
+        if reply_code != GET_VCP_CAPS_REPLY:
+            raise VCPProtocolError(f"received unexpected response code: {reply_code}")
+        return length, reply_offset, fragment
+
+    @contextmanager
+    def _transaction(self, kind: str) -> Iterator[None]:
+        """A transaction of the given kind (a COMMAND_GAPS key) on this VCP's bus, spaced out from every other
+        transaction on the bus in this process, and, through the bus lock, in other processes."""
+        gap = COMMAND_GAPS[kind]
+        with bus_scheduler(self.bus_number).transaction(gap) as wait:
+            if wait:
+                self.logger.debug(f"waited {wait * 1000:.1f}ms for bus {self.bus_number} before {kind}")
+            if self.LOCK_TIMEOUT is None:
+                yield
+                return
+            # the lock is still held if this session's last transaction was only just before this one
+            if not _take_back_lock(self.fd):
+                self._lock_bus(kind)
+            try:
+                yield
+            finally:
+                if gap:
+                    # other processes only see the lock, so it is held until the monitor is ready again
+                    _unlock_after(self.fd, gap)
+                else:
+                    _unlock(self.fd)
+
+    def _lock_bus(self, kind: str) -> None:
+        waited = retry_until(self._try_lock_bus, LOCK_FIRST_WAIT, 2, LOCK_MAX_WAIT, self.LOCK_TIMEOUT)
+        if waited is None:
+            raise VCPTimeoutError(f"timed out after {self.LOCK_TIMEOUT}s waiting for another process to release {self.fp}")
+        if waited:
+            self.logger.debug(f"waited {waited * 1000:.1f}ms for another process to release bus {self.bus_number} "
+                              f"before {kind}")
+            # the other process's last transaction may have been a command, which needs a gap after it
+            time.sleep(max(COMMAND_GAPS.values()))
+
+    def _try_lock_bus(self) -> bool:
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        except OSError as err:
+            # e.g. ENOLCK; locking is advisory, so go ahead without it
+            self.logger.debug(f"could not lock bus {self.bus_number}: {err}")
+        return True
 
     def _read_bytes(self, num_bytes: int) -> bytes:
         try:
@@ -257,47 +666,96 @@ class LinuxVCP(VCP):
         except OSError as err:
             raise VCPIOError("unable to read from I2C bus") from err
 
+    def _read_into(self, buffer: memoryview) -> int:
+        try:
+            return os.readv(self.fd, (buffer,))
+        except OSError as err:
+            raise VCPIOError("unable to read from I2C bus") from err
+
     def _write_bytes(self, data: bytes | bytearray) -> None:
         try:
             os.write(self.fd, data)
         except OSError as err:
             raise VCPIOError("unable write to I2C bus") from err
 
-    def _ddc_write(self, payload: bytearray) -> None:
-        """Wrap payload in a DDC-CI packet (framing header + checksum) and write it to the bus."""
-        data = bytearray(payload)
-        data.insert(0, len(data) | PROTOCOL_FLAG)
-        data.insert(0, HOST_ADDRESS)
-        data.append(self._get_checksum(bytearray([DDCCI_ADDR << 1]) + data))
-        self.logger.debug("data=" + " ".join([f"{x:02X}" for x in data]))
-        self._write_bytes(data)
-
-    def _ddc_read(self, timeout: float) -> tuple[int, bytes]:
-        """Wait timeout seconds, read a DDC-CI response, validate its checksum.
-
-        Returns a (length, payload) tuple where length is the data length from
-        the response header (protocol flag cleared) and payload is the raw
-        response payload bytes (checksum byte stripped).
+    def _ddc_write(self, frame: bytearray) -> None:
+        """Write a DDC-CI request frame to the bus."""
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug(f"data={hex_dump(frame)}")
+        self._write_bytes(frame)
+        self._request_time = time.monotonic()
+
+    def _ddc_read(self, timeout: float, frame_length: int) -> int:
+        """Read a DDC-CI response of at most frame_length bytes the way read_strategy says, and validate its checksum.
+
+        Returns the data length from the response header (protocol flag cleared);
+        the response itself is left in the codec's reply buffer.
         """
+        if self.read_strategy.lower() == "poll":
+            return self._ddc_read_polling(frame_length)
         time.sleep(timeout)
-        header = self._read_bytes(GET_VCP_HEADER_LENGTH)
-        self.logger.debug("header=" + " ".join([f"{x:02X}" for x in header]))
-        _, length = struct.unpack("=BB", header)
-        length &= ~PROTOCOL_FLAG  # clear protocol flag
-        raw_payload = self._read_bytes(length + 1)
-        self.logger.debug("payload=" + " ".join([f"{x:02X}" for x in raw_payload]))
-        payload, checksum = struct.unpack(f"={length}sB", raw_payload)
-        calculated_checksum = self._get_checksum(header + payload)
-        checksum_xor = checksum ^ calculated_checksum
+        length, checksum_xor = self._ddc_read_reply(frame_length)
+        if not length:
+            raise VCPNullMessageError("received null message")
         if checksum_xor:
             message = f"checksum does not match: {checksum_xor}"
             if self.CHECKSUM_ERRORS.lower() == "strict":
-                raise VCPIOError(message)
+                raise VCPChecksumError(message)
             elif self.CHECKSUM_ERRORS.lower() == "warning":
                 self.logger.warning(message)
-        return length, payload
+        self._reply_received(1)
+        return length
+
+    def _ddc_read_polling(self, frame_length: int) -> int:
+        # Reading before the monitor is ready gets a NACK (an I/O error) or a null message, and a read racing
+        # the monitor filling its buffer gets garbage; all of those are retried. The request is not resent.
+        error: Optional[VCPIOError] = None
+        attempts = 0
+        for delay in backoff_delays(POLL_FIRST_WAIT, POLL_BACKOFF, POLL_MAX_WAIT, self._request_time + POLL_DEADLINE):
+            time.sleep(delay)
+            attempts += 1
+            try:
+                length, checksum_xor = self._ddc_read_reply(frame_length)
+            except VCPIOError as err:
+                error = err
+                continue
+            if not length:
+                error = VCPNullMessageError("received null message")
+            elif checksum_xor:
+                error = VCPChecksumError(f"checksum does not match: {checksum_xor}")
+            else:
+                self._reply_received(attempts)
+                return length
+        raise VCPTimeoutError(f"no valid reply within {POLL_DEADLINE * 1000:.0f}ms after {attempts} reads") from error
+
+    def _ddc_read_reply(self, frame_length: int) -> tuple[int, int]:
+        """Read one DDC-CI response; returns its data length, and the XOR of its checksum with the expected one."""
+        buffer = self._codec.reply_buffer(frame_length)
+        size = self._read_into(buffer)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug(f"reply={hex_dump(buffer[:size])}")
+        return self._codec.check_reply(size)
+
+    def _reply_received(self, reads: int) -> None:
+        self.last_reply_time = time.monotonic() - self._request_time
+        self.logger.debug(f"reply after {self.last_reply_time * 1000:.1f}ms ({reads} read{'s' if reads != 1 else ''})")
 
 
+    def _get_edid_blob(self) -> bytes:
+        edid = self._get_sysfs_edid_blob()
+        if edid is not None:
+            return edid
+        self.logger.debug(f"no EDID in sysfs for bus {self.bus_number}, reading it over I2C")
+        return self._get_i2c_edid_blob()
+
+    def _get_sysfs_edid_blob(self) -> Optional[bytes]:
+        """The kernel's cached copy of the EDID, which saves reading it from the monitor block by block."""
+        if self.connector is None:
+            self.connector = linux_sysfs.display_buses(linux_sysfs.drm_connectors()).get(self.bus_number)
+            if self.connector is None:
+                return None
+        return linux_sysfs.connector_edid(self.connector)
+
     # TODO: there are two safety checks we probably want to implement:
     # 1. a cap on extensions. Some monitors will falsely report 255 extensions. 8 is a sane max for the real world
     # 2. run sanity checks on the EDID block header. The first block has a header of "00 FF FF FF FF FF FF". If this header
@@ -305,15 +763,38 @@ class LinuxVCP(VCP):
     # 3. Each 128-byte block ends with a checksum byte. The sum of all bytes in a block must equal 0 (mod 256). If the
         # first block fails this test, its extension count is unreliable. If a follow up block fails this test, it is
         # either corrupt, or garbage data, and we can probably stop.
-    def _get_edid_blob(self) -> bytes:
+    def _get_i2c_edid_blob(self) -> bytes:
+        # falls back to the next cheapest mode when the adapter turns out not to support one
+        while True:
+            mode = self.transfer_modes.edid
+            if mode is None:
+                raise VCPIOError(f"the adapter at {self.fp} can not read EDIDs")
+            try:
+                with self._transaction("edid"):
+                    return self._read_i2c_edid(mode)
+            except OSError as err:
+                if err.errno not in UNSUPPORTED_TRANSFER_ERRORS:
+                    raise VCPIOError("unable to read EDID from I2C bus") from err
+                self.logger.debug(f"EDID transfer mode {mode} is not supported on bus {self.bus_number}: {err}")
+                _failed_edid_modes[self.bus_number] = _failed_edid_modes.get(self.bus_number, frozenset()) | {mode}
+                self.transfer_modes = self._get_transfer_modes()
+
+    def _read_i2c_edid(self, mode: str) -> bytes:
 
         # 1. Atomic Discovery: Read first 128 bytes (Block 0)
-        base_block = _i2c_transaction(self.fd, EDID_I2C_ADDR, 0, 128)
+        base_block = self._edid_transfer.read(mode, self.fd, 0, 128)
         extension_count = base_block[126]
 
         if extension_count == 0:
             return base_block
 
+        if mode != "rdwr":
+            # without combined transactions, the segment pointer resets before the read, so only segment 0
+            # (the base block and the first extension) can be reached
+            if extension_count > 1:
+                self.logger.debug(f"reading only 1 of {extension_count} EDID extensions with transfer mode {mode}")
+            return base_block + self._edid_transfer.read(mode, self.fd, 128, 128)
+
         # 2. Determine how many 256-byte segments we need
         # Total blocks = Base (1) + Extensions (N)
         total_blocks = 1 + extension_count
@@ -330,24 +811,74 @@ class LinuxVCP(VCP):
             read_len = blocks_in_this_segment * 128
 
             # Atomic Segmented Read
-            segment_data = _i2c_segmented_read(self.fd, segment, read_len)
+            segment_data = self._edid_transfer.read_segment(self.fd, segment, read_len)
             full_edid.extend(segment_data)
 
         return bytes(full_edid)
 
+    def _read_edid_fingerprint(self) -> Optional[str]:
+        try:
+            return edid_fingerprint(self._get_edid_blob())
+        except VCPIOError as err:
+            self.logger.debug(f"could not read EDID on bus {self.bus_number}: {err}")
+            return None
+
+    def get_edid_fingerprint(self) -> str:
+        # read at most once per session, unless entering already read it
+        assert self._in_ctx, "This function must be run within the context manager"
+        if self.edid_fingerprint is None:
+            self.edid_fingerprint = super().get_edid_fingerprint()
+        return self.edid_fingerprint
+
+    def _probe(self) -> bool:
+        """Whether a DDC/CI device answers on this bus. Reads its EDID fingerprint along the way."""
+        self._enumerating = True
+        try:
+            with self:
+                self.edid_fingerprint = self._read_edid_fingerprint()
+        except (OSError, VCPIOError):
+            # TODO: what is the purpose of this exception catch?
+            return False
+        finally:
+            self._enumerating = False
+        return True
+
+    def _abandon_probe(self) -> None:
+        # an answer this late doesn't make the bus a monitor, so it is neither pooled nor recorded as answering
+        self.logger.debug(f"probe on bus {self.bus_number} timed out after {PROBE_TIMEOUT}s")
+        self._abandoned = True
 
     @staticmethod
     def get_vcps() -> List[LinuxVCP]:
-        vcps = []
-        # iterate I2C devices
-        for device in pyudev.Context().list_devices(subsystem="i2c"):
-            linux_vcp = LinuxVCP(device.sys_number)
+        # read the sysfs state first, so that a change during enumeration invalidates the map we write
+        adapters = linux_sysfs.i2c_adapters()
+        connectors = linux_sysfs.drm_connectors()
+        display_buses = linux_sysfs.display_buses(connectors)
+        discovery = LinuxVCP.DISCOVERY.lower()
+        if discovery == "auto":
+            complete = linux_sysfs.topology_complete(connectors) and not linux_sysfs.adapters_without_drm()
+            discovery = "drm" if complete else "all"
+        candidates = [LinuxVCP(bus, connector=display_buses.get(bus)) for bus in _list_buses()]
+        if discovery == "drm":
+            # skip SMBus, touchpad, sensor etc. adapters, and connectors with nothing plugged in
+            candidates = [linux_vcp for linux_vcp in candidates if linux_vcp.connector is not None]
+        # Buses without a DDC/CI device can take a while to fail, so probe them concurrently. Results come
+        # back in enumeration order, which keeps monitor indices stable.
+        found = bounded_map(
+            LinuxVCP._probe, candidates, PROBE_WORKERS, PROBE_TIMEOUT, False, LinuxVCP._abandon_probe
+        )
+        vcps = [linux_vcp for linux_vcp, ok in zip(candidates, found) if ok]
+        _save_bus_map(adapters, connectors, vcps)
+        return vcps
+
+    @classmethod
+    def get_vcp(cls, index: int) -> LinuxVCP:
+        monitors = _load_bus_map()
+        if monitors is not None:
             try:
-                with linux_vcp:
-                    pass
-            except (OSError, VCPIOError):
-                # TODO: what is the purpose of this exception catch?
+                entry = monitors[index]
+                return LinuxVCP(str(entry["bus"]), entry.get("edid"), entry.get("connector"), map_index=index)
+            except (IndexError, KeyError, TypeError, AttributeError):
+                # not in the map (e.g. a monitor was plugged in since), or the entry is malformed
                 pass
-            else:
-                vcps.append(linux_vcp)
-        return vcps
+        return cls.get_vcps()[index]
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from pyddc.vcp_codes import VCPCommand
-from pyddc.vcp_abc import VCP, VCPError, VCPFeatureReturn
+from pyddc.vcp_abc import VCP, VCPError, VCPIOError, VCPFeatureReturn
 from types import TracebackType
 from typing import List, Optional, Type
 import ctypes
@@ -103,9 +103,9 @@ class WindowsVCP(VCP):
         del timeout  # unused
         try:
             if not dxva2.SetVCPFeature(HANDLE(self.handle), BYTE(code.code), DWORD(value)):
-                raise VCPError(f"failed to set VCP feature: {ctypes.FormatError()}")
+                raise VCPIOError(f"failed to set VCP feature: {ctypes.FormatError()}")
         except OSError as err:
-            raise VCPError("failed to close handle") from err
+            raise VCPIOError("failed to close handle") from err
 
     def _get_vcp_feature(self, com: VCPCommand, timeout: float) -> VCPFeatureReturn:
         del timeout  # unused
@@ -119,9 +119,9 @@ class WindowsVCP(VCP):
                 ctypes.byref(feature_current),
                 ctypes.byref(feature_max),
             ):
-                raise VCPError(f"failed to get VCP feature: {ctypes.FormatError()}")
+                raise VCPIOError(f"failed to get VCP feature: {ctypes.FormatError()}")
         except OSError as err:
-            raise VCPError("failed to get VCP feature") from err
+            raise VCPIOError("failed to get VCP feature") from err
         self.logger.debug(f"GetVCPFeatureAndVCPFeatureReply -> (cme: {com.code}) | (feature current/max: {feature_current.value} / {feature_max.value})")
         return VCPFeatureReturn(feature_current.value, feature_max.value)
 
@@ -131,13 +131,13 @@ class WindowsVCP(VCP):
         self.logger.debug("GetCapabilitiesStringLength")
         try:
             if not dxva2.GetCapabilitiesStringLength(HANDLE(self.handle), ctypes.byref(cap_length)):
-                raise VCPError(f"failed to get VCP capabilities: {ctypes.FormatError()}")
+                raise VCPIOError(f"failed to get VCP capabilities: {ctypes.FormatError()}")
             caps_str = (ctypes.c_char * cap_length.value)()
             self.logger.debug("CapabilitiesRequestAndCapabilitiesReply")
             if not dxva2.CapabilitiesRequestAndCapabilitiesReply(HANDLE(self.handle), caps_str, cap_length):
-                raise VCPError(f"failed to get VCP capabilities: {ctypes.FormatError()}")
+                raise VCPIOError(f"failed to get VCP capabilities: {ctypes.FormatError()}")
         except OSError as err:
-            raise VCPError("failed to get VCP capabilities") from err
+            raise VCPIOError("failed to get VCP capabilities") from err
         return caps_str.value.decode("ascii")
 
     def _get_edid_blob(self) -> bytes:
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+import weakref
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Optional, TYPE_CHECKING
+
+from .vcp_abc import VCPError
+
+if TYPE_CHECKING:
+    from .vcp_abc import VCP
+    from .vcp_codes import VCPCommand
+
+_log = getLogger(__name__)
+
+# seconds writes still queued at interpreter exit are waited for, in total
+EXIT_FLUSH_TIMEOUT = 2.0
+
+
+@dataclass
+class _PendingWrite:
+    vcp: VCP
+    com: VCPCommand
+    value: int
+    # one per submit this write stands for
+    futures: list[Future] = field(default_factory=list)
+
+
+class WriteBehindQueue:
+    """
+    Sets for the monitors on one bus, applied one at a time by a background thread, in the order their
+    (monitor, code) was first submitted. A set submitted while an earlier one to the same monitor and code is
+    still waiting replaces its value, so however fast sets come in, the last one is applied after at most the
+    writes already queued ahead of it. The writes go through the VCP, and so are spaced out like any other
+    transaction on the bus.
+
+    The queue enters a VCP's context for each write itself, so a VCP can't be submitted while it is open, and
+    a write to one that has been opened since it was queued fails instead of taking over its session. Writes
+    still queued when the interpreter exits are flushed first, for up to EXIT_FLUSH_TIMEOUT seconds; call flush
+    to wait for them any longer.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (monitor, code) -> write; dicts keep insertion order, so this is also the queue
+        self._pending: dict[tuple[VCP, int], _PendingWrite] = {}
+        self._current: Optional[_PendingWrite] = None
+        self._running = False
+        # submits that replaced the value of a queued write, rather than queueing their own
+        self.coalesced = 0
+        _all_queues.add(self)
+
+    def submit(self, vcp: VCP, com: VCPCommand, value: int) -> Future:
+        """
+        Queue setting com to value on vcp. The returned future completes when the write is applied, or when a
+        later value that replaced it is, with that write's result: None, or the error it raised.
+        """
+        future: Future = Future()
+        with self._lock:
+            # unless it is open for this queue's own write in progress
+            assert not vcp._in_ctx or (self._current is not None and self._current.vcp is vcp), \
+                "A VCP must not be open while writes to it are queued"
+            pending = self._pending.get((vcp, com.code))
+            if pending is None:
+                self._pending[(vcp, com.code)] = _PendingWrite(vcp, com, value, [future])
+            else:
+                _log.debug(f"coalescing {com.name}={value} into queued {com.name}={pending.value}")
+                pending.value = value
+                pending.futures.append(future)
+                self.coalesced += 1
+            if not self._running:
+                self._running = True
+                threading.Thread(target=self._run, name="pyddc-write-behind", daemon=True).start()
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every write submitted so far has been applied or has failed. Returns False if timeout seconds
+        passed first.
+        """
+        with self._lock:
+            writes = list(self._pending.values())
+            if self._current is not None:
+                writes.append(self._current)
+        _, not_done = wait([future for write in writes for future in write.futures], timeout)
+        return not not_done
+
+    def __len__(self) -> int:
+        """The writes waiting to be applied, not counting the one in progress."""
+        return len(self._pending)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._current = None
+                    self._running = False
+                    return
+                key = next(iter(self._pending))
+                write = self._current = self._pending.pop(key)
+            try:
+                self._apply(write)
+            except BaseException:
+                # never leave the queue marked as running without a thread to run it
+                with self._lock:
+                    self._current = None
+                    self._running = False
+                raise
+
+    @staticmethod
+    def _apply(write: _PendingWrite) -> None:
+        # a future cancelled while its write was waiting (e.g. by asyncio.wrap_future, when the task awaiting it
+        # is cancelled) takes no result; the write is still applied for the other submits it stands for
+        futures = [future for future in write.futures if future.set_running_or_notify_cancel()]
+        try:
+            if write.vcp._in_ctx:
+                # entering it again would replace its caller's session
+                raise VCPError(f"the monitor was opened elsewhere while {write.com.name}={write.value} was queued")
+            with write.vcp:
+                write.vcp.set_vcp_feature(write.com, write.value)
+        except Exception as err:
+            _log.debug(f"queued {write.com.name}={write.value} failed: {err}")
+            for future in futures:
+                future.set_exception(err)
+        else:
+            for future in futures:
+                future.set_result(None)
+
+
+_queues: dict[str, WriteBehindQueue] = {}
+_queues_lock = threading.Lock()
+# every queue, so that they can be flushed at exit; weak, so that unused queues can still be collected
+_all_queues: weakref.WeakSet[WriteBehindQueue] = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    deadline = time.monotonic() + EXIT_FLUSH_TIMEOUT
+    for queue in list(_all_queues):
+        if not queue.flush(max(deadline - time.monotonic(), 0.0)):
+            _log.warning(f"dropping {len(queue)} queued writes at exit")
+
+
+def write_queue(bus: str) -> WriteBehindQueue:
+    """The write-behind queue for a bus, shared by everything in this process that uses it."""
+    with _queues_lock:
+        queue = _queues.get(bus)
+        if queue is None:
+            queue = _queues[bus] = WriteBehindQueue()
+        return queue
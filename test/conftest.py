@@ -18,3 +18,11 @@ def test_conf_file(tmp_path_factory) -> Path:
 @pytest.fixture(scope='module')
 def test_cfg(test_conf_file) -> Config:
     return config.get_config(test_conf_file.as_posix())
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch) -> Path:
+    # keep pyddc's persistent caches out of the user's cache directory, and out of other tests' way
+    cache = tmp_path / "pyddc_cache"
+    monkeypatch.setenv("PYDDC_CACHE_DIR", cache.as_posix())
+    return cache
@@ -1,4 +1,6 @@
 import sys
+import threading
+from types import SimpleNamespace
 
 import pytest
 
@@ -78,3 +80,56 @@ class TestCheckValue:
             assert "CONFIG ALIASES" not in output.err
 
     # TODO: test presence/lack of _INDENT in json depending on logging level
+
+
+class TestPerBus:
+
+    def _run(self, monkeypatch, buses: dict[int, str | None], mons: list[int], wait: float, together=()):
+        """
+        Run _per_bus, and return its responses, the order monitors started and finished being handled in, and
+        the waits between them. The monitors in together only finish once all of them have started, so they must
+        be handled concurrently.
+        """
+        def get_monitor(m):
+            if m not in buses:
+                raise MonitorBossError(f"monitor #{m} does not exist.")
+            return SimpleNamespace(bus=buses[m], mon=m)
+        monkeypatch.setattr(cli, "get_monitor", get_monitor)
+        sleeps = []
+        monkeypatch.setattr(cli, "sleep", sleeps.append)
+        barrier = threading.Barrier(len(together), timeout=5) if together else None
+        events = []
+
+        def respond(m, monitor):
+            assert monitor is None or monitor.mon == m
+            events.append(("start", m))
+            if m in together:
+                barrier.wait()
+            events.append(("end", m))
+            return f"response {m}"
+        responses = cli._per_bus(mons, respond, wait)
+        return responses, events, sleeps
+
+    def test_buses_concurrent(self, monkeypatch):
+        responses, _, sleeps = self._run(monkeypatch, {0: "1", 1: "2", 2: "3"}, [2, 0, 1], 1.0, together=(0, 1, 2))
+        assert responses == ["response 2", "response 0", "response 1"]
+        assert sleeps == []
+
+    def test_shared_bus_in_turn(self, monkeypatch):
+        responses, events, sleeps = self._run(monkeypatch, {0: "1", 1: "2", 2: "1"}, [0, 1, 2], 0.05, together=(0, 1))
+        assert responses == ["response 0", "response 1", "response 2"]
+        # 2 waits for 0, and the gap after it; 1 doesn't
+        assert events.index(("start", 2)) > events.index(("end", 0))
+        assert sleeps == [0.05]
+
+    def test_unknown_bus_in_turn(self, monkeypatch):
+        responses, events, sleeps = self._run(monkeypatch, {0: None}, [0, 1], 0)
+        assert responses == ["response 0", "response 1"]
+        assert events == [("start", 0), ("end", 0), ("start", 1), ("end", 1)]
+        assert sleeps == [0]
+
+    def test_looked_up_once(self, monkeypatch):
+        lookups = []
+        monkeypatch.setattr(cli, "get_monitor", lambda m: lookups.append(m) or SimpleNamespace(bus=None))
+        cli._per_bus([0, 1, 0], lambda m, monitor: m, 0)
+        assert lookups == [0, 1]
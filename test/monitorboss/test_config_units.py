@@ -3,7 +3,8 @@ import pytest
 from pydantic import ValidationError
 
 from monitorboss import config, MonitorBossError
-from monitorboss.config import Config, _RawTomlConfig, _RawTomlSettings
+from monitorboss.config import Config, _RawTomlConfig, _RawTomlSettings, _RawTomlRetry
+from pyddc import RetryPolicy
 from test.testdata import TEST_TOML_CONTENTS
 
 
@@ -110,6 +111,31 @@ class TestConfigValidation:
         with pytest.raises(ValidationError, match="Wait times must be non-negative"):
             _RawTomlSettings(**settings)
 
+    @pytest.mark.parametrize("retry", [{"checksum": -1}, {"deadline": -0.5}])
+    def test_retry_negative_rejected(self, retry: dict):
+        """Negative retry counts and times must be rejected by _RawTomlRetry."""
+        with pytest.raises(ValidationError, match="Retry counts and times must be non-negative"):
+            _RawTomlRetry(**retry)
+
+
+class TestRetryConfig:
+
+    def test_retry_section_optional(self, test_cfg: Config):
+        """A config without a [retry] section retries per the default policy."""
+        assert test_cfg.retry_policy() == RetryPolicy()
+
+    def test_retry_section(self):
+        config_dict = {**CONFIG_DICT_TEMPLATE, "retry": {"checksum": 5, "io": 0, "backoff": 0.01, "deadline": 2.0}}
+        policy = Config.from_raw(_RawTomlConfig(**config_dict)).retry_policy()
+        assert policy.max_retries["checksum"] == 5
+        assert policy.max_retries["io"] == 0
+        assert policy.max_retries["protocol"] == RetryPolicy().max_retries["protocol"]
+        assert (policy.backoff, policy.backoff_max, policy.deadline) == (0.01, RetryPolicy.backoff_max, 2.0)
+
+    def test_default_toml_retry_section(self):
+        raw = _RawTomlConfig.model_validate(config.default_toml().unwrap())
+        assert Config.from_raw(raw).retry_policy() == RetryPolicy()
+
 
 def test_inversion():
     """Aliases should be inverted correctly: {id: [aliases]} -> {alias: id}."""
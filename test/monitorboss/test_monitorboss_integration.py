@@ -4,7 +4,7 @@ from textwrap import dedent
 import pytest
 
 import test.pyddc
-from pyddc import parse_capabilities
+from pyddc import parse_capabilities, RetryStats
 from pyddc.vcp_codes import VCPCodes
 from test.pyddc import vcp_dummy
 from test.pyddc.vcp_dummy import DummyVCP as VCP
@@ -35,9 +35,9 @@ def test_list(json_flag, test_conf_file, capsys):
 ])
 def test_caps_raw(json_flag, test_conf_file, capsys):
     responses = [
-        info.MonitorCapsResponseData(mon=m_data_0_foo, error=None, data=impl.get_vcp_capabilities(0)),
-        info.MonitorCapsResponseData(mon=m_data_1_barbaz, error=Exception("Could not list information for monitor 1"), data=None),
-        info.MonitorCapsResponseData(mon=m_data_2_noalias, error=None, data=impl.get_vcp_capabilities(2))
+        info.MonitorCapsResponseData(mon=m_data_0_foo, error=None, data=impl.get_vcp_capabilities(0), stats=RetryStats(0, 0)),
+        info.MonitorCapsResponseData(mon=m_data_1_barbaz, error=Exception("Could not list information for monitor 1"), data=None, stats=RetryStats(1, 0)),
+        info.MonitorCapsResponseData(mon=m_data_2_noalias, error=None, data=impl.get_vcp_capabilities(2), stats=RetryStats(0, 0))
     ]
     expected = output.caps_raw_output(responses, json_flag) + "\n"
     cmd = f"--config {test_conf_file.as_posix()} {'--json' if json_flag else ''} caps --raw 0 1 2".strip()
@@ -55,9 +55,9 @@ def test_caps_full(json_flag, test_conf_file, test_cfg, capsys):
     caps_0 = info.capability_data(parse_capabilities(impl.get_vcp_capabilities(0)), test_cfg)
     caps_2 = info.capability_data(parse_capabilities(impl.get_vcp_capabilities(2)), test_cfg)
     responses = [
-        info.MonitorCapsResponseData(mon=m_data_0_foo, error=None, data=caps_0),
-        info.MonitorCapsResponseData(mon=m_data_1_barbaz, error=Exception("Could not list information for monitor 1"), data=None),
-        info.MonitorCapsResponseData(mon=m_data_2_noalias, error=None, data=caps_2)
+        info.MonitorCapsResponseData(mon=m_data_0_foo, error=None, data=caps_0, stats=RetryStats(0, 0)),
+        info.MonitorCapsResponseData(mon=m_data_1_barbaz, error=Exception("Could not list information for monitor 1"), data=None, stats=RetryStats(1, 0)),
+        info.MonitorCapsResponseData(mon=m_data_2_noalias, error=None, data=caps_2, stats=RetryStats(0, 0))
     ]
     expected = output.caps_parsed_output(responses, json_flag) + "\n"
     cmd = f"--config {test_conf_file.as_posix()} {'--json' if json_flag else ''} caps 0 1 2".strip()
@@ -73,9 +73,9 @@ def test_caps_summary(json_flag, test_conf_file, test_cfg, capsys):
     caps_0 = info.capability_summary_data(info.capability_data(parse_capabilities(impl.get_vcp_capabilities(0)), test_cfg))
     caps_2 = info.capability_summary_data(info.capability_data(parse_capabilities(impl.get_vcp_capabilities(2)), test_cfg))
     responses = [
-        info.MonitorCapsResponseData(mon=m_data_0_foo, error=None, data=caps_0),
-        info.MonitorCapsResponseData(mon=m_data_1_barbaz, error=Exception("Could not list information for monitor 1"), data=None),
-        info.MonitorCapsResponseData(mon=m_data_2_noalias, error=None, data=caps_2)
+        info.MonitorCapsResponseData(mon=m_data_0_foo, error=None, data=caps_0, stats=RetryStats(0, 0)),
+        info.MonitorCapsResponseData(mon=m_data_1_barbaz, error=Exception("Could not list information for monitor 1"), data=None, stats=RetryStats(1, 0)),
+        info.MonitorCapsResponseData(mon=m_data_2_noalias, error=None, data=caps_2, stats=RetryStats(0, 0))
     ]
     expected = output.caps_parsed_output(responses, json_flag) + "\n"
     cmd = f"--config {test_conf_file.as_posix()} {'--json' if json_flag else ''} caps --summary 0 1 2".strip()
@@ -94,9 +94,9 @@ def test_get_feature(json_flag, test_conf_file, test_cfg, capsys):
     vdata_0 = info.value_data(lum.value, 75, cfg)
     vdata_2 = info.value_data(lum.value, 75, cfg)
     responses = [
-        info.MonitorGetResponseData(mon=m_data_0_foo, error=None, value=vdata_0, maximum=80),
-        info.MonitorGetResponseData(mon=m_data_1_barbaz, error=Exception("could not get image_luminance for monitor #1."), value=None, maximum=None),
-        info.MonitorGetResponseData(mon=m_data_2_noalias, error=None, value=vdata_2, maximum=80)
+        info.MonitorGetResponseData(mon=m_data_0_foo, error=None, value=vdata_0, maximum=80, stats=RetryStats(1, 0)),
+        info.MonitorGetResponseData(mon=m_data_1_barbaz, error=Exception("could not get image_luminance for monitor #1."), value=None, maximum=None, stats=RetryStats(1, 0)),
+        info.MonitorGetResponseData(mon=m_data_2_noalias, error=None, value=vdata_2, maximum=80, stats=RetryStats(1, 0))
     ]
     expected = output.get_feature_output(info.feature_data(lum, test_cfg), responses, json_flag) + "\n"
     cmd = f"--config {test_conf_file.as_posix()} {'--json' if json_flag else ''} get 0 1 2 lum".strip()
@@ -114,9 +114,9 @@ def test_set_feature(json_flag, value, test_conf_file, test_cfg, capsys):
     cfg = config.get_config(test_conf_file.as_posix())
     vdata = info.value_data(lum.value, value, cfg)
     responses = [
-        info.MonitorSetResponseData(mon=m_data_0_foo, error=None, value=vdata),
-        info.MonitorSetResponseData(mon=m_data_1_barbaz, error=Exception(f"could not set image_luminance for monitor #1 to {value}."), value=None),
-        info.MonitorSetResponseData(mon=m_data_2_noalias, error=None, value=vdata)
+        info.MonitorSetResponseData(mon=m_data_0_foo, error=None, value=vdata, stats=RetryStats(2, 0)),
+        info.MonitorSetResponseData(mon=m_data_1_barbaz, error=Exception(f"could not set image_luminance for monitor #1 to {value}."), value=None, stats=RetryStats(1, 0)),
+        info.MonitorSetResponseData(mon=m_data_2_noalias, error=None, value=vdata, stats=RetryStats(1, 0))
     ]
     expected = output.set_feature_output(info.feature_data(lum, test_cfg), responses, json_flag) + "\n"
     cmd = f"--config {test_conf_file.as_posix()} {'--json' if json_flag else ''} set 0 1 2 lum {value}".strip()
@@ -135,9 +135,9 @@ def test_tog_feature(json_flag, test_conf_file, test_cfg, capsys):
     vdata1 = info.value_data(lum.value, 75, cfg)
     vdata2 = info.value_data(lum.value, 42, cfg)
     responses = [
-        info.MonitorToggleResponseData(mon=m_data_0_foo, error=None, original_value=vdata1, new_value=vdata2),
-        info.MonitorToggleResponseData(mon=m_data_1_barbaz, error=Exception("could not get image_luminance for monitor #1."), original_value=None, new_value=None),
-        info.MonitorToggleResponseData(mon=m_data_2_noalias, error=None, original_value=vdata1, new_value=vdata2)
+        info.MonitorToggleResponseData(mon=m_data_0_foo, error=None, original_value=vdata1, new_value=vdata2, stats=RetryStats(2, 0)),
+        info.MonitorToggleResponseData(mon=m_data_1_barbaz, error=Exception("could not get image_luminance for monitor #1."), original_value=None, new_value=None, stats=RetryStats(1, 0)),
+        info.MonitorToggleResponseData(mon=m_data_2_noalias, error=None, original_value=vdata1, new_value=vdata2, stats=RetryStats(2, 0))
     ]
     expected = output.tog_feature_output(info.feature_data(lum, test_cfg), responses, json_flag) + "\n"
     cmd = f"--config {test_conf_file.as_posix()} {'--json' if json_flag else ''} tog 0 1 2 lum 42 21".strip()
@@ -145,3 +145,13 @@ def test_tog_feature(json_flag, test_conf_file, test_cfg, capsys):
     capture = capsys.readouterr()
     assert capture.out == expected
     assert capture.err == ""
+
+
+def test_caps_refresh(test_conf_file, test_cfg, capsys):
+    caps_0 = info.capability_data(parse_capabilities(impl.get_vcp_capabilities(0)), test_cfg)
+    responses = [info.MonitorCapsResponseData(mon=m_data_0_foo, error=None, data=caps_0)]
+    expected = output.caps_parsed_output(responses, False) + "\n"
+    cli.run(f"--config {test_conf_file.as_posix()} caps --refresh 0")
+    capture = capsys.readouterr()
+    assert capture.out == expected
+    assert capture.err == ""
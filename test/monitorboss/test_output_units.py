@@ -111,3 +111,16 @@ def test_caps_parsed(json_flag, expected):
         info.MonitorCapsResponseData(mon=m_data_2_noalias, error=None, data=caps_data_1)
     ]
     assert output.caps_parsed_output(responses, json_flag) == expected
+
+
+def test_retry_stats_serialized():
+    responses = [
+        info.MonitorGetResponseData(mon=m_data_0_foo, error=None, value=v_data_17_name_alias, maximum=None,
+                                    stats=pyddc.RetryStats(3, 2)),
+        info.MonitorGetResponseData(mon=m_data_1_barbaz, error=Exception("checksum does not match"), value=None,
+                                    maximum=None, stats=pyddc.RetryStats(4, 3)),
+    ]
+    assert [resp.serialize() for resp in responses] == [
+        {"monitor": m_data_0_foo.serialize(), "value": v_data_17_name_alias.serialize(), "attempts": 3, "retries": 2},
+        {"monitor": m_data_1_barbaz.serialize(), "error": "checksum does not match", "attempts": 4, "retries": 3},
+    ]
@@ -0,0 +1,51 @@
+"""
+Capabilities strings for parser tests and benchmarks, covering the monitor quirks the parser handles.
+"""
+
+# Well-formed strings, as reported by real monitors.
+WELL_FORMED = {
+    "dell_u2415": "(prot(monitor)type(LCD)model(U2415)cmds(01 02 03 07 0C E3 F3)vcp(02 04 05 08 10 12 14(01 05 08 0B 0C) "
+                  "16 18 1A 52 60(01 0F 11 ) AA(01 02) AC AE B2 B6 C6 C8 C9 D6(01 04 05) DC(00 02 03 05) DF E0 E1 "
+                  "E2(00 01 02 04 0E 12 14 19) F0(00 08) F1(01) F2 FD)mswhql(1)asset_eep(40)mccs_ver(2.1))",
+    "dell_s2721dgf": "(prot(display)type(lcd)model(S2721DGF)cmds(01 02 03 07 0C E3 F3)vcp(02 04 05 08 10 12 "
+                     "14(01 04 05 06 08 09 0B 0C) 16 18 1A 52 60(0F 11 12) AA(01 02 03 04) AC AE B2 B6 C6 C8 C9 "
+                     "D6(01 04 05) DC(00 03 05 ) DF E0 E1 E2(00 1D 01 02 04 0E 12 14 23 24 27) E5 F0(0C) F1 F2 FD)"
+                     "mccs_ver(2.1)mswhql(1))",
+    "samsung_mpu": "(prot(monitor)type(LCD)model(S27R65x)cmds(01 02 03 07 0C E3 F3)vcp(02 04 05 08 10 12 14(05 08 0B 0C) "
+                   "16 18 1A 52 60(0F 11 12) AC AE B2 B6 C6 C8 C9 CC(01 02 03 04 05 06 07 08 09 0A 0C 0D 11 12 14 1A 1E "
+                   "1F 23 30 31) D6(01 04 05) DF FD)mpu_ver(1.0)mccs_ver(2.1))",
+    "paged_vcp": "(prot(monitor)type(lcd)model(PAGED)cmds(01 02 03 07 0C E3 F3)vcp(02 04 05 08 10 12 14(05 08 0B) 16 18 1A "
+                 "52 60(0F 11 12) AC AE B2 B6 C6 C8 C9 D6(01 04 05) DF FD)vcp_p02(01 02 03)vcp_p10(07 09)mccs_ver(2.2))",
+    "dummy": "(prot(monitor)type(LCD)model(DUMM13)cmds(04)vcp(10 12 60(1B 0F 11 ) AA(01 02 04 ) )mccs_ver(2.1))",
+}
+
+# Strings with known deviations from the MCCS format.
+QUIRKS = {
+    # Apple Cinema Display monitors use uppercase "VCP" keys, and no outer parentheses
+    "uppercase_vcp": "prot(monitor) type(LCD) model(ACD) cmds(01 02 03 E3 F3) VCP(02 10 12 14(01 02 03) 60(01 03 09) "
+                     "62 8D B6 C8 C9 DF) mccs_ver(2.0)",
+    # LG 24UD58 monitors report the model without a key
+    "keyless_model": "(prot(monitor)type(LCD)24UD58cmds(01 02 03 0C E3 F3)vcp(02 04 05 08 10 12 14(05 08 0B ) 16 18 1A "
+                     "52 60( 11 12 0F) AC AE B2 B6 C0 C6 C8 C9 D6(01 04) DF 62 8D F4 F5(00 01 02) F6(00 01 02) 4D 4E "
+                     "4F 15(01 06 11 13 14 28 29 32 48) F7(00 01 02 03) F8(00 01) F9 E4 E5 E6 E7 E8 E9 EA EB EF "
+                     "FD(00 01) FE(00 01 02) FF)mccs_ver(2.1)mswhql(1))",
+    # Asus PB287 monitors report the model without parentheses
+    "unparenthesized_model": "(prot(monitor)type(LCD)model LCDPB287 cmds(01 02 03 07 0C E3 F3)vcp(02 04 05 08 0B 0C 10 "
+                             "12 14(05 06 08 0B) 16 18 1A 60(11 12 0F) 62 6C 6E 70 8D(01 02) A8 AC AE B6 C6 C8 C9 "
+                             "D6(01 04) DF)mccs_ver(2.2))",
+    "mixed_whitespace": "(prot(monitor)\ntype(LCD)\tmodel(TAB)vcp(10\t12 60(\t0F 11))mccs_ver(2.1))",
+    "nested_values": "(prot(monitor)vcp(01(02(03)) 04 (05 06) 07))",
+    "orphan_values": "(prot(monitor)vcp((01 02) 03 04)cmds(01(02 03) (04 05) 06))",
+    "odd_hex": "(vcp(1 2 3 G1 +f -f 0x)cmds(F))",
+    "keyless_values": "(prot monitor)",
+    "keyless_groups": "(prot(monitor)(type)(LCD))",
+    "empty_groups": "(()(()())())",
+    "stray_close": "(prot(monitor))type(LCD))",
+}
+
+# Strings with a '(' that is never closed, e.g. from a capabilities fetch that was cut short.
+UNBALANCED = {
+    "truncated": "(prot(monitor)type(LCD)model(TRUNC)cmds(01 02 03)vcp(10 12 60(0F 11",
+    "truncated_key": "(prot(monitor)type(LCD)mod",
+    "open_only": "(",
+}
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pyddc import AsyncVCP, VCPError, VCPFeatureReturn, get_vcp_com, parse_capabilities
+from pyddc.scheduler import bus_scheduler
+from pyddc.vcp_codes import VCPCodes
+from test.pyddc.vcp_dummy import DummyVCP, FAULTY_VCP_TEMPLATE
+from test.testdata import vcp_template
+
+lum_command = get_vcp_com(VCPCodes.image_luminance)
+
+
+class BusVCP(DummyVCP):
+    """
+    A DummyVCP on a named bus, whose reads record the thread they ran on, and how many reads were running at
+    once. Its reads wait at barrier, if given, for as many others to be running; otherwise they take a while.
+    """
+
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def __init__(self, template, bus, barrier=None):
+        super().__init__(template)
+        self._bus = bus
+        self.barrier = barrier
+        self.threads = []
+
+    @property
+    def bus(self):
+        return self._bus
+
+    def _get_vcp_feature(self, com, timeout):
+        self.threads.append(threading.current_thread().name)
+        with BusVCP.lock:
+            BusVCP.running += 1
+            BusVCP.peak = max(BusVCP.peak, BusVCP.running)
+        try:
+            if self.barrier is not None:
+                self.barrier.wait()
+            else:
+                time.sleep(0.05)
+            return super()._get_vcp_feature(com, timeout)
+        finally:
+            with BusVCP.lock:
+                BusVCP.running -= 1
+
+
+class TestAsyncVCP:
+
+    def test_operations(self):
+        async def run():
+            async with AsyncVCP(DummyVCP(vcp_template)) as vcp:
+                await vcp.set_vcp_feature(lum_command, 42)
+                assert await vcp.get_vcp_feature(lum_command) == VCPFeatureReturn(42, 80)
+                assert await vcp.get_vcp_feature_max(lum_command) == 80
+                assert await vcp.set_vcp_features([(lum_command, 30)]) == {lum_command.code: None}
+                assert await vcp.get_vcp_features([lum_command]) == {lum_command.code: VCPFeatureReturn(30, 80)}
+                assert await vcp.get_vcp_capabilities() == vcp_template.caps_str
+                assert await vcp.get_parsed_capabilities() == parse_capabilities(vcp_template.caps_str)
+                assert await vcp.get_edid_blob() == vcp_template.edid_blob
+                assert await vcp.get_edid_fingerprint() == vcp.vcp.get_edid_fingerprint()
+        asyncio.run(run())
+
+    def test_error(self):
+        async def run():
+            async with AsyncVCP(DummyVCP(FAULTY_VCP_TEMPLATE)) as vcp:
+                with pytest.raises(VCPError):
+                    await vcp.get_vcp_feature(lum_command)
+        asyncio.run(run())
+
+    def test_get_vcps(self):
+        vcps = asyncio.run(AsyncVCP.get_vcps(DummyVCP))
+        assert [vcp.vcp.faulty for vcp in vcps] == [vcp.faulty for vcp in DummyVCP.get_vcps()]
+
+    def _read_all(self, vcps: list[BusVCP]) -> None:
+        BusVCP.peak = 0
+
+        async def read(vcp):
+            async with AsyncVCP(vcp) as async_vcp:
+                await async_vcp.get_vcp_feature(lum_command)
+
+        async def run():
+            await asyncio.gather(*(read(vcp) for vcp in vcps))
+        asyncio.run(run())
+
+    def test_buses_concurrent(self):
+        # each read waits for the other to be running
+        barrier = threading.Barrier(2, timeout=5)
+        vcps = [BusVCP(vcp_template, "async-a", barrier), BusVCP(vcp_template, "async-b", barrier)]
+        self._read_all(vcps)
+        assert vcps[0].threads[0].startswith("pyddc-bus-async-a")
+
+    def test_bus_serialized(self):
+        vcps = [BusVCP(vcp_template, "async-c"), BusVCP(vcp_template, "async-c")]
+        self._read_all(vcps)
+        assert BusVCP.peak == 1
+        assert vcps[0].threads == vcps[1].threads
+
+    def test_waits_for_bus_gap(self):
+        with bus_scheduler("async-d").transaction(10):
+            pass
+        waits = []
+
+        async def sleep(delay):
+            waits.append(delay)
+
+        async def run():
+            async with AsyncVCP(BusVCP(vcp_template, "async-d")):
+                pass
+        # the gap is waited out on the event loop rather than the bus's thread; sleep doesn't really wait here,
+        # so it is still there for the exit too
+        with patch.object(asyncio, "sleep", sleep):
+            asyncio.run(run())
+        assert len(waits) == 2 and all(0 < wait <= 10 for wait in waits)
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from pyddc.backoff import backoff_delays, retry_until
+
+
+class TestBackoffDelays:
+
+    def test_delays_grow_to_maximum(self):
+        delays = backoff_delays(0.01, 2, 0.05, time.monotonic() + 10)
+        assert [next(delays) for _ in range(5)] == pytest.approx([0.01, 0.02, 0.04, 0.05, 0.05])
+
+    def test_deadline_passed(self):
+        assert list(backoff_delays(0.01, 2, 0.05, time.monotonic() - 1)) == []
+
+    def test_last_delay_cut_short(self):
+        deadline = time.monotonic() + 0.05
+        delays = []
+        for delay in backoff_delays(0.02, 2, 1, deadline):
+            delays.append(delay)
+            time.sleep(delay)
+        assert delays[0] == 0.02
+        assert delays[-1] < 0.04
+        assert sum(delays) == pytest.approx(0.05, abs=0.02)
+        assert time.monotonic() >= deadline
+
+
+class TestRetryUntil:
+
+    def test_immediate_success(self):
+        assert retry_until(lambda: True, 0.01, 2, 0.05, 1) == 0
+
+    def test_success_after_retries(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(time, "sleep", sleeps.append)
+        attempts = iter([False, False, True])
+        assert retry_until(lambda: next(attempts), 0.01, 2, 0.05, 1) is not None
+        assert sleeps == pytest.approx([0.01, 0.02])
+
+    def test_timeout(self):
+        calls = []
+        start = time.monotonic()
+        assert retry_until(lambda: calls.append(1) and False, 0.01, 2, 0.02, 0.05) is None
+        assert time.monotonic() - start >= 0.05
+        assert len(calls) > 2
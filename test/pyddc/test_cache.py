@@ -0,0 +1,86 @@
+from pyddc.cache import FingerprintCache, JSONStore, cache_dir, edid_fingerprint
+from test.testdata import edid_blob
+
+
+class TestJSONStore:
+
+    def test_store_follows_cache_dir(self, isolated_cache_dir):
+        assert cache_dir() == isolated_cache_dir
+        assert JSONStore("foo.json").path == isolated_cache_dir / "foo.json"
+
+    def test_store_round_trip(self):
+        store = JSONStore("foo.json")
+        assert store.load() is None
+        store.save({"monitors": [{"bus": "3", "edid": None}]})
+        assert store.load() == {"monitors": [{"bus": "3", "edid": None}]}
+        store.clear()
+        assert store.load() is None
+
+    def test_store_corrupt_file(self, isolated_cache_dir):
+        isolated_cache_dir.mkdir()
+        (isolated_cache_dir / "foo.json").write_text("{not json")
+        assert JSONStore("foo.json").load() is None
+
+    def test_store_disabled(self, monkeypatch):
+        monkeypatch.setenv("PYDDC_NO_CACHE", "true")
+        store = JSONStore("foo.json")
+        store.save({"foo": 1})
+        assert not store.path.exists()
+        assert store.load() is None
+
+
+class NamesCache(FingerprintCache[list[str]]):
+
+    def __init__(self):
+        super().__init__("names", 1)
+
+    def _encode(self, entry):
+        return {"names": entry}
+
+    def _decode(self, data):
+        if not isinstance(data["names"], list):
+            raise TypeError("names must be a list")
+        return data["names"]
+
+
+class TestFingerprintCache:
+
+    def test_miss_save_load(self):
+        cache = NamesCache()
+        assert cache._load("abcd") is None
+        cache._save("abcd", ["a", "b"])
+        assert cache._load("abcd") == ["a", "b"]
+        # from disk
+        assert NamesCache()._load("abcd") == ["a", "b"]
+        cache.invalidate("abcd")
+        assert cache._load("abcd") is None
+
+    def test_kept_in_memory(self, isolated_cache_dir):
+        cache = NamesCache()
+        cache._save("abcd", ["a"])
+        (isolated_cache_dir / "names" / "abcd.json").unlink()
+        assert cache._load("abcd") == ["a"]
+
+    def test_other_version(self, isolated_cache_dir):
+        (isolated_cache_dir / "names").mkdir(parents=True)
+        (isolated_cache_dir / "names" / "abcd.json").write_text('{"version": 2, "names": ["a"]}')
+        assert NamesCache()._load("abcd") is None
+
+    def test_malformed(self, isolated_cache_dir):
+        (isolated_cache_dir / "names").mkdir(parents=True)
+        (isolated_cache_dir / "names" / "abcd.json").write_text('{"version": 1, "names": "a"}')
+        (isolated_cache_dir / "names" / "efgh.json").write_text('{"version": 1}')
+        assert NamesCache()._load("abcd") is None
+        assert NamesCache()._load("efgh") is None
+
+    def test_disabled(self, monkeypatch, isolated_cache_dir):
+        monkeypatch.setenv("PYDDC_NO_CACHE", "true")
+        cache = NamesCache()
+        cache._save("abcd", ["a"])
+        assert cache._load("abcd") is None
+        assert not (isolated_cache_dir / "names").exists()
+
+
+def test_edid_fingerprint():
+    assert edid_fingerprint(edid_blob) == edid_fingerprint(bytes(edid_blob))
+    assert edid_fingerprint(edid_blob) != edid_fingerprint(edid_blob[:-1] + b'\x00')
@@ -0,0 +1,124 @@
+from unittest.mock import patch
+
+import pytest
+
+from pyddc import CapsCache, VCPError, parse_capabilities
+from pyddc.caps_cache import _encode, _decode
+from test.pyddc.vcp_dummy import DummyVCP as VCP, DEFAULT_VCP_TEMPLATE, FAULTY_VCP_TEMPLATE
+from test.testdata import vcp_template
+
+
+class TestCapsCacheStore:
+
+    @pytest.mark.parametrize("caps_str", [
+        vcp_template.caps_str,
+        DEFAULT_VCP_TEMPLATE.caps_str,
+        "(prot(monitor)vcp(01(02(03)) 04)vcp_p02(10 12))",  # nested values, paged vcp
+        "model LCDPB287 cmds(01)",  # value without parentheses
+        "(()(()())())",  # keyless values
+    ])
+    def test_encode_round_trip(self, caps_str):
+        caps = parse_capabilities(caps_str)
+        assert _decode(_encode(caps)) == caps
+
+    def test_cache_miss_put_hit(self):
+        cache = CapsCache()
+        assert cache.get("abcd") is None
+        stored = cache.put("abcd", vcp_template.caps_str)
+        assert stored.parsed == parse_capabilities(vcp_template.caps_str)
+        assert cache.get("abcd") == stored
+        cache.invalidate("abcd")
+        assert cache.get("abcd") is None
+
+    def test_cache_malformed_entry(self, isolated_cache_dir):
+        (isolated_cache_dir / "caps").mkdir(parents=True)
+        (isolated_cache_dir / "caps" / "abcd.json").write_text('{"version": 1, "raw": "x", "parsed": {"dict": {"a": 1.5}}}')
+        assert CapsCache().get("abcd") is None
+
+
+class TestVCPCapsCache:
+
+    def test_caps_cached_by_edid(self):
+        cache = CapsCache()
+        with VCP(vcp_template) as vcp:
+            assert vcp.get_vcp_capabilities(cache=cache) == vcp_template.caps_str
+        sentinel = AssertionError("_get_vcp_capabilities_str was called — result should have been served from cache")
+        with VCP(vcp_template) as vcp:
+            with patch.object(vcp, "_get_vcp_capabilities_str", side_effect=sentinel):
+                assert vcp.get_vcp_capabilities(cache=cache) == vcp_template.caps_str
+                assert vcp.get_parsed_capabilities(cache=cache) == parse_capabilities(vcp_template.caps_str)
+
+    def test_caps_refresh(self):
+        cache = CapsCache()
+        with VCP(vcp_template) as vcp:
+            vcp.get_vcp_capabilities(cache=cache)
+            vcp.caps_str = "(prot(monitor)model(NEWFW))"
+            assert vcp.get_vcp_capabilities(cache=cache) == vcp_template.caps_str
+            assert vcp.get_parsed_capabilities(cache=cache, refresh=True) == {"prot": "monitor", "model": "NEWFW"}
+            assert vcp.get_vcp_capabilities(cache=cache) == "(prot(monitor)model(NEWFW))"
+
+    def test_caps_uncached_without_edid(self, isolated_cache_dir):
+        vcp = VCP(vcp_template)
+        with patch.object(vcp, "_get_edid_blob", side_effect=VCPError("no EDID")):
+            with vcp:
+                assert vcp.get_vcp_capabilities(cache=CapsCache()) == vcp_template.caps_str
+        assert not (isolated_cache_dir / "caps").exists()
+
+    def test_caps_failure_not_cached(self, isolated_cache_dir):
+        with VCP(FAULTY_VCP_TEMPLATE) as vcp:
+            with pytest.raises(VCPError):
+                vcp.get_parsed_capabilities(cache=CapsCache())
+        assert not (isolated_cache_dir / "caps").exists()
+
+
+class TestVCPCapsStreaming:
+
+    def _tracked(self, vcp: VCP) -> list[str]:
+        consumed = []
+        chunks = vcp._iter_vcp_capabilities
+
+        def tracking(timeout):
+            for chunk in chunks(timeout):
+                consumed.append(chunk)
+                yield chunk
+        vcp._iter_vcp_capabilities = tracking
+        return consumed
+
+    def test_iter_chunks(self):
+        with VCP(vcp_template) as vcp:
+            assert "".join(vcp.iter_vcp_capabilities()) == vcp_template.caps_str
+
+    def test_keys_stop_early(self):
+        with VCP(vcp_template) as vcp:
+            consumed = self._tracked(vcp)
+            caps = vcp.get_parsed_capabilities(keys=("type", "model"))
+        assert len("".join(consumed)) < len(vcp_template.caps_str)
+        assert caps["type"] == "LCD" and caps["model"] == "DUMM13"
+        assert "vcp" not in caps
+
+    def test_keys_cache_miss_fetches_all(self):
+        cache = CapsCache()
+        with VCP(vcp_template) as vcp:
+            with patch.object(vcp, "_get_vcp_capabilities_str", wraps=vcp._get_vcp_capabilities_str) as fetch:
+                caps = vcp.get_parsed_capabilities(cache=cache, keys=("model",))
+                assert caps == parse_capabilities(vcp_template.caps_str)
+                assert cache.get(vcp.get_edid_fingerprint()).raw == vcp_template.caps_str
+                # so the next calls are cache hits
+                vcp.get_parsed_capabilities(cache=cache, keys=("model",))
+                vcp.get_capabilities_index(cache=cache, keys=("model",))
+            assert fetch.call_count == 1
+
+    def test_missing_keys_cached(self):
+        cache = CapsCache()
+        with VCP(vcp_template) as vcp:
+            caps = vcp.get_parsed_capabilities(cache=cache, keys=("errata",))
+            assert caps == parse_capabilities(vcp_template.caps_str)
+            assert cache.get(vcp.get_edid_fingerprint()).raw == vcp_template.caps_str
+
+    def test_keys_cache_hit(self):
+        cache = CapsCache()
+        with VCP(vcp_template) as vcp:
+            vcp.get_vcp_capabilities(cache=cache)
+            consumed = self._tracked(vcp)
+            assert vcp.get_parsed_capabilities(cache=cache, keys=("model",)) == parse_capabilities(vcp_template.caps_str)
+        assert not consumed
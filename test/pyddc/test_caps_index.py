@@ -0,0 +1,85 @@
+import pytest
+
+from pyddc import CapabilitiesIndex, CapsCache, parse_capabilities
+from test.pyddc.caps_corpus import WELL_FORMED, QUIRKS
+from test.pyddc.vcp_dummy import DummyVCP as VCP
+from test.testdata import vcp_template
+
+PAGED = "(prot(monitor)type(LCD)cmds(01 02 C0)vcp(10 14(05 08) 60(0F 11 12))vcp_p02(20(01 02) 60(1B))mccs_ver(2.2))"
+
+
+class TestCapabilitiesIndex:
+
+    index = CapabilitiesIndex.from_parsed(parse_capabilities(PAGED))
+
+    def test_pages(self):
+        assert dict(self.index.attributes) == {"prot": "monitor", "type": "LCD", "mccs_ver": "2.2"}
+        assert dict(self.index.cmds) == {"cmds": (0x01, 0x02, 0xC0)}
+        assert list(self.index.vcps) == ["vcp", "vcp_p02"]
+        assert self.index.vcps["vcp"][0x60].values == (0x0F, 0x11, 0x12)
+
+    @pytest.mark.parametrize("code, page, expected", [
+        (0x10, None, True),
+        (0x20, None, True),
+        (0x12, None, False),
+        (0x20, "vcp", False),
+        (0x20, "vcp_p02", True),
+        (0x10, "vcp_p10", False),
+    ])
+    def test_supports(self, code, page, expected):
+        assert self.index.supports(code, page) == expected
+
+    @pytest.mark.parametrize("code, page, expected", [
+        (0x10, None, frozenset()),
+        (0x60, None, frozenset({0x0F, 0x11, 0x12, 0x1B})),
+        (0x60, "vcp", frozenset({0x0F, 0x11, 0x12})),
+        (0x60, "vcp_p02", frozenset({0x1B})),
+        (0x12, None, None),
+    ])
+    def test_allowed_values(self, code, page, expected):
+        assert self.index.allowed_values(code, page) == expected
+
+    @pytest.mark.parametrize("code, value, expected", [
+        (0x60, 0x11, True),
+        (0x60, 0x1B, True),
+        (0x60, 0x03, False),
+        (0x10, 75, True),  # continuous, no values listed
+        (0x12, 75, False),  # not listed at all
+    ])
+    def test_supports_value(self, code, value, expected):
+        assert self.index.supports_value(code, value) == expected
+
+    def test_supports_command(self):
+        assert self.index.supports_command(0xC0)
+        assert not self.index.supports_command(0xF3)
+
+    def test_read_only(self):
+        with pytest.raises(AttributeError):
+            self.index.cmds = {}
+        with pytest.raises(TypeError):
+            self.index.vcps["vcp"][0x12] = None
+
+    @pytest.mark.parametrize("name", list(WELL_FORMED) + list(QUIRKS))
+    def test_corpus(self, name):
+        caps = parse_capabilities({**WELL_FORMED, **QUIRKS}[name])
+        index = CapabilitiesIndex.from_parsed(caps)
+        assert set(index.attributes) | set(index.cmds) | set(index.vcps) == set(caps)
+
+    def test_malformed_page(self):
+        # a page key without a parenthesized value
+        index = CapabilitiesIndex.from_parsed(parse_capabilities("(prot(monitor)vcp 10 cmds)"))
+        assert dict(index.vcps) == {"vcp": {}}
+        assert dict(index.cmds) == {"cmds": ()}
+
+
+class TestVCPCapabilitiesIndex:
+
+    def test_uncached(self):
+        with VCP(vcp_template) as vcp:
+            index = vcp.get_capabilities_index()
+        assert index == CapabilitiesIndex.from_parsed(parse_capabilities(vcp_template.caps_str))
+
+    def test_cached_index_reused(self):
+        cache = CapsCache()
+        with VCP(vcp_template) as vcp:
+            assert vcp.get_capabilities_index(cache=cache) is vcp.get_capabilities_index(cache=cache)
@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+from pyddc import parse_capabilities
+from pyddc.vcp_abc import Capability, CapabilitiesStream
+from test.pyddc.caps_corpus import WELL_FORMED, QUIRKS, UNBALANCED
+from test.pyddc.legacy_caps_parser import legacy_parse_capabilities
+
+# fragments that exercise every branch of the parser when strung together at random
+_FUZZ_TOKENS = ["(", "(", ")", ")", " ", "  ", "\t", "\n", "vcp", "VCP", "cmds", "model", "prot", "type", "vcp_p02",
+                "LCD", "0", "1", "A", "f", "G", "+", "_", "x", "10", "60", "FF", "2.1"]
+
+
+def _fuzz_strings(count: int, seed: int) -> list[str]:
+    rand = random.Random(seed)
+    return ["".join(rand.choices(_FUZZ_TOKENS, k=rand.randint(0, 40))) for _ in range(count)]
+
+
+def _legacy_or_none(caps_str: str):
+    # the old parser crashed on a '(' that is never closed, and recursed once per level of nesting
+    try:
+        return legacy_parse_capabilities(caps_str)
+    except (AssertionError, RecursionError):
+        return None
+
+
+class TestMatchesLegacyParser:
+
+    @pytest.mark.parametrize("name", list(WELL_FORMED) + list(QUIRKS))
+    def test_corpus(self, name):
+        caps_str = {**WELL_FORMED, **QUIRKS}[name]
+        assert repr(parse_capabilities(caps_str)) == repr(legacy_parse_capabilities(caps_str))
+
+    def test_fuzz(self):
+        compared = 0
+        for caps_str in _fuzz_strings(3000, seed=7):
+            expected = _legacy_or_none(caps_str)
+            if expected is None:
+                continue
+            assert repr(parse_capabilities(caps_str)) == repr(expected), caps_str
+            compared += 1
+        # make sure the fuzzer is not only generating strings the old parser rejects
+        assert compared > 1000
+
+
+class TestParserEdgeCases:
+
+    def test_empty(self):
+        assert parse_capabilities("") == {}
+
+    def test_unbalanced_truncated(self):
+        caps = parse_capabilities(UNBALANCED["truncated"])
+        assert caps["model"] == "TRUNC"
+        assert caps["vcp"] == [Capability(0x10, None), Capability(0x12, None), Capability(0x60, [0x0F, 0x11])]
+
+    def test_unbalanced_key(self):
+        assert parse_capabilities(UNBALANCED["truncated_key"]) == {"prot": "monitor", "type": "LCD", "mod": {}}
+
+    def test_unbalanced_open_only(self):
+        assert parse_capabilities(UNBALANCED["open_only"]) == {}
+
+    def test_deep_nesting(self):
+        depth = 10 * 1000
+        caps = parse_capabilities("vcp(" + "10(" * depth + ")" * depth + ")")["vcp"]
+        for _ in range(depth):
+            assert caps[0].cap == 0x10
+            caps = caps[0].values
+        assert caps == []
+
+    def test_deep_nesting_dict(self):
+        depth = 10 * 1000
+        caps = parse_capabilities("(" * depth + "prot(monitor)" + ")" * depth)
+        assert caps == {"prot": "monitor"}
+
+
+def _chunks(caps_str: str, size: int) -> list[str]:
+    return [caps_str[offset:offset + size] for offset in range(0, len(caps_str), size)]
+
+
+def _feed_until_done(stream: CapabilitiesStream, chunks: list[str]) -> int:
+    for count, chunk in enumerate(chunks, 1):
+        if stream.feed(chunk):
+            return count
+    return len(chunks)
+
+
+class TestCapabilitiesStream:
+
+    @pytest.mark.parametrize("size", [1, 7, 32])
+    @pytest.mark.parametrize("name", list(WELL_FORMED) + list(QUIRKS))
+    def test_all_keys(self, name, size):
+        caps_str = {**WELL_FORMED, **QUIRKS}[name]
+        stream = CapabilitiesStream()
+        assert _feed_until_done(stream, _chunks(caps_str, size)) == len(_chunks(caps_str, size))
+        assert stream.text == caps_str
+        assert repr(stream.result()) == repr(parse_capabilities(caps_str))
+
+    @pytest.mark.parametrize("size", [1, 7, 32])
+    @pytest.mark.parametrize("name, keys", [
+        ("dell_u2415", ("type", "model", "vcp")),
+        ("dell_u2415", ("prot",)),
+        ("uppercase_vcp", ("type", "model")),
+        ("unparenthesized_model", ("model", "cmds")),
+        ("paged_vcp", ("vcp_p02",)),
+    ])
+    def test_stops_early(self, name, keys, size):
+        caps_str = WELL_FORMED.get(name) or QUIRKS[name]
+        chunks = _chunks(caps_str, size)
+        stream = CapabilitiesStream(keys)
+        assert _feed_until_done(stream, chunks) < len(chunks)
+        assert stream.done
+        caps = parse_capabilities(caps_str)
+        assert {key: stream.result()[key] for key in keys} == {key: caps[key] for key in keys}
+
+    @pytest.mark.parametrize("keys", [("model",), ("type", "nonexistent")])
+    def test_missing_keys(self, keys):
+        # the LG quirk has no "model" key, so the whole string is needed
+        caps_str = QUIRKS["keyless_model"]
+        chunks = _chunks(caps_str, 32)
+        stream = CapabilitiesStream(keys)
+        assert _feed_until_done(stream, chunks) == len(chunks)
+        assert not stream.done
+        assert stream.result() == parse_capabilities(caps_str)
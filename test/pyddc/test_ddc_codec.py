@@ -0,0 +1,88 @@
+import pytest
+
+from pyddc import VCPIOError
+from pyddc.ddc_codec import DDCCodec, checksum, hex_dump, GET_VCP_REPLY_FRAME_LENGTH, CAPS_REPLY_FRAME_LENGTH
+
+
+def _reply(codec: DDCCodec, frame: bytes, frame_length: int) -> int:
+    # what a read of the bus would do
+    buffer = codec.reply_buffer(frame_length)
+    size = min(len(frame), frame_length)
+    buffer[:size] = frame[:size]
+    return size
+
+
+def _frame(data: bytes) -> bytes:
+    header = bytes([0x6E, len(data) | 0x80])
+    return header + data + bytes([checksum(header + data, 0x50)])
+
+
+class TestRequests:
+
+    codec = DDCCodec()
+
+    def test_get_vcp(self):
+        assert self.codec.get_vcp_request(0x10) == bytes.fromhex("51 82 01 10 AC")
+
+    def test_set_vcp(self):
+        assert self.codec.set_vcp_request(0x10, 50) == bytes.fromhex("51 84 03 10 00 32 9A")
+        assert self.codec.set_vcp_request(0x60, 0x0111)[3:6] == bytes.fromhex("60 01 11")
+
+    def test_caps(self):
+        assert self.codec.caps_request(0) == bytes.fromhex("51 83 F3 00 00 4F")
+        frame = self.codec.caps_request(0x0120)
+        assert frame[3:5] == bytes.fromhex("01 20")
+        assert checksum(frame, 0x6E) == 0
+
+    def test_buffers_reused(self):
+        assert self.codec.get_vcp_request(0x10) is self.codec.get_vcp_request(0x12)
+
+
+class TestReplies:
+
+    codec = DDCCodec()
+
+    def test_get_vcp_reply(self):
+        size = _reply(self.codec, _frame(bytes.fromhex("02 00 10 00 00 64 00 32")), GET_VCP_REPLY_FRAME_LENGTH)
+        length, checksum_xor = self.codec.check_reply(size)
+        assert (length, checksum_xor) == (8, 0)
+        assert self.codec.get_vcp_reply(length) == (0x02, 0, 0x10, 0, 100, 50)
+
+    def test_caps_reply(self):
+        frame = _frame(bytes.fromhex("E3 00 20") + b"(prot(monitor)")
+        # padding after the frame is ignored
+        size = _reply(self.codec, frame + b"\xff" * 10, CAPS_REPLY_FRAME_LENGTH)
+        length, checksum_xor = self.codec.check_reply(size)
+        assert checksum_xor == 0
+        assert self.codec.caps_reply(length) == (0xE3, 0x20, "(prot(monitor)")
+
+    def test_null_message(self):
+        size = _reply(self.codec, bytes.fromhex("6E 80 BE"), GET_VCP_REPLY_FRAME_LENGTH)
+        assert self.codec.check_reply(size) == (0, 0)
+
+    def test_checksum_mismatch(self):
+        frame = bytearray(_frame(bytes.fromhex("02 00 10 00 00 64 00 32")))
+        frame[-1] ^= 0x40
+        size = _reply(self.codec, bytes(frame), GET_VCP_REPLY_FRAME_LENGTH)
+        assert self.codec.check_reply(size) == (8, 0x40)
+
+    @pytest.mark.parametrize("frame", [b"", b"\x6e", b"\x6e\x88\x02\x00"])
+    def test_truncated(self, frame):
+        size = _reply(self.codec, frame, GET_VCP_REPLY_FRAME_LENGTH)
+        with pytest.raises(VCPIOError):
+            self.codec.check_reply(size)
+
+    def test_length_exceeds_frame(self):
+        size = _reply(self.codec, _frame(bytes(20)), GET_VCP_REPLY_FRAME_LENGTH)
+        with pytest.raises(VCPIOError):
+            self.codec.check_reply(size)
+
+    def test_malformed_get_vcp_reply(self):
+        size = _reply(self.codec, _frame(bytes.fromhex("02 00 10")), GET_VCP_REPLY_FRAME_LENGTH)
+        length, _ = self.codec.check_reply(size)
+        with pytest.raises(VCPIOError):
+            self.codec.get_vcp_reply(length)
+
+
+def test_hex_dump():
+    assert hex_dump(bytearray(b"\x51\x82\x01\x10\xac")) == "51 82 01 10 AC"
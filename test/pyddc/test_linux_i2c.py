@@ -0,0 +1,75 @@
+import pytest
+
+from pyddc import linux_i2c
+from pyddc.linux_i2c import I2C_FUNC_I2C, I2C_FUNC_SMBUS_READ_I2C_BLOCK, TransferModes
+
+I2C_AND_SMBUS = I2C_FUNC_I2C | I2C_FUNC_SMBUS_READ_I2C_BLOCK
+
+
+class TestEDIDModes:
+
+    def test_i2c_adapter(self):
+        assert linux_i2c.edid_modes(I2C_FUNC_I2C) == ["rdwr", "plain"]
+
+    def test_smbus_only_adapter(self):
+        assert linux_i2c.edid_modes(I2C_FUNC_SMBUS_READ_I2C_BLOCK) == ["smbus"]
+
+    def test_cheapest_first(self):
+        modes = linux_i2c.edid_modes(I2C_AND_SMBUS)
+        assert modes == sorted(modes, key=linux_i2c.EDID_MODES.index)
+
+    def test_no_functionality(self):
+        assert linux_i2c.edid_modes(0) == []
+
+
+class TestTransferModes:
+
+    def test_i2c_adapter(self):
+        assert linux_i2c.transfer_modes(I2C_AND_SMBUS) == TransferModes("readwrite", "rdwr")
+
+    def test_smbus_only_adapter_can_not_carry_ddc(self):
+        assert linux_i2c.transfer_modes(I2C_FUNC_SMBUS_READ_I2C_BLOCK) == TransferModes(None, "smbus")
+
+    def test_falls_back_past_failed_modes(self):
+        assert linux_i2c.transfer_modes(I2C_AND_SMBUS, frozenset({"rdwr"})).edid == "plain"
+        assert linux_i2c.transfer_modes(I2C_AND_SMBUS, frozenset({"rdwr", "plain"})).edid == "smbus"
+
+    def test_every_mode_failed(self):
+        modes = linux_i2c.transfer_modes(I2C_FUNC_I2C, frozenset({"rdwr", "plain"}))
+        assert modes == TransferModes("readwrite", None)
+
+    def test_str(self):
+        assert str(TransferModes("readwrite", "rdwr")) == "ddc=readwrite edid=rdwr"
+        assert str(TransferModes(None, None)) == "ddc=unsupported edid=unsupported"
+
+
+class TestDescribeFuncs:
+
+    def test_named_flags(self):
+        assert linux_i2c.describe_funcs(I2C_AND_SMBUS) == "0x04000001 (i2c, smbus-read-i2c-block)"
+
+    def test_no_flags_of_interest(self):
+        assert linux_i2c.describe_funcs(0x2) == "0x00000002 (none of interest)"
+
+
+class TestProbeMethod:
+
+    @pytest.mark.parametrize("policy", ["write", "read"])
+    def test_explicit_method(self, policy):
+        assert linux_i2c.probe_method(policy, False, False, True) == policy
+        assert linux_i2c.probe_method(policy, True, True, False) == policy
+
+    def test_none_skips(self):
+        assert linux_i2c.probe_method("none", True, False, False) is None
+
+    def test_cached_known_good_skips(self):
+        assert linux_i2c.probe_method("cached", False, False, True) is None
+
+    def test_cached_unknown_probes_cheapest(self):
+        assert linux_i2c.probe_method("cached", True, False, False) == "write"
+        assert linux_i2c.probe_method("cached", False, False, False) == "read"
+
+    @pytest.mark.parametrize("policy", ["none", "cached"])
+    def test_enumeration_always_probes(self, policy):
+        assert linux_i2c.probe_method(policy, True, True, True) == "write"
+        assert linux_i2c.probe_method(policy, False, True, True) == "read"
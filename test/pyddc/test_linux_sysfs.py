@@ -0,0 +1,142 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from pyddc import linux_sysfs
+from pyddc.linux_sysfs import DRMConnector
+from test.testdata import edid_blob
+
+
+def _make_adapters(root: Path, names: list[str]):
+    i2c_dev = root / "class" / "i2c-dev"
+    i2c_dev.mkdir(parents=True)
+    for name in names:
+        (i2c_dev / name).mkdir()
+
+
+class TestI2CAdapters:
+
+    def test_adapters_numeric_order(self, tmp_path):
+        _make_adapters(tmp_path, ["i2c-10", "i2c-2", "i2c-1", "foo", "i2c-bar"])
+        assert linux_sysfs.i2c_adapters(tmp_path.as_posix()) == ["1", "2", "10"]
+
+    def test_adapters_missing_sysfs(self, tmp_path):
+        assert linux_sysfs.i2c_adapters(tmp_path.as_posix()) == []
+
+
+class TestI2CBuses:
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="creating symlinks needs privileges on Windows")
+    def test_buses_device_path_order(self, tmp_path):
+        devices = tmp_path / "bus" / "i2c" / "devices"
+        devices.mkdir(parents=True)
+        for device_path in ["pci0/0000:00:1f.4/i2c-0", "pci0/0000:03:00.0/i2c-5", "pci0/0000:03:00.0/i2c-5/5-0050",
+                            "pci0/0000:00:02.0/i2c-12", "platform/i2c_designware.0/i2c-1"]:
+            target = tmp_path / "devices" / device_path
+            target.mkdir(parents=True)
+            os.symlink(target, devices / target.name)
+        assert linux_sysfs.i2c_buses(tmp_path.as_posix()) == ["12", "0", "5", "1"]
+
+    def test_buses_missing_sysfs(self, tmp_path):
+        assert linux_sysfs.i2c_buses(tmp_path.as_posix()) is None
+
+
+class TestAdaptersWithoutDRM:
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="creating symlinks needs privileges on Windows")
+    def test_adapters_without_drm(self, tmp_path):
+        devices = tmp_path / "bus" / "i2c" / "devices"
+        devices.mkdir(parents=True)
+        pci = tmp_path / "devices" / "pci0"
+        # an iGPU with a DRM card, a GPU without one, and an SMBus controller
+        for device, pci_class in [("0000:00:02.0", "0x030000"), ("0000:01:00.0", "0x030000"),
+                                  ("0000:00:1f.4", "0x0c0500")]:
+            (pci / device).mkdir(parents=True)
+            (pci / device / "class").write_text(pci_class + "\n")
+        (pci / "0000:00:02.0" / "drm" / "card0").mkdir(parents=True)
+        for device_path in ["0000:00:02.0/drm/card0/card0-DP-1/i2c-5", "0000:00:02.0/i2c-3", "0000:01:00.0/i2c-7",
+                            "0000:01:00.0/i2c-6", "0000:01:00.0/i2c-6/6-0050", "0000:00:1f.4/i2c-0"]:
+            target = pci / device_path
+            target.mkdir(parents=True)
+            os.symlink(target, devices / target.name)
+        assert linux_sysfs.adapters_without_drm(tmp_path.as_posix()) == ["6", "7"]
+
+    def test_adapters_without_drm_missing_sysfs(self, tmp_path):
+        assert linux_sysfs.adapters_without_drm(tmp_path.as_posix()) == []
+
+
+def _make_connector(root: Path, name: str, status: str | None, ddc_link: str | None = None, aux: str | None = None):
+    connector = root / "class" / "drm" / name
+    connector.mkdir(parents=True)
+    if status is not None:
+        (connector / "status").write_text(status + "\n")
+    if ddc_link is not None:
+        os.symlink(f"../../../i2c/{ddc_link}", connector / "ddc")
+    if aux is not None:
+        (connector / aux).mkdir()
+
+
+class TestDRMConnectors:
+
+    def test_connectors_aux_child(self, tmp_path):
+        _make_connector(tmp_path, "card0-DP-2", "disconnected", aux="i2c-6")
+        _make_connector(tmp_path, "card0-DP-1", "connected", aux="i2c-5")
+        (tmp_path / "class" / "drm" / "card0").mkdir()
+        (tmp_path / "class" / "drm" / "renderD128").mkdir()
+        assert linux_sysfs.drm_connectors(tmp_path.as_posix()) == [
+            DRMConnector("card0-DP-1", "connected", "5"),
+            DRMConnector("card0-DP-2", "disconnected", "6"),
+        ]
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="creating symlinks needs privileges on Windows")
+    def test_connectors_ddc_link(self, tmp_path):
+        _make_connector(tmp_path, "card1-HDMI-A-1", "connected", ddc_link="i2c-12")
+        assert linux_sysfs.drm_connectors(tmp_path.as_posix()) == [DRMConnector("card1-HDMI-A-1", "connected", "12")]
+
+    def test_connectors_no_bus_or_status(self, tmp_path):
+        _make_connector(tmp_path, "card0-eDP-1", None)
+        assert linux_sysfs.drm_connectors(tmp_path.as_posix()) == [DRMConnector("card0-eDP-1", "unknown", None)]
+
+    def test_connectors_missing_sysfs(self, tmp_path):
+        assert linux_sysfs.drm_connectors(tmp_path.as_posix()) == []
+
+
+class TestDisplayBuses:
+
+    def test_display_buses_connected_only(self):
+        connectors = [
+            DRMConnector("card0-DP-1", "connected", "5"),
+            DRMConnector("card0-DP-2", "disconnected", "6"),
+            DRMConnector("card0-HDMI-A-1", "connected", "7"),
+        ]
+        assert linux_sysfs.display_buses(connectors) == {"5": "card0-DP-1", "7": "card0-HDMI-A-1"}
+        assert linux_sysfs.topology_complete(connectors)
+
+    @pytest.mark.parametrize("connectors", [
+        [],  # no DRM at all
+        [DRMConnector("card0-DP-1", "disconnected", "5")],  # nothing connected
+        [DRMConnector("card0-DP-1", "connected", "5"), DRMConnector("card0-DP-2", "connected", None)],  # bus unknown
+    ])
+    def test_topology_incomplete(self, connectors):
+        assert not linux_sysfs.topology_complete(connectors)
+
+
+class TestConnectorEDID:
+
+    def test_edid_read(self, tmp_path):
+        _make_connector(tmp_path, "card0-DP-1", "connected")
+        (tmp_path / "class" / "drm" / "card0-DP-1" / "edid").write_bytes(edid_blob[:128])
+        assert linux_sysfs.connector_edid("card0-DP-1", tmp_path.as_posix()) == edid_blob[:128]
+
+    @pytest.mark.parametrize("contents", [
+        b"",  # disconnected connectors expose an empty file
+        edid_blob[:100],  # not a whole number of blocks
+        None,  # no file at all
+    ])
+    def test_edid_unavailable(self, tmp_path, contents):
+        _make_connector(tmp_path, "card0-DP-1", "connected")
+        if contents is not None:
+            (tmp_path / "class" / "drm" / "card0-DP-1" / "edid").write_bytes(contents)
+        assert linux_sysfs.connector_edid("card0-DP-1", tmp_path.as_posix()) is None
@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+from pyddc import MaximaCache, VCPError, get_vcp_com
+from pyddc.vcp_codes import VCPCodes
+from test.pyddc.vcp_dummy import DummyVCP as VCP
+from test.testdata import vcp_template
+
+lum_command = get_vcp_com(VCPCodes.image_luminance)
+
+
+class TestMaximaCacheStore:
+
+    def test_put_merges(self):
+        cache = MaximaCache()
+        assert cache.get("abcd") == {}
+        cache.put("abcd", 0x10, 80)
+        cache.put("abcd", 0x12, 100)
+        assert MaximaCache().get("abcd") == {0x10: 80, 0x12: 100}
+
+    def test_malformed_values_skipped(self, isolated_cache_dir):
+        (isolated_cache_dir / "maxima").mkdir(parents=True)
+        (isolated_cache_dir / "maxima" / "abcd.json").write_text('{"version": 1, "maxima": {"16": 80, "18": "x"}}')
+        assert MaximaCache().get("abcd") == {16: 80}
+        (isolated_cache_dir / "maxima" / "efgh.json").write_text('{"version": 1, "maxima": {"lum": 80}}')
+        assert MaximaCache().get("efgh") == {}
+
+
+class TestVCPMaximaCache:
+
+    def test_set_without_read(self):
+        cache = MaximaCache()
+        with VCP(vcp_template) as vcp:
+            vcp.maxima_cache = cache
+            assert vcp.get_vcp_feature_max(lum_command) == 80
+        sentinel = AssertionError("_get_vcp_feature was called — maximum should have been served from cache")
+        vcp = VCP(vcp_template)
+        vcp.maxima_cache = cache
+        with vcp:
+            with patch.object(vcp, "_get_vcp_feature", side_effect=sentinel):
+                vcp.set_vcp_feature(lum_command, 42)
+                assert vcp.get_vcp_feature_max(lum_command) == 80
+        assert vcp.current_values[lum_command.code] == 42
+
+    def test_maximum_refreshed(self):
+        cache = MaximaCache()
+        with VCP(vcp_template) as vcp:
+            vcp.maxima_cache = cache
+            fingerprint = vcp.get_edid_fingerprint()
+            vcp.get_vcp_feature(lum_command)
+            assert cache.get(fingerprint) == {lum_command.code: 80}
+            vcp.unknown_max_values[lum_command.code] = 100
+            assert vcp.get_vcp_feature(lum_command).max == 100
+            assert vcp.code_maximum[lum_command.code] == 100
+        assert cache.get(fingerprint) == {lum_command.code: 100}
+
+    def test_uncached_without_edid(self, isolated_cache_dir):
+        vcp = VCP(vcp_template)
+        vcp.maxima_cache = MaximaCache()
+        with patch.object(vcp, "_get_edid_blob", side_effect=VCPError("no EDID")):
+            with vcp:
+                assert vcp.get_vcp_feature_max(lum_command) == 80
+        assert not (isolated_cache_dir / "maxima").exists()
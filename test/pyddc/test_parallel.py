@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from pyddc.parallel import bounded_map
+
+
+class TestBoundedMap:
+
+    def test_map_keeps_order(self):
+        # later items finish first, results must still line up with the input
+        assert bounded_map(lambda x: time.sleep(0.05 - x / 100) or x * 2, range(5), 5, 1, None) == [0, 2, 4, 6, 8]
+
+    def test_map_empty(self):
+        assert bounded_map(lambda x: x, [], 4, 1, None) == []
+
+    def test_map_bounded_workers(self):
+        lock = threading.Lock()
+        running = peak = 0
+
+        def work(_):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return True
+
+        assert all(bounded_map(work, range(8), 3, 1, False))
+        assert peak <= 3
+
+    def test_map_runs_concurrently(self):
+        # every call waits for all the others to be running
+        barrier = threading.Barrier(4, timeout=5)
+        assert bounded_map(lambda _: barrier.wait() is not None, range(4), 4, 10, False) == [True] * 4
+
+    def test_map_timeout_uses_default(self):
+        release = threading.Event()
+        try:
+            results = bounded_map(lambda x: release.wait(2) if x == 1 else x, range(3), 3, 0.1, -1)
+        finally:
+            release.set()
+        assert results == [0, -1, 2]
+
+    def test_map_timeout_abandons(self):
+        release = threading.Event()
+        abandoned = []
+        daemon = []
+
+        def work(x):
+            daemon.append(threading.current_thread().daemon)
+            if x == 0:
+                release.wait(5)
+            return x
+
+        try:
+            # the hung call's thread is replaced, so the other item still runs with one worker
+            assert bounded_map(work, range(2), 1, 0.1, -1, abandoned.append) == [-1, 1]
+        finally:
+            release.set()
+        assert abandoned == [0]
+        assert all(daemon)
+
+    def test_map_propagates_errors(self):
+        def work(x):
+            if x == 2:
+                raise ValueError("bad bus")
+            return x
+
+        with pytest.raises(ValueError):
+            bounded_map(work, range(4), 2, 1, None)
@@ -0,0 +1,85 @@
+import time
+
+from pyddc.pool import ConnectionPool
+
+
+def _pool() -> tuple[ConnectionPool, list]:
+    closed = []
+    return ConnectionPool(closed.append), closed
+
+
+class TestConnectionPool:
+
+    def test_take_empty(self):
+        pool, closed = _pool()
+        assert pool.take("1") is None
+        assert closed == []
+
+    def test_give_and_take(self):
+        pool, closed = _pool()
+        pool.give("1", "conn", 10)
+        assert pool.take("1") == "conn"
+        # checked out, so not handed to anyone else
+        assert pool.take("1") is None
+        assert closed == []
+
+    def test_keyed(self):
+        pool, _ = _pool()
+        pool.give("1", "a", 10)
+        pool.give("2", "b", 10)
+        assert pool.take("2") == "b"
+        assert pool.take("1") == "a"
+
+    def test_one_per_key(self):
+        pool, closed = _pool()
+        pool.give("1", "a", 10)
+        pool.give("1", "b", 10)
+        assert closed == ["b"]
+        assert pool.take("1") == "a"
+
+    def test_no_timeout_closes(self):
+        pool, closed = _pool()
+        pool.give("1", "conn", 0)
+        assert closed == ["conn"]
+        assert pool.take("1") is None
+
+    def test_idle_expiry(self):
+        pool, closed = _pool()
+        pool.give("1", "a", 0.01)
+        pool.give("2", "b", 10)
+        time.sleep(0.02)
+        assert pool.take("1") is None
+        assert closed == ["a"]
+        assert len(pool) == 1
+
+    def test_expired_reaped_on_use(self):
+        pool, closed = _pool()
+        pool.give("1", "a", 0.01)
+        time.sleep(0.02)
+        pool.give("2", "b", 10)
+        assert closed == ["a"]
+
+    def test_discard(self):
+        pool, closed = _pool()
+        pool.give("1", "conn", 10)
+        pool.discard("1")
+        pool.discard("2")
+        assert closed == ["conn"]
+        assert pool.take("1") is None
+
+    def test_close_all(self):
+        pool, closed = _pool()
+        pool.give("1", "a", 10)
+        pool.give("2", "b", 10)
+        pool.close_all()
+        assert sorted(closed) == ["a", "b"]
+        assert len(pool) == 0
+
+    def test_close_failure_ignored(self):
+        def close(_):
+            raise OSError("bad descriptor")
+
+        pool = ConnectionPool(close)
+        pool.give("1", "a", 10)
+        pool.close_all()
+        assert len(pool) == 0
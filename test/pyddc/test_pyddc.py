@@ -2,9 +2,10 @@ from unittest.mock import patch
 
 import pytest
 
-from pyddc import get_vcp_com, parse_capabilities, vcp_codes
+from pyddc import get_vcp_com, parse_capabilities, vcp_codes, CapabilitiesIndex, VCPError, VCPUnsupportedError, \
+    VCPFeatureReturn
 from pyddc.vcp_codes import VCPCodes
-from test.pyddc.vcp_dummy import VCPTemplate, SupportedCodeTemplate, DummyVCP as VCP
+from test.pyddc.vcp_dummy import VCPTemplate, SupportedCodeTemplate, DummyVCP as VCP, FAULTY_VCP_TEMPLATE
 from test.testdata import input_command, lum_command, reset_command, active_control, lum_template, source_template, vcp_template
 
 
@@ -112,6 +113,54 @@ class TestSetFeature:
             assert vcp.get_vcp_feature(lum_command).value == 30
 
 
+class TestBatch:
+
+    contrast_command = get_vcp_com(VCPCodes.image_contrast)
+
+    def test_batch_cm_assertion(self):
+        with pytest.raises(AssertionError):
+            VCP(vcp_template).get_vcp_features([lum_command])
+        with pytest.raises(AssertionError):
+            VCP(vcp_template).set_vcp_features([(lum_command, 30)])
+
+    def test_get_features(self):
+        with VCP(vcp_template) as vcp:
+            results = vcp.get_vcp_features([lum_command, reset_command, input_command])
+        assert results[lum_command.code] == VCPFeatureReturn(75, 80)
+        assert isinstance(results[reset_command.code], TypeError)
+        # an error doesn't stop the rest of the batch
+        assert results[input_command.code] == VCPFeatureReturn(1, 3)
+
+    def test_get_features_skips_unsupported(self):
+        index = CapabilitiesIndex.from_parsed(parse_capabilities(vcp_template.caps_str))
+        with VCP(vcp_template) as vcp:
+            with patch.object(vcp, "_get_vcp_feature", wraps=vcp._get_vcp_feature) as get:
+                results = vcp.get_vcp_features([self.contrast_command, lum_command], supported=index)
+        assert isinstance(results[self.contrast_command.code], VCPUnsupportedError)
+        assert results[lum_command.code] == VCPFeatureReturn(75, 80)
+        assert get.call_count == 1
+
+    def test_get_features_faulty(self):
+        with VCP(FAULTY_VCP_TEMPLATE) as vcp:
+            results = vcp.get_vcp_features([lum_command, input_command])
+        assert all(isinstance(result, VCPError) for result in results.values())
+
+    def test_set_features(self):
+        with VCP(vcp_template) as vcp:
+            results = vcp.set_vcp_features([(lum_command, 85), (input_command, 15), (active_control, 0)])
+            assert isinstance(results[lum_command.code], ValueError)
+            assert results[input_command.code] is None
+            assert isinstance(results[active_control.code], TypeError)
+            assert vcp.get_vcp_feature(input_command).value == 15
+
+    def test_set_features_skips_unsupported(self):
+        index = CapabilitiesIndex.from_parsed(parse_capabilities(vcp_template.caps_str))
+        with VCP(vcp_template) as vcp:
+            results = vcp.set_vcp_features([(self.contrast_command, 50), (lum_command, 30)], supported=index)
+            assert isinstance(results[self.contrast_command.code], VCPUnsupportedError)
+            assert results[lum_command.code] is None
+
+
 class TestCapabilitiesFunctions:
 
     vcp = VCP(vcp_template)
@@ -169,3 +218,13 @@ class TestVCPCommands:
         # TODO: lol this is dumb, we need to hardcode the expected value here
         expected = get_vcp_com(VCPCodes.image_luminance.value)
         assert get_vcp_com(input).code == expected.code
+
+
+class TestGetVCP:
+
+    def test_get_vcp_index(self):
+        assert VCP.get_vcp(2).caps_str == VCP.get_vcps()[2].caps_str
+
+    def test_get_vcp_invalid_index(self):
+        with pytest.raises(IndexError):
+            VCP.get_vcp(3)
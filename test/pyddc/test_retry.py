@@ -0,0 +1,165 @@
+import time
+from logging import getLogger
+
+import pytest
+
+from pyddc import VCPError, VCPIOError, VCPChecksumError, VCPNullMessageError, VCPTimeoutError, \
+    VCPUnsupportedError, RetryPolicy, RetryStats
+from pyddc.retry import call_with_retries
+from test.pyddc.vcp_dummy import DummyVCP
+from test.testdata import lum_command, vcp_template
+
+_log = getLogger(__name__)
+FAST = RetryPolicy(backoff=0.001, backoff_max=0.001)
+
+
+def _failing(*errors: Exception):
+    """An operation that raises the given errors in turn, then returns "ok"."""
+    remaining = list(errors)
+
+    def operation():
+        if remaining:
+            raise remaining.pop(0)
+        return "ok"
+    return operation
+
+
+class TestCallWithRetries:
+
+    def test_success(self):
+        stats = RetryStats()
+        assert call_with_retries(_failing(), FAST, stats, _log) == "ok"
+        assert stats == RetryStats(1, 0)
+
+    def test_transient_errors_retried(self):
+        stats = RetryStats()
+        operation = _failing(VCPChecksumError("bad"), VCPNullMessageError("busy"))
+        assert call_with_retries(operation, FAST, stats, _log) == "ok"
+        assert stats == RetryStats(3, 2)
+
+    def test_retries_limited_per_kind(self):
+        stats = RetryStats()
+        policy = RetryPolicy(max_retries={"checksum": 1, "io": 5}, backoff=0.001)
+        with pytest.raises(VCPChecksumError):
+            call_with_retries(_failing(VCPChecksumError("1"), VCPIOError("2"), VCPChecksumError("3")), policy, stats,
+                              _log)
+        assert stats == RetryStats(3, 2)
+
+    @pytest.mark.parametrize("error", [
+        VCPTimeoutError("slow"),  # no retries by default
+        VCPUnsupportedError("unsupported"),
+        VCPError("not transient"),
+        TypeError("not a VCP error"),
+    ])
+    def test_not_retried(self, error):
+        stats = RetryStats()
+        with pytest.raises(type(error)):
+            call_with_retries(_failing(error), FAST, stats, _log)
+        assert stats == RetryStats(1, 0)
+
+    def test_deadline(self):
+        policy = RetryPolicy(max_retries={"io": 100}, backoff=0.02, backoff_max=0.02, deadline=0.05)
+        stats = RetryStats()
+        start = time.monotonic()
+        with pytest.raises(VCPIOError):
+            call_with_retries(_failing(*[VCPIOError("gone")] * 100), policy, stats, _log)
+        assert time.monotonic() - start < 0.2
+        assert 1 < stats.attempts < 10
+
+    def test_stats_accumulate(self):
+        stats = RetryStats()
+        call_with_retries(_failing(VCPIOError("once")), FAST, stats, _log)
+        call_with_retries(_failing(), FAST, stats, _log)
+        assert stats == RetryStats(3, 1)
+
+    def test_stats_add(self):
+        stats = RetryStats(1, 0)
+        stats.add(RetryStats(3, 2))
+        assert stats == RetryStats(4, 2)
+
+
+class FlakyVCP(DummyVCP):
+    """A dummy whose gets and sets fail with the given errors before working."""
+
+    def __init__(self, *errors: Exception):
+        super().__init__(vcp_template)
+        self.errors = list(errors)
+
+    def _fail(self):
+        if self.errors:
+            raise self.errors.pop(0)
+
+    def _get_vcp_feature(self, com, timeout):
+        self._fail()
+        return super()._get_vcp_feature(com, timeout)
+
+    def _set_vcp_feature(self, com, value, timeout):
+        self._fail()
+        super()._set_vcp_feature(com, value, timeout)
+
+
+class TestVCPRetries:
+
+    def test_get_retried(self):
+        vcp = FlakyVCP(VCPChecksumError("bad"))
+        vcp.retry_policy = FAST
+        with vcp:
+            assert vcp.get_vcp_feature(lum_command).value == 75
+        assert vcp.retry_stats == RetryStats(2, 1)
+
+    def test_set_retried(self):
+        vcp = FlakyVCP()
+        vcp.retry_policy = FAST
+        with vcp:
+            vcp.get_vcp_feature(lum_command)
+            vcp.errors = [VCPIOError("nack")]
+            vcp.set_vcp_feature(lum_command, 50)
+            assert vcp.get_vcp_feature(lum_command).value == 50
+        assert vcp.retry_stats == RetryStats(4, 1)
+
+    def test_no_retries(self):
+        vcp = FlakyVCP(VCPChecksumError("bad"))
+        vcp.retry_policy = RetryPolicy(max_retries={})
+        with vcp:
+            with pytest.raises(VCPChecksumError):
+                vcp.get_vcp_feature(lum_command)
+        assert vcp.retry_stats == RetryStats(1, 0)
+
+    def test_caps_retried_whole(self):
+        vcp = FlakyVCP()
+        vcp.retry_policy = FAST
+        fetch = vcp._get_vcp_capabilities_str
+
+        def flaky_fetch(timeout):
+            vcp._fail()
+            return fetch(timeout)
+        vcp._get_vcp_capabilities_str = flaky_fetch
+        with vcp:
+            vcp.errors = [VCPChecksumError("bad")]
+            assert vcp.get_vcp_capabilities() == vcp_template.caps_str
+        assert vcp.retry_stats == RetryStats(2, 1)
+
+    def test_caps_fragments_retried_by_driver(self):
+        class FragmentVCP(FlakyVCP):
+            RETRIES_CAPS_FRAGMENTS = True
+
+            def _get_vcp_capabilities_str(self, timeout):
+                return "".join(self._iter_vcp_capabilities(timeout))
+
+            def _iter_vcp_capabilities(self, timeout):
+                caps_str = vcp_template.caps_str
+                for offset in range(0, len(caps_str), 32):
+                    yield self._with_retries(lambda: self._fragment(caps_str, offset))
+
+            def _fragment(self, caps_str, offset):
+                self._fail()
+                return caps_str[offset:offset + 32]
+
+        vcp = FragmentVCP()
+        vcp.retry_policy = FAST
+        fragments = -(-len(vcp_template.caps_str) // 32)
+        with vcp:
+            vcp.errors = [VCPChecksumError("bad")]
+            assert vcp.get_vcp_capabilities() == vcp_template.caps_str
+        # only the failed fragment was fetched again, and the fetch as a whole wasn't retried
+        assert vcp.retry_stats == RetryStats(fragments + 1, 1)
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+from pyddc.scheduler import BusScheduler, bus_scheduler
+
+
+class TestBusScheduler:
+
+    def test_first_transaction_does_not_wait(self):
+        with BusScheduler().transaction(0.05) as wait:
+            assert wait == 0
+
+    def test_waits_out_gap(self):
+        scheduler = BusScheduler()
+        with scheduler.transaction(0.05):
+            pass
+        start = time.monotonic()
+        with scheduler.transaction(0) as wait:
+            assert time.monotonic() - start >= 0.045
+        assert wait == pytest.approx(0.05, abs=0.01)
+
+    def test_waits_only_remaining_gap(self):
+        scheduler = BusScheduler()
+        with scheduler.transaction(0.05):
+            pass
+        time.sleep(0.03)
+        with scheduler.transaction(0) as wait:
+            assert wait < 0.03
+
+    def test_no_wait_after_gap(self):
+        scheduler = BusScheduler()
+        with scheduler.transaction(0.01):
+            pass
+        time.sleep(0.02)
+        with scheduler.transaction(0) as wait:
+            assert wait == 0
+
+    def test_gap_counts_from_end_of_transaction(self):
+        scheduler = BusScheduler()
+        with scheduler.transaction(0.05):
+            time.sleep(0.03)
+        with scheduler.transaction(0) as wait:
+            assert wait > 0.04
+
+    def test_gap_after_failed_transaction(self):
+        scheduler = BusScheduler()
+        with pytest.raises(OSError):
+            with scheduler.transaction(0.05):
+                raise OSError
+        with scheduler.transaction(0) as wait:
+            assert wait > 0.04
+
+    def test_transactions_serialized(self):
+        scheduler = BusScheduler()
+        lock = threading.Lock()
+        running = peak = 0
+
+        def work():
+            nonlocal running, peak
+            with scheduler.transaction(0):
+                with lock:
+                    running += 1
+                    peak = max(peak, running)
+                time.sleep(0.01)
+                with lock:
+                    running -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert peak == 1
+
+
+class TestBusSchedulerRegistry:
+
+    def test_shared_per_bus(self):
+        assert bus_scheduler("test-1") is bus_scheduler("test-1")
+        assert bus_scheduler("test-1") is not bus_scheduler("test-2")
@@ -0,0 +1,110 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pyddc import ValueCache, VCPError, VCPFeatureReturn, get_vcp_com
+from pyddc.vcp_codes import VCPCodes
+from test.pyddc.vcp_dummy import DummyVCP as VCP
+from test.testdata import vcp_template
+
+lum_command = get_vcp_com(VCPCodes.image_luminance)
+lum = lum_command.code
+active_control = VCPCodes.active_control.value
+
+
+class TestValueCache:
+
+    def test_miss_put_hit(self):
+        cache = ValueCache()
+        assert cache.get(lum) is None
+        cache.put(lum, VCPFeatureReturn(75, 80))
+        assert cache.get(lum) == VCPFeatureReturn(75, 80)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_expires(self):
+        cache = ValueCache(ttl=0.01)
+        cache.put(lum, VCPFeatureReturn(75, 80))
+        time.sleep(0.02)
+        assert cache.get(lum) is None
+        assert len(cache) == 0
+
+    def test_per_code_ttl(self):
+        cache = ValueCache(ttl=10, ttls={lum: 0})
+        cache.put(lum, VCPFeatureReturn(75, 80))
+        cache.put(0x12, VCPFeatureReturn(50, 100))
+        assert cache.get(lum) is None
+        assert cache.get(0x12) == VCPFeatureReturn(50, 100)
+        # uncacheable codes aren't counted
+        assert (cache.hits, cache.misses) == (1, 0)
+
+    def test_volatile(self):
+        cache = ValueCache()
+        cache.put(active_control, VCPFeatureReturn(1, 255))
+        assert cache.get(active_control) is None
+        assert len(cache) == 0
+
+    @pytest.mark.parametrize("cached, maximum, expected", [
+        (VCPFeatureReturn(75, 80), None, VCPFeatureReturn(42, 80)),
+        (None, 100, VCPFeatureReturn(42, 100)),
+        (None, None, None),
+    ])
+    def test_written(self, cached, maximum, expected):
+        cache = ValueCache()
+        if cached is not None:
+            cache.put(lum, cached)
+        cache.written(lum, 42, maximum)
+        assert cache.get(lum) == expected
+
+    def test_invalidate(self):
+        cache = ValueCache()
+        cache.put(lum, VCPFeatureReturn(75, 80))
+        cache.put(0x12, VCPFeatureReturn(50, 100))
+        cache.invalidate(lum)
+        assert cache.get(lum) is None
+        assert cache.get(0x12) is not None
+        cache.invalidate()
+        assert len(cache) == 0
+
+
+class TestVCPValueCache:
+
+    def _vcp(self) -> VCP:
+        vcp = VCP(vcp_template)
+        vcp.value_cache = ValueCache(ttl=10)
+        return vcp
+
+    def test_read_once(self):
+        with self._vcp() as vcp:
+            vcp.get_vcp_feature(lum_command)
+            with patch.object(vcp, "_get_vcp_feature", side_effect=AssertionError("read not served from cache")):
+                assert vcp.get_vcp_feature(lum_command) == VCPFeatureReturn(75, 80)
+            assert (vcp.value_cache.hits, vcp.value_cache.misses) == (1, 1)
+
+    def test_write_through(self):
+        with self._vcp() as vcp:
+            vcp.set_vcp_feature(lum_command, 42)
+            with patch.object(vcp, "_get_vcp_feature", side_effect=AssertionError("read not served from cache")):
+                assert vcp.get_vcp_feature(lum_command) == VCPFeatureReturn(42, 80)
+
+    def test_failed_write_invalidates(self):
+        with self._vcp() as vcp:
+            vcp.get_vcp_feature(lum_command)
+            with patch.object(vcp, "_set_vcp_feature", side_effect=VCPError("no ACK")):
+                with pytest.raises(VCPError):
+                    vcp.set_vcp_feature(lum_command, 42)
+            assert vcp.value_cache.get(lum) is None
+
+    def test_factory_reset_invalidates(self):
+        with self._vcp() as vcp:
+            vcp.get_vcp_feature(lum_command)
+            with patch.object(vcp, "_set_vcp_feature"):
+                vcp.set_vcp_feature(get_vcp_com(VCPCodes.restore_factory_default), 1)
+            assert len(vcp.value_cache) == 0
+
+    def test_cleared_per_session(self):
+        vcp = self._vcp()
+        with vcp:
+            vcp.get_vcp_feature(lum_command)
+        with vcp:
+            assert len(vcp.value_cache) == 0
@@ -0,0 +1,206 @@
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pyddc import VCPIOError
+from pyddc.cache import edid_fingerprint
+from test.testdata import edid_blob
+
+if not sys.platform.startswith("linux"):
+    pytest.skip("LinuxVCP only runs on Linux", allow_module_level=True)
+
+import fcntl
+
+from pyddc import vcp_linux
+from pyddc.vcp_linux import LinuxVCP
+
+other_edid_blob = edid_blob[:-1] + b'\x00'
+
+
+class FakeBuses:
+    """Buses for LinuxVCP without I2C hardware: opening one opens /dev/null, and its EDID comes from edids."""
+
+    def __init__(self):
+        self.edids: dict[str, bytes] = {}
+        # buses that fail to open
+        self.dead: set[str] = set()
+        self.edid_reads = 0
+        # what get_vcps finds, as (bus, EDID) pairs
+        self.monitors: list[tuple[str, bytes]] = []
+
+    def open(self, vcp: LinuxVCP) -> None:
+        if vcp.bus_number in self.dead:
+            raise VCPIOError(f"unable to open VCP at {vcp.fp}")
+        vcp.fd = os.open(os.devnull, os.O_RDWR)
+
+    def get_edid_blob(self, vcp: LinuxVCP) -> bytes:
+        self.edid_reads += 1
+        try:
+            return self.edids[vcp.bus_number]
+        except KeyError:
+            raise VCPIOError(f"no EDID on bus {vcp.bus_number}") from None
+
+    def get_vcps(self) -> list[LinuxVCP]:
+        return [LinuxVCP(bus, edid_fingerprint(edid)) for bus, edid in self.monitors]
+
+
+@pytest.fixture
+def buses():
+    fake = FakeBuses()
+    with patch.object(LinuxVCP, "_open", lambda vcp, session=None: fake.open(vcp)), \
+            patch.object(LinuxVCP, "_get_edid_blob", lambda vcp: fake.get_edid_blob(vcp)), \
+            patch.object(LinuxVCP, "get_vcps", fake.get_vcps):
+        yield fake
+    vcp_linux._pool.close_all()
+
+
+class TestEDIDFingerprint:
+
+    def test_read_once_per_session(self, buses):
+        buses.edids["3"] = edid_blob
+        with LinuxVCP("3") as vcp:
+            assert vcp.get_edid_fingerprint() == edid_fingerprint(edid_blob)
+            assert vcp.get_edid_fingerprint() == edid_fingerprint(edid_blob)
+        assert buses.edid_reads == 1
+
+    def test_reread_after_swap(self, buses):
+        vcp = LinuxVCP("3")
+        buses.edids["3"] = edid_blob
+        with vcp:
+            vcp.get_edid_fingerprint()
+        # another monitor plugged into the same port
+        buses.edids["3"] = other_edid_blob
+        with vcp:
+            assert vcp.get_edid_fingerprint() == edid_fingerprint(other_edid_blob)
+
+
+class TestBusMap:
+
+    def test_confirmed(self, buses):
+        buses.edids["3"] = edid_blob
+        with LinuxVCP("3", edid_fingerprint(edid_blob), map_index=0) as vcp:
+            assert vcp.bus_number == "3"
+            assert vcp.get_edid_fingerprint() == edid_fingerprint(edid_blob)
+        # the EDID read that confirmed the monitor also served the fingerprint
+        assert buses.edid_reads == 1
+
+    def test_other_monitor_remaps(self, buses):
+        buses.edids = {"3": other_edid_blob, "4": edid_blob}
+        buses.monitors = [("4", edid_blob)]
+        with LinuxVCP("3", edid_fingerprint(edid_blob), map_index=0) as vcp:
+            assert vcp.bus_number == "4"
+            assert vcp.get_edid_fingerprint() == edid_fingerprint(edid_blob)
+            # the mapped bus answered, so its session was kept for reuse
+            assert vcp_linux._pool.take("3") is not None
+
+    def test_other_monitor_gone(self, buses):
+        buses.edids["3"] = other_edid_blob
+        vcp = LinuxVCP("3", edid_fingerprint(edid_blob), map_index=0)
+        with pytest.raises(VCPIOError):
+            vcp.__enter__()
+        assert not vcp._in_ctx
+
+    def test_failed_open_remaps(self, buses):
+        buses.dead.add("3")
+        buses.edids["4"] = edid_blob
+        buses.monitors = [("4", edid_blob)]
+        with LinuxVCP("3", edid_fingerprint(edid_blob), map_index=0) as vcp:
+            assert vcp.bus_number == "4"
+
+
+class TestPooledSession:
+
+    @pytest.fixture
+    def pooled(self):
+        vcp_linux._pool.give("6", (os.open(os.devnull, os.O_RDWR), None), 30)
+        yield
+        vcp_linux._pool.close_all()
+
+    def test_reused_unchecked(self, pooled):
+        with patch.object(LinuxVCP, "_check_device", side_effect=AssertionError("pooled session checked")):
+            with LinuxVCP("6") as vcp:
+                assert vcp.fd is not None
+
+    def test_enumeration_checks(self, pooled):
+        # the monitor went away since the session was pooled
+        with patch.object(LinuxVCP, "_check_device", side_effect=VCPIOError("no ACK")) as check:
+            assert not LinuxVCP("6")._probe()
+        assert check.call_count == 1
+        # and the session that failed the check is not kept
+        assert vcp_linux._pool.take("6") is None
+
+
+class TestAbandonedProbe:
+
+    def test_not_pooled(self, buses):
+        vcp = LinuxVCP("7")
+        vcp._abandon_probe()
+        with vcp:
+            pass
+        assert vcp_linux._pool.take("7") is None
+
+    def test_not_recorded(self, buses, monkeypatch):
+        monkeypatch.setattr(LinuxVCP, "PROBE", "cached")
+        vcp = LinuxVCP("7")
+        vcp.fd = os.open(os.devnull, os.O_RDWR)
+        vcp._abandon_probe()
+        with patch.object(vcp_linux, "_record_probe", side_effect=AssertionError("abandoned probe recorded")):
+            with patch.object(vcp, "_write_ack"):
+                vcp._enumerating = True
+                vcp._check_device()
+            vcp.__exit__(VCPIOError, VCPIOError("no ACK"), None)
+
+
+class TestBusLock:
+
+    @pytest.fixture
+    def fds(self, tmp_path, monkeypatch):
+        # two open file descriptions of one file lock each other out, like two processes on a bus device
+        monkeypatch.setitem(vcp_linux.COMMAND_GAPS, "set", 0.2)
+        device = tmp_path / "i2c-lock"
+        device.touch()
+        ours, theirs = os.open(device, os.O_RDWR), os.open(device, os.O_RDWR)
+        yield ours, theirs
+        vcp_linux._close(ours)
+        os.close(theirs)
+
+    @staticmethod
+    def _locked(fd: int) -> bool:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return False
+
+    def test_held_through_gap(self, fds):
+        ours, theirs = fds
+        vcp = LinuxVCP("lock-a")
+        vcp.fd = ours
+        with vcp._transaction("set"):
+            pass
+        assert self._locked(theirs)
+        deadline = time.monotonic() + 5
+        while self._locked(theirs):
+            assert time.monotonic() < deadline, "lock not released after the gap"
+            time.sleep(0.01)
+
+    def test_taken_back(self, fds):
+        ours, theirs = fds
+        fcntl.flock(ours, fcntl.LOCK_EX)
+        vcp_linux._unlock_after(ours, 0.01)
+        # a transaction that starts before the unlock fires keeps the lock
+        assert vcp_linux._take_back_lock(ours)
+        time.sleep(0.05)
+        assert self._locked(theirs)
+
+    def test_released_without_gap(self, fds):
+        ours, theirs = fds
+        vcp = LinuxVCP("lock-c")
+        vcp.fd = ours
+        with vcp._transaction("edid"):
+            pass
+        assert not self._locked(theirs)
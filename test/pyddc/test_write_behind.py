@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from pyddc import WriteBehindQueue, VCPError, get_vcp_com
+from pyddc.vcp_codes import VCPCodes
+from pyddc.write_behind import write_queue
+from test.pyddc.vcp_dummy import DummyVCP as VCP, FAULTY_VCP_TEMPLATE
+from test.testdata import vcp_template
+
+lum_command = get_vcp_com(VCPCodes.image_luminance)
+contrast_command = get_vcp_com(VCPCodes.image_contrast)
+
+
+class BlockingVCP(VCP):
+    """Holds each write until released, and records the ones it applied."""
+
+    def __init__(self, template):
+        super().__init__(template)
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.writes = []
+
+    def _set_vcp_feature(self, com, value, timeout):
+        self.started.set()
+        assert self.release.wait(5)
+        super()._set_vcp_feature(com, value, timeout)
+        self.writes.append((com.code, value))
+
+
+class TestWriteBehindQueue:
+
+    def test_applies(self):
+        queue = WriteBehindQueue()
+        vcp = VCP(vcp_template)
+        future = queue.submit(vcp, lum_command, 42)
+        assert future.result(5) is None
+        assert vcp.current_values[lum_command.code] == 42
+        assert queue.flush(5)
+
+    def test_coalesces(self):
+        queue = WriteBehindQueue()
+        vcp = BlockingVCP(vcp_template)
+        first = queue.submit(vcp, lum_command, 10)
+        assert vcp.started.wait(5)
+        # the first write is in progress; these wait behind it, and collapse into one per code
+        futures = [queue.submit(vcp, lum_command, value) for value in range(20, 30)]
+        futures.append(queue.submit(vcp, contrast_command, 50))
+        futures.append(queue.submit(vcp, lum_command, 60))
+        assert len(queue) == 2
+        assert queue.coalesced == 10
+        vcp.release.set()
+        assert queue.flush(5)
+        assert all(future.done() for future in [first, *futures])
+        assert vcp.writes == [(lum_command.code, 10), (lum_command.code, 60), (contrast_command.code, 50)]
+        assert vcp.current_values[lum_command.code] == 60
+
+    def test_flush_timeout(self):
+        queue = WriteBehindQueue()
+        vcp = BlockingVCP(vcp_template)
+        queue.submit(vcp, lum_command, 10)
+        assert not queue.flush(0.01)
+        vcp.release.set()
+        assert queue.flush(5)
+
+    def test_error(self):
+        queue = WriteBehindQueue()
+        future = queue.submit(VCP(FAULTY_VCP_TEMPLATE), lum_command, 42)
+        with pytest.raises(VCPError):
+            future.result(5)
+        # the queue keeps going after a failed write
+        vcp = VCP(vcp_template)
+        assert queue.submit(vcp, lum_command, 42).result(5) is None
+
+    def test_cancelled(self):
+        queue = WriteBehindQueue()
+        vcp = BlockingVCP(vcp_template)
+        queue.submit(vcp, lum_command, 10)
+        assert vcp.started.wait(5)
+        cancelled = queue.submit(vcp, contrast_command, 50)
+        kept = queue.submit(vcp, contrast_command, 60)
+        assert cancelled.cancel()
+        vcp.release.set()
+        assert kept.result(5) is None
+        assert vcp.writes[-1] == (contrast_command.code, 60)
+        # the queue keeps going after a cancelled future
+        assert queue.submit(vcp, lum_command, 20).result(5) is None
+        assert queue.flush(5)
+
+    def test_open_vcp_refused(self):
+        queue = WriteBehindQueue()
+        with VCP(vcp_template) as vcp:
+            with pytest.raises(AssertionError):
+                queue.submit(vcp, lum_command, 42)
+
+    def test_opened_while_queued(self):
+        queue = WriteBehindQueue()
+        blocking = BlockingVCP(vcp_template)
+        queue.submit(blocking, lum_command, 10)
+        assert blocking.started.wait(5)
+        vcp = VCP(vcp_template)
+        future = queue.submit(vcp, lum_command, 42)
+        with vcp:
+            blocking.release.set()
+            with pytest.raises(VCPError):
+                future.result(5)
+            # the caller's session is untouched
+            assert vcp._in_ctx
+            vcp.set_vcp_feature(lum_command, 30)
+        assert vcp.current_values[lum_command.code] == 30
+
+    def test_per_bus(self):
+        assert write_queue("1") is write_queue("1")
+        assert write_queue("1") is not write_queue("2")
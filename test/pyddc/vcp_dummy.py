@@ -2,7 +2,7 @@
 
 from dataclasses import dataclass
 from types import TracebackType
-from typing import List, Optional, Type
+from typing import Iterator, List, Optional, Type
 from copy import deepcopy
 
 from pyddc import VCPCommand, VCPFeatureReturn, ABCVCP, VCPError
@@ -194,6 +194,12 @@ class DummyVCP(ABCVCP):
             raise VCPError("I am a broken monitor, beep boop")
         return self.caps_str
 
+    def _iter_vcp_capabilities(self, timeout: float) -> Iterator[str]:
+        # like DDC/CI capabilities replies, in fragments of up to 32 characters
+        caps_str = self._get_vcp_capabilities_str(timeout)
+        for offset in range(0, len(caps_str), 32):
+            yield caps_str[offset:offset + 32]
+
     def _get_edid_blob(self) -> bytes:
         if self.faulty:
             raise VCPError("I am a broken monitor, beep boop")